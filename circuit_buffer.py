@@ -0,0 +1,108 @@
+"""Module responsible for the buffer of EVCs kept in memory."""
+from bisect import bisect_left, insort
+from threading import RLock
+
+
+class CircuitBuffer(dict):
+    """EVCs by id that also keeps them sorted by priority.
+
+    The priority is the descending service level and then the ascending
+    creation time. The order is built on the first by_priority call and then
+    kept on every change of this dict, so event handlers don't sort every
+    EVC each time. reorder must be called when an EVC service level changes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Create a CircuitBuffer like a dict."""
+        super().__init__(*args, **kwargs)
+        self._lock = RLock()
+        # sorted (-service_level, creation_time, evc_id), None if not built
+        self._order: list = None
+        # evc_id -> its key in _order
+        self._keys: dict = {}
+
+    @staticmethod
+    def _priority_key(evc_id, evc) -> tuple:
+        """Key of an EVC in the priority order."""
+        return (-evc.service_level, evc.creation_time, evc_id)
+
+    def _insert(self, evc_id, evc) -> None:
+        """Insert an EVC in the order, if it's built. Lock must be held."""
+        if self._order is None:
+            return
+        self._discard(evc_id)
+        key = self._priority_key(evc_id, evc)
+        insort(self._order, key)
+        self._keys[evc_id] = key
+
+    def _discard(self, evc_id) -> None:
+        """Remove an EVC from the order, if it's built. Lock must be held."""
+        if self._order is None or evc_id not in self._keys:
+            return
+        key = self._keys.pop(evc_id)
+        index = bisect_left(self._order, key)
+        del self._order[index]
+
+    def __setitem__(self, evc_id, evc):
+        with self._lock:
+            super().__setitem__(evc_id, evc)
+            self._insert(evc_id, evc)
+
+    def __delitem__(self, evc_id):
+        with self._lock:
+            super().__delitem__(evc_id)
+            self._discard(evc_id)
+
+    def setdefault(self, evc_id, evc=None):
+        """Insert evc if evc_id isn't in the buffer, return the current one."""
+        with self._lock:
+            if evc_id in self:
+                return self[evc_id]
+            self[evc_id] = evc
+            return evc
+
+    def pop(self, evc_id, *default):
+        """Remove and return an EVC, like dict.pop."""
+        with self._lock:
+            if evc_id not in self and default:
+                return default[0]
+            evc = super().pop(evc_id)
+            self._discard(evc_id)
+            return evc
+
+    def popitem(self):
+        """Remove and return the last inserted (evc_id, evc)."""
+        with self._lock:
+            evc_id, evc = super().popitem()
+            self._discard(evc_id)
+            return evc_id, evc
+
+    def update(self, *args, **kwargs):
+        """Update the buffer like dict.update."""
+        with self._lock:
+            for evc_id, evc in dict(*args, **kwargs).items():
+                self[evc_id] = evc
+
+    def clear(self):
+        """Remove every EVC."""
+        with self._lock:
+            super().clear()
+            self._order = None
+            self._keys = {}
+
+    def reorder(self, evc_id) -> None:
+        """Move an EVC to its place after its service level changed."""
+        with self._lock:
+            if evc_id in self:
+                self._insert(evc_id, self[evc_id])
+
+    def by_priority(self) -> list:
+        """Return the EVCs sorted by priority."""
+        with self._lock:
+            if self._order is None:
+                self._keys = {
+                    evc_id: self._priority_key(evc_id, evc)
+                    for evc_id, evc in self.items()
+                }
+                self._order = sorted(self._keys.values())
+            return [self[key[2]] for key in self._order]
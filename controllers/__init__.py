@@ -2,7 +2,7 @@
 # pylint: disable=unnecessary-lambda,invalid-name
 import os
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 
 import pymongo
 from pymongo.collection import ReturnDocument
@@ -13,7 +13,9 @@ from tenacity import retry_if_exception_type, stop_after_attempt, wait_random
 from kytos.core import log
 from kytos.core.db import Mongo
 from kytos.core.retry import before_sleep, for_all_methods, retries
+from napps.kytos.mef_eline import settings
 from napps.kytos.mef_eline.db.models import EVCBaseDoc, EVCUpdateDoc
+from napps.kytos.mef_eline.metrics import MONGO_WRITES
 
 
 @for_all_methods(
@@ -42,6 +44,10 @@ class ELineController:
             ("evcs", [("circuit_scheduler.id", pymongo.ASCENDING)]),
             ("evcs", [("archived", pymongo.ASCENDING)]),
         ]
+        for key in settings.METADATA_INDEXES:
+            index_tuples.append(
+                ("evcs", [(f"metadata.{key}", pymongo.ASCENDING)])
+            )
         for collection, keys in index_tuples:
             if self.mongo.bootstrap_index(collection, keys):
                 log.info(
@@ -49,8 +55,26 @@ class ELineController:
                 )
 
     def get_circuits(self, archived: Optional[bool] = False,
-                     metadata: dict = None) -> Dict:
+                     metadata: dict = None, limit: Optional[int] = None,
+                     after: Optional[str] = None,
+                     fields: Optional[list[str]] = None) -> Dict:
         """Get all circuits from database."""
+        circuits = self.iter_circuits(archived, metadata, limit, after, fields)
+        return {"circuits": {value["id"]: value for value in circuits}}
+
+    def iter_circuits(self, archived: Optional[bool] = False,
+                      metadata: dict = None, limit: Optional[int] = None,
+                      after: Optional[str] = None,
+                      fields: Optional[list[str]] = None) -> Iterator[Dict]:
+        """Iterate over circuits from database sorted by id.
+
+        Args:
+            archived: archived filter, it isn't filtered if None.
+            metadata: query args, metadata.<key> ones are used as filters.
+            limit: maximum number of circuits.
+            after: only circuits with id greater than this one.
+            fields: only these fields (and id) are projected.
+        """
         aggregation = []
         options = {"null": None, "true": True, "false": False}
         match_filters = {"$match": {}}
@@ -67,19 +91,26 @@ class ELineController:
                         item = metadata[key]
                         item = options.get(item.lower(), item)
                         match_filters["$match"][key] = item
-        aggregation.extend([
-                {"$sort": {"_id": 1}},
-                {"$project": EVCBaseDoc.projection()},
-            ]
-        )
-        circuits = self.db.evcs.aggregate(aggregation)
-        return {"circuits": {value["id"]: value for value in circuits}}
+        if after is not None:
+            match_filters["$match"]["_id"] = {"$gt": after}
+        aggregation.append({"$sort": {"_id": 1}})
+        if limit is not None:
+            aggregation.append({"$limit": limit})
+        projection = EVCBaseDoc.projection()
+        if fields:
+            projection = {
+                key: value for key, value in projection.items()
+                if key in {"_id", "id"} or key in fields
+            }
+        aggregation.append({"$project": projection})
+        return self.db.evcs.aggregate(aggregation)
 
     def get_circuit(self, circuit_id: str) -> Optional[Dict]:
         """Get a circuit."""
         return self.db.evcs.find_one({"_id": circuit_id},
                                      EVCBaseDoc.projection())
 
+    @MONGO_WRITES.time(operation="upsert_evc")
     def upsert_evc(self, evc: Dict) -> Optional[Dict]:
         """Update or insert an EVC"""
         utc_now = datetime.utcnow()
@@ -101,6 +132,7 @@ class ELineController:
         )
         return updated
 
+    @MONGO_WRITES.time(operation="update_evc")
     def update_evc(self, evc: Dict) -> Optional[Dict]:
         """Update an EVC.
         This is needed to correctly set None values to fields"""
@@ -121,6 +153,7 @@ class ELineController:
         )
         return updated
 
+    @MONGO_WRITES.time(operation="update_evcs")
     def update_evcs(self, evcs: list[dict]) -> int:
         """Update EVCs and return the number of modified documents."""
         if not evcs:
@@ -148,6 +181,7 @@ class ELineController:
             )
         return self.db.evcs.bulk_write(ops).modified_count
 
+    @MONGO_WRITES.time(operation="update_evcs_metadata")
     def update_evcs_metadata(
         self, circuit_ids: list, metadata: dict, action: str
     ):
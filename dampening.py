@@ -0,0 +1,112 @@
+"""Module responsible for the flap dampening of links."""
+import math
+import time
+from threading import Lock
+
+
+class LinkState:
+    """Flap penalty of a link."""
+
+    __slots__ = ("link", "penalty", "updated_at", "suppressed")
+
+    def __init__(self, link, updated_at: float):
+        """Create a LinkState without penalty."""
+        self.link = link
+        self.penalty = 0.0
+        self.updated_at = updated_at
+        self.suppressed = False
+
+
+class LinkDampening:
+    """Suppress links that flap too often, like BGP route flap dampening.
+
+    Every link down adds penalty to a link, and the penalty decays
+    exponentially with half_life seconds. A link is suppressed once its
+    penalty reaches suppress_threshold and it's released once the penalty
+    decays below reuse_threshold. Links whose penalty decays below half of
+    reuse_threshold are forgotten.
+    """
+
+    def __init__(
+        self,
+        penalty: float,
+        half_life: float,
+        suppress_threshold: float,
+        reuse_threshold: float,
+    ):
+        """Create a LinkDampening.
+
+        Args:
+            penalty(float): penalty added on every link down.
+            half_life(float): seconds for the penalty to decay to its half.
+            suppress_threshold(float): penalty to suppress a link.
+            reuse_threshold(float): penalty to release a suppressed link.
+        """
+        if reuse_threshold >= suppress_threshold:
+            raise ValueError(
+                "reuse_threshold must be lower than suppress_threshold"
+            )
+        self.penalty = penalty
+        self.half_life = half_life
+        self.suppress_threshold = suppress_threshold
+        self.reuse_threshold = reuse_threshold
+        self._links: dict[str, LinkState] = {}
+        self._lock = Lock()
+
+    def _decay(self, state: LinkState, now: float) -> None:
+        """Decay the penalty of a link up to now. Lock must be held."""
+        elapsed = now - state.updated_at
+        if elapsed > 0:
+            state.penalty *= math.pow(0.5, elapsed / self.half_life)
+            state.updated_at = now
+
+    def flap(self, link, now: float = None) -> bool:
+        """Add the penalty of a link down, return whether it's suppressed."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state = self._links.get(link.id)
+            if state is None:
+                state = self._links[link.id] = LinkState(link, now)
+            self._decay(state, now)
+            state.link = link
+            state.penalty += self.penalty
+            if state.penalty >= self.suppress_threshold:
+                state.suppressed = True
+            return state.suppressed
+
+    def is_suppressed(self, link_id: str) -> bool:
+        """Whether a link is suppressed.
+
+        The link is kept suppressed until release is called.
+        """
+        state = self._links.get(link_id)
+        return bool(state and state.suppressed)
+
+    def suppressed(self) -> frozenset[str]:
+        """Return the ids of the suppressed links."""
+        with self._lock:
+            return frozenset(
+                link_id for link_id, state in self._links.items()
+                if state.suppressed
+            )
+
+    def release(self, now: float = None) -> list:
+        """Release the links that can be reused and forget idle ones.
+
+        Returns:
+            list: the released Link objects.
+        """
+        now = time.monotonic() if now is None else now
+        released = []
+        with self._lock:
+            for link_id, state in list(self._links.items()):
+                self._decay(state, now)
+                if state.suppressed and state.penalty < self.reuse_threshold:
+                    state.suppressed = False
+                    released.append(state.link)
+                if (
+                    not state.suppressed
+                    and state.penalty < self.reuse_threshold / 2
+                ):
+                    del self._links[link_id]
+        return released
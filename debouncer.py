@@ -0,0 +1,160 @@
+"""Module responsible for debouncing events by key."""
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from threading import Condition, Thread
+from typing import Callable, Hashable
+
+from kytos.core import log
+
+
+class Debouncer:
+    """Run a callback once per key with the last value pushed in a delay.
+
+    The first value pushed for a key starts a delay, values pushed meanwhile
+    replace it and the callback(key, value) runs once after the delay. A
+    single timer thread waits for every key, so no thread is blocked per key.
+    Values older than the last one pushed for a key are discarded, the last
+    timestamp of a key is evicted once it's idle for idle_timeout.
+    Callbacks of the same key never run concurrently: a value due while the
+    callback of its key is running is held until that callback returns.
+    """
+
+    def __init__(
+        self,
+        callback: Callable,
+        delay: float,
+        idle_timeout: float,
+        max_workers: int = 4,
+        name: str = "mef_eline_debouncer",
+    ):
+        """Create a Debouncer.
+
+        Args:
+            callback(callable): callback(key, value) run after the delay.
+            delay(float): seconds to wait for newer values of a key.
+            idle_timeout(float): seconds to keep the last timestamp of a key
+                after its callback, to discard out of order values.
+            max_workers(int): threads running callbacks.
+            name(str): prefix of the timer and callback thread names.
+        """
+        self.callback = callback
+        self.delay = delay
+        self.idle_timeout = idle_timeout
+        self.name = name
+        self._cond = Condition()
+        # (deadline, seq, action, key), action is "fire" or "evict"
+        self._timers: list[tuple] = []
+        self._seq = count()
+        # key -> last value pushed while waiting for the delay
+        self._pending: dict = {}
+        # key -> (timestamp of the last value, monotonic time it was pushed)
+        self._last: dict = {}
+        # keys whose callback is running and, among them, the ones with a
+        # pending value held until it returns
+        self._running: set = set()
+        self._held: set = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._thread = None
+        self._stopped = False
+
+    def __len__(self) -> int:
+        """Number of keys with state kept."""
+        return len(self._last)
+
+    def pending(self) -> int:
+        """Number of keys waiting for the delay to be handled."""
+        with self._cond:
+            return len(self._pending)
+
+    def _schedule(self, deadline: float, action: str, key: Hashable) -> None:
+        """Add a timer. Lock must be held."""
+        heapq.heappush(self._timers, (deadline, next(self._seq), action, key))
+
+    def push(self, key: Hashable, value, timestamp=None) -> bool:
+        """Push a value, return False if it's older than the last one."""
+        with self._cond:
+            if self._stopped:
+                return False
+            last = self._last.get(key)
+            if timestamp is not None and last and last[0] is not None:
+                if last[0] > timestamp:
+                    return False
+            self._last[key] = (timestamp, time.monotonic())
+            if key in self._pending:
+                self._pending[key] = value
+                return True
+            self._pending[key] = value
+            self._schedule(time.monotonic() + self.delay, "fire", key)
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._run, name=f"{self.name}_timer", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+        return True
+
+    def pop_due(self, now: float = None) -> list[tuple]:
+        """Handle the expired timers, returning the (key, value) to be run.
+
+        Lock must be held.
+        """
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._timers and self._timers[0][0] <= now:
+            _, _, action, key = heapq.heappop(self._timers)
+            if action == "fire":
+                if key in self._running:
+                    self._held.add(key)
+                    continue
+                self._running.add(key)
+                due.append((key, self._pending.pop(key)))
+                self._schedule(now + self.idle_timeout, "evict", key)
+                continue
+            last = self._last.get(key)
+            if (
+                key not in self._pending
+                and last
+                and last[1] + self.idle_timeout <= now
+            ):
+                del self._last[key]
+        return due
+
+    def _run_callback(self, key: Hashable, value) -> None:
+        """Run the callback logging any error, then fire its held value."""
+        try:
+            self.callback(key, value)
+        # pylint: disable=broad-except
+        except Exception as exc:
+            log.error(f"{self.name} failed to handle {key}: {exc}")
+        finally:
+            with self._cond:
+                self._running.discard(key)
+                if key in self._held:
+                    self._held.discard(key)
+                    self._schedule(time.monotonic(), "fire", key)
+                    self._cond.notify()
+
+    def _run(self) -> None:
+        """Timer thread, submit the callbacks of the expired delays."""
+        with self._cond:
+            while not self._stopped:
+                for key, value in self.pop_due():
+                    self._executor.submit(self._run_callback, key, value)
+                timeout = None
+                if self._timers:
+                    timeout = max(self._timers[0][0] - time.monotonic(), 0)
+                self._cond.wait(timeout)
+
+    def stop(self) -> None:
+        """Stop the timer thread, discarding pending values."""
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._timers.clear()
+            self._held.clear()
+            self._cond.notify()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -44,3 +44,7 @@ class DuplicatedNoTagUNI(MEFELineException):
 
     def __repr__(self) -> str:
         return f"DuplicatedNoTagUNI, {self.msg}"
+
+
+class ProfilingError(MEFELineException):
+    """Exception when a profiling session can't be started."""
@@ -0,0 +1,192 @@
+"""Module responsible for the lock contention instrumentation.
+
+InstrumentedLock wraps a threading.Lock recording how long each
+acquisition waited, how long the lock was held and the call site holding
+it. Wait and hold times are observed by the lock name, e.g. "evc" or
+"consistency", in the metrics, and are summarized per call site.
+"""
+import sys
+import time
+from threading import Lock, current_thread
+from typing import Optional
+
+from napps.kytos.mef_eline import metrics, settings
+
+# Upper bounds, in seconds, of the lock wait and hold histogram buckets
+LOCK_BUCKETS = (0.0001, 0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+LOCK_WAIT = metrics.registry.histogram(
+    "mef_eline_lock_wait_seconds",
+    "Time waited to acquire the locks, by lock name.",
+    ("lock",),
+    LOCK_BUCKETS,
+)
+LOCK_HOLD = metrics.registry.histogram(
+    "mef_eline_lock_hold_seconds",
+    "Time the locks were held, by lock name.",
+    ("lock",),
+    LOCK_BUCKETS,
+)
+
+_MODULE_PREFIX = "napps.kytos.mef_eline."
+
+# id(lock) -> InstrumentedLock currently held
+_held: dict[int, "InstrumentedLock"] = {}
+# (lock name, call site) -> [count, wait total, wait max, hold total,
+# hold max]
+_sites: dict[tuple[str, str], list] = {}
+_sites_lock = Lock()
+
+
+def _call_site(depth: int) -> str:
+    """Return module.function:line of the frame depth levels up."""
+    frame = sys._getframe(depth + 1)  # pylint: disable=protected-access
+    module = frame.f_globals.get("__name__", "")
+    if module.startswith(_MODULE_PREFIX):
+        module = module[len(_MODULE_PREFIX):]
+    return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+class InstrumentedLock:
+    """threading.Lock recording wait time, hold time and holder."""
+
+    __slots__ = ("name", "resource", "_lock", "_holder")
+
+    def __init__(self, name: str, resource: str = None):
+        """Create a lock.
+
+        Args:
+            name(str): name of the lock class, e.g. "evc".
+            resource(str): what the lock protects, e.g. the EVC id.
+        """
+        self.name = name
+        self.resource = resource
+        self._lock = Lock()
+        # (thread name, call site, monotonic acquired at, seconds waited)
+        self._holder: Optional[tuple] = None
+
+    def _acquire(self, blocking: bool, timeout: float, depth: int) -> bool:
+        start = time.monotonic()
+        if self._lock.acquire(False):
+            acquired_at = start
+        elif not blocking or not self._lock.acquire(True, timeout):
+            return False
+        else:
+            acquired_at = time.monotonic()
+        self._holder = (
+            current_thread().name, _call_site(depth + 1), acquired_at,
+            acquired_at - start,
+        )
+        _held[id(self)] = self
+        return True
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        """Acquire the lock, like threading.Lock.acquire."""
+        return self._acquire(blocking, timeout, 1)
+
+    def release(self) -> None:
+        """Release the lock, recording how long it was held."""
+        holder, self._holder = self._holder, None
+        _held.pop(id(self), None)
+        self._lock.release()
+        if holder is None:
+            return
+        _, site, acquired_at, waited = holder
+        held = time.monotonic() - acquired_at
+        LOCK_WAIT.observe(waited, lock=self.name)
+        LOCK_HOLD.observe(held, lock=self.name)
+        with _sites_lock:
+            stats = _sites.get((self.name, site))
+            if stats is None:
+                stats = _sites[(self.name, site)] = [0, 0.0, 0.0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += waited
+            stats[2] = max(stats[2], waited)
+            stats[3] += held
+            stats[4] = max(stats[4], held)
+
+    def locked(self) -> bool:
+        """Whether the lock is held."""
+        return self._lock.locked()
+
+    def __enter__(self):
+        self._acquire(True, -1, 1)
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def __repr__(self) -> str:
+        state = "locked" if self.locked() else "unlocked"
+        return f"InstrumentedLock({self.name}, {self.resource}, {state})"
+
+
+def make_lock(name: str, resource: str = None):
+    """Return an InstrumentedLock, or a Lock if instrumentation is off."""
+    if settings.LOCK_INSTRUMENTATION:
+        return InstrumentedLock(name, resource)
+    return Lock()
+
+
+def held_locks(limit: int = None) -> list[dict]:
+    """Return the locks held right now, the longest held first."""
+    now = time.monotonic()
+    result = []
+    for lock in _held.copy().values():
+        holder = lock._holder  # pylint: disable=protected-access
+        if holder is None:
+            continue
+        thread, site, acquired_at, waited = holder
+        result.append({
+            "lock": lock.name,
+            "resource": lock.resource,
+            "thread": thread,
+            "site": site,
+            "held_for": now - acquired_at,
+            "waited": waited,
+        })
+    result.sort(key=lambda item: item["held_for"], reverse=True)
+    return result[:limit]
+
+
+def lock_sites(limit: int = None) -> list[dict]:
+    """Return the wait and hold times per call site, the longest first."""
+    with _sites_lock:
+        sites = [(key, list(stats)) for key, stats in _sites.items()]
+    result = [
+        {
+            "lock": name,
+            "site": site,
+            "count": count,
+            "wait_total": wait_total,
+            "wait_max": wait_max,
+            "hold_total": hold_total,
+            "hold_max": hold_max,
+        }
+        for (name, site), (count, wait_total, wait_max, hold_total, hold_max)
+        in sites
+    ]
+    result.sort(key=lambda item: item["hold_total"], reverse=True)
+    return result[:limit]
+
+
+def reset_lock_sites() -> None:
+    """Clear the call site statistics."""
+    with _sites_lock:
+        _sites.clear()
+
+
+def _held_gauge() -> dict[tuple, float]:
+    """Longest hold time of the locks held right now, by lock name."""
+    longest = {}
+    for item in held_locks():
+        longest.setdefault((item["lock"], ), item["held_for"])
+    return longest
+
+
+metrics.registry.gauge(
+    "mef_eline_lock_longest_held_seconds",
+    "Time the longest held lock of each name has been held right now.",
+    _held_gauge,
+    ("lock",),
+)
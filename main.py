@@ -3,17 +3,20 @@
 
 NApp to provision circuits from user request.
 """
+import json
 import pathlib
 import time
 import traceback
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from threading import Lock
 from typing import Optional
 
 from pydantic import ValidationError
+from starlette.responses import Response, StreamingResponse
 
 from kytos.core import KytosNApp, log, rest
+from kytos.core.common import EntityStatus
 from kytos.core.events import KytosEvent
 from kytos.core.exceptions import KytosTagError
 from kytos.core.helpers import (alisten_to, listen_to, load_spec, now,
@@ -23,17 +26,34 @@ from kytos.core.link import Link
 from kytos.core.rest_api import (HTTPException, JSONResponse, Request,
                                  get_json_or_400)
 from kytos.core.tag_ranges import get_tag_ranges
-from napps.kytos.mef_eline import controllers, settings
+from napps.kytos.mef_eline import (controllers, locks, metrics, profiling,
+                                   settings, tracing)
+from napps.kytos.mef_eline.circuit_buffer import CircuitBuffer
+from napps.kytos.mef_eline.dampening import LinkDampening
+from napps.kytos.mef_eline.db.models import EVCBaseDoc
+from napps.kytos.mef_eline.debouncer import Debouncer
 from napps.kytos.mef_eline.exceptions import (DisabledSwitch,
-                                              DuplicatedNoTagUNI, InvalidPath)
-from napps.kytos.mef_eline.models import (EVC, DynamicPathManager, EVCDeploy,
-                                          Path)
+                                              DuplicatedNoTagUNI,
+                                              FlowModException, InvalidPath,
+                                              ProfilingError)
+from napps.kytos.mef_eline.models import (EVC, CompactPath,
+                                          DynamicPathManager, EVCDeploy, Path)
+from napps.kytos.mef_eline.models.path import (intern_link,
+                                               make_paths_vlans_available)
+from napps.kytos.mef_eline.operations import OperationManager
+from napps.kytos.mef_eline.read_model import EVCReadModel
+from napps.kytos.mef_eline.reoptimization import ReoptimizationQueue
+from napps.kytos.mef_eline.restoration import RestorationTracker
 from napps.kytos.mef_eline.scheduler import CircuitSchedule, Scheduler
 from napps.kytos.mef_eline.utils import (aemit_event, check_disabled_component,
                                          emit_event, get_vlan_tags_and_masks,
+                                         make_uni_tags_available,
                                          map_evc_event_content,
-                                         merge_flow_dicts, prepare_delete_flow,
-                                         send_flow_mods_event)
+                                         merge_flow_dicts,
+                                         prepare_cookie_delete_flows,
+                                         prepare_delete_flow,
+                                         send_flow_mods_event, use_uni_tags)
+from napps.kytos.mef_eline.vlan_pool import SVlanPools
 
 
 # pylint: disable=too-many-public-methods
@@ -56,6 +76,9 @@ class Main(KytosNApp):
         # object used to scheduler circuit events
         self.sched = Scheduler()
 
+        # object used to run and track asynchronous operations
+        self.operations = OperationManager()
+
         # object to save and load circuits
         self.mongo_controller = self.get_eline_controller()
         self.mongo_controller.bootstrap_indexes()
@@ -65,42 +88,143 @@ class Main(KytosNApp):
 
         # dictionary of EVCs created. It acts as a circuit buffer.
         # Every create/update/delete must be synced to mongodb.
-        self.circuits = {}
-
-        self._intf_events = defaultdict(dict)
-        self._lock_interfaces = defaultdict(Lock)
+        self.circuits = CircuitBuffer()
+
+        # serialized non archived EVCs, it's updated on every EVC sync.
+        self.read_model = EVCReadModel()
+
+        # interfaces by id, only cached while EVCs are being loaded
+        self._interface_cache = None
+        # metrics of the last load_all_evcs
+        self.load_stats = {}
+
+        # last interface event by interface id, handled after a delay
+        self._intf_debouncer = Debouncer(
+            self.handle_debounced_interface_event,
+            settings.UNI_STATE_CHANGE_DELAY,
+            settings.INTERFACE_EVENTS_IDLE_TIMEOUT,
+            settings.INTERFACE_EVENTS_MAX_WORKERS,
+            "mef_eline_intf",
+        )
+        # flap penalty of the links going down
+        self.link_dampening = LinkDampening(
+            settings.LINK_FLAP_PENALTY,
+            settings.LINK_FLAP_HALF_LIFE,
+            settings.LINK_FLAP_SUPPRESS_THRESHOLD,
+            settings.LINK_FLAP_REUSE_THRESHOLD,
+        )
+        # active EVCs to be moved back to their primary path on link up
+        self.reoptimization = ReoptimizationQueue(
+            self.reoptimize_to_primary,
+            settings.REOPTIMIZATION_DELAY,
+            settings.REOPTIMIZATION_INTERVAL,
+            settings.REOPTIMIZATION_BATCH_SIZE,
+        )
+        # S-VLANs reserved in advance for the hot links, they're refilled
+        # once the EVCs are loaded
+        self.s_vlan_pools = SVlanPools(
+            self.controller,
+            settings.S_VLAN_POOL_LINKS,
+            settings.S_VLAN_POOL_SIZE,
+            settings.S_VLAN_POOL_LOW_WATERMARK,
+            settings.S_VLAN_POOL_REFILL_INTERVAL,
+        )
+        Path.set_s_vlan_pools(self.s_vlan_pools)
+        # restoration latency of the EVCs affected by link down
+        self.restoration = RestorationTracker(
+            settings.RESTORATION_MAX_SAMPLES,
+            settings.RESTORATION_SUMMARY_TIMEOUT,
+        )
         self.table_group = {"epl": 0, "evpl": 0}
-        self._lock = Lock()
+        self._lock = locks.make_lock("consistency")
+        self.register_metrics()
         self.execute_as_loop(settings.DEPLOY_EVCS_INTERVAL)
 
         self.load_all_evcs()
         self._topology_updated_at = None
 
+    @property
+    def circuits(self) -> CircuitBuffer:
+        """EVCs by id, the circuit buffer."""
+        return self._circuits
+
+    @circuits.setter
+    def circuits(self, circuits: dict) -> None:
+        if not isinstance(circuits, CircuitBuffer):
+            circuits = CircuitBuffer(circuits)
+        # pylint: disable=attribute-defined-outside-init
+        self._circuits = circuits
+
     def get_evcs_by_svc_level(self, enable_filter: bool = True) -> list:
         """Get circuits sorted by desc service level and asc creation_time.
 
-        In the future, as more ops are offloaded it should be get from the DB.
+        The order is kept by the circuit buffer, it isn't sorted each time.
         """
         if enable_filter:
-            return sorted(
-                          [circuit for circuit in self.circuits.values()
-                           if circuit.is_enabled()],
-                          key=lambda x: (-x.service_level, x.creation_time),
-            )
-        return sorted(self.circuits.values(),
-                      key=lambda x: (-x.service_level, x.creation_time))
+            return [
+                circuit for circuit in self.circuits.by_priority()
+                if circuit.is_enabled()
+            ]
+        return self.circuits.by_priority()
 
     @staticmethod
     def get_eline_controller():
         """Return the ELineController instance."""
         return controllers.ELineController()
 
+    def register_metrics(self) -> None:
+        """Register the gauges of the EVCs and the pending queues."""
+        metrics.registry.gauge(
+            "mef_eline_evcs",
+            "Non archived EVCs by state.",
+            self.count_evcs_by_state,
+            ("state",),
+        )
+        queues = {
+            "operations": self.operations.pending,
+            "interface_events": self._intf_debouncer.pending,
+            "reoptimization": lambda: len(self.reoptimization),
+            "restoration": self.restoration.in_progress,
+        }
+        metrics.registry.gauge(
+            "mef_eline_pending",
+            "Items waiting in the mef_eline queues.",
+            lambda: {(name, ): pending() for name, pending in queues.items()},
+            ("queue",),
+        )
+        metrics.registry.gauge(
+            "mef_eline_s_vlan_pool_size",
+            "S-VLANs reserved in the pool of each link.",
+            lambda: {
+                (link_id, ): size
+                for link_id, size in self.s_vlan_pools.levels().items()
+            },
+            ("link",),
+        )
+
+    def count_evcs_by_state(self) -> dict[tuple, int]:
+        """Count the non archived EVCs by state."""
+        counts = {("active", ): 0, ("inactive", ): 0, ("disabled", ): 0}
+        for evc in list(self.circuits.values()):
+            if evc.archived:
+                continue
+            if not evc.is_enabled():
+                counts[("disabled", )] += 1
+            elif evc.is_active():
+                counts[("active", )] += 1
+            else:
+                counts[("inactive", )] += 1
+        return counts
+
+    @profiling.profiled
     def execute(self):
         """Execute once when the napp is running."""
         if self._lock.locked():
             return
         log.debug("Starting consistency routine")
-        with self._lock:
+        self.emit_restoration_summaries(self.restoration.expire())
+        with self._lock, metrics.CONSISTENCY_ROUND.time():
+            self.release_dampened_links()
             self.execute_consistency()
         log.debug("Finished consistency routine")
 
@@ -128,6 +252,11 @@ class Main(KytosNApp):
             if self.should_be_checked(circuit):
                 circuits_to_check.append(circuit)
             circuit.try_setup_failover_path()
+            if circuit.unresolved_paths:
+                log.warning(f"{circuit} has unresolved paths - handling "
+                            "them")
+                with circuit.lock:
+                    circuit.remove_unresolved_paths()
         circuits_checked = EVCDeploy.check_list_traces(circuits_to_check)
         for circuit in circuits_to_check:
             is_checked = circuits_checked.get(circuit.id)
@@ -149,60 +278,128 @@ class Main(KytosNApp):
 
         If you have some cleanup procedure, insert it here.
         """
+        self.operations.shutdown()
+        self._intf_debouncer.stop()
+        self.reoptimization.stop()
+        Path.set_s_vlan_pools(None)
+        self.s_vlan_pools.stop()
 
     @rest("/v2/evc/", methods=["GET"])
     def list_circuits(self, request: Request) -> JSONResponse:
         """Endpoint to return circuits stored.
 
         archive query arg if defined (not null) will be filtered
-        accordingly, by default only non archived evcs will be listed
+        accordingly, by default only non archived evcs will be listed.
+        Non archived evcs are served from the in-memory read model.
+
+        Circuits are sorted by id, "limit" and "after" query args paginate
+        them, "fields" selects a comma separated list of fields and
+        "format=ndjson" streams one circuit per line.
         """
         log.debug("list_circuits /v2/evc")
         args = request.query_params
         archived = args.get("archived", "false").lower()
+        limit, after, fields, ndjson = self._get_list_args(args)
         args = {k: v for k, v in args.items() if k not in {"archived"}}
-        circuits = self.mongo_controller.get_circuits(archived=archived,
-                                                      metadata=args)
+        if archived not in {"true", "null"}:
+            if ndjson:
+                return StreamingResponse(
+                    self.read_model.iter_ndjson(args, limit, after, fields),
+                    media_type="application/x-ndjson",
+                )
+            return Response(
+                self.read_model.list_json(args, limit, after, fields),
+                media_type="application/json",
+            )
+        if ndjson:
+            circuits = self.mongo_controller.iter_circuits(
+                archived, args, limit, after, fields
+            )
+            return StreamingResponse(
+                (json.dumps(circuit, default=str) + "\n"
+                 for circuit in circuits),
+                media_type="application/x-ndjson",
+            )
+        circuits = self.mongo_controller.get_circuits(
+            archived=archived, metadata=args, limit=limit, after=after,
+            fields=fields
+        )
         circuits = circuits['circuits']
         return JSONResponse(circuits)
 
+    @staticmethod
+    def _get_limit_arg(args) -> Optional[int]:
+        """Get the limit query arg, raising 400 if it isn't positive."""
+        limit = args.get("limit")
+        if limit is None:
+            return None
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise HTTPException(
+                400, detail="Parameter limit has an invalid value."
+            )
+        return limit
+
+    @staticmethod
+    def _get_list_args(args) -> tuple:
+        """Get limit, after, fields and whether ndjson was requested.
+
+        Raise 400 if any of them has an invalid value.
+        """
+        limit = Main._get_limit_arg(args)
+        fields = None
+        if args.get("fields"):
+            fields = [field.strip() for field in args["fields"].split(",")]
+            valid_fields = set(EVCBaseDoc.projection()) - {"_id"}
+            invalid = [field for field in fields if field not in valid_fields]
+            if invalid:
+                raise HTTPException(
+                    400, detail=f"Invalid fields: {', '.join(invalid)}"
+                )
+        output_format = args.get("format", "json").lower()
+        if output_format not in {"json", "ndjson"}:
+            raise HTTPException(
+                400, detail="Parameter format has an invalid value."
+            )
+        return limit, args.get("after"), fields, output_format == "ndjson"
+
     @rest("/v2/evc/schedule", methods=["GET"])
-    def list_schedules(self, _request: Request) -> JSONResponse:
+    def list_schedules(self, request: Request) -> JSONResponse:
         """Endpoint to return all schedules stored for all circuits.
 
+        Schedules are served from the in-memory schedule index sorted by
+        schedule id, "limit" and "after" query args paginate them.
+
         Return a JSON with the following template:
         [{"schedule_id": <schedule_id>,
          "circuit_id": <circuit_id>,
          "schedule": <schedule object>}]
         """
         log.debug("list_schedules /v2/evc/schedule")
-        circuits = self.mongo_controller.get_circuits()['circuits'].values()
-        if not circuits:
-            result = {}
-            status = 200
-            return JSONResponse(result, status_code=status)
-
-        result = []
+        args = request.query_params
+        limit = self._get_limit_arg(args)
+        result = self.read_model.list_schedules(limit, args.get("after"))
         status = 200
-        for circuit in circuits:
-            circuit_scheduler = circuit.get("circuit_scheduler")
-            if circuit_scheduler:
-                for scheduler in circuit_scheduler:
-                    value = {
-                        "schedule_id": scheduler.get("id"),
-                        "circuit_id": circuit.get("id"),
-                        "schedule": scheduler,
-                    }
-                    result.append(value)
+        if not self.read_model:
+            result = {}
 
         log.debug("list_schedules result %s %s", result, status)
         return JSONResponse(result, status_code=status)
 
     @rest("/v2/evc/{circuit_id}", methods=["GET"])
     def get_circuit(self, request: Request) -> JSONResponse:
-        """Endpoint to return a circuit based on id."""
+        """Endpoint to return a circuit based on id.
+
+        Non archived circuits are served from the in-memory read model.
+        """
         circuit_id = request.path_params["circuit_id"]
         log.debug("get_circuit /v2/evc/%s", circuit_id)
+        content = self.read_model.get(circuit_id)
+        if content:
+            return Response(content, media_type="application/json")
         circuit = self.mongo_controller.get_circuit(circuit_id)
         if not circuit:
             result = f"circuit_id {circuit_id} not found"
@@ -238,10 +435,14 @@ class Main(KytosNApp):
         creation
 
         Finnaly, notify user of the status of its request.
+
+        If the async query arg is true, the deploy is queued and 202 is
+        returned with an operation_id, check GET /v2/evc/operations/{id}.
         """
         # Try to create the circuit object
         log.debug("create_circuit /v2/evc/")
         data = get_json_or_400(request, self.controller.loop)
+        async_deploy = self._get_bool_query_arg(request, "async")
 
         try:
             evc = self._evc_from_dict(data)
@@ -316,30 +517,36 @@ class Main(KytosNApp):
 
         # Circuit has no schedule, deploy now
         deployed = False
-        if not evc.circuit_scheduler:
-            with evc.lock:
-                deployed = evc.deploy()
+        result = {"circuit_id": evc.id}
+        status = 201
+        if not evc.circuit_scheduler and async_deploy:
+            operation = self.operations.submit(
+                "create", evc.id, self._deploy_circuit, evc
+            )
+            result["operation_id"] = operation.id
+            status = 202
+        elif not evc.circuit_scheduler:
+            deployed = self._deploy_circuit(evc)["deployed"]
 
         # Notify users
-        result = {"circuit_id": evc.id, "deployed": deployed}
-        status = 201
+        result["deployed"] = deployed
         log.debug("create_circuit result %s %s", result, status)
         emit_event(self.controller, name="created",
                    content=map_evc_event_content(evc))
         return JSONResponse(result, status_code=status)
 
     @staticmethod
-    def _use_uni_tags(evc):
-        uni_a = evc.uni_a
-        evc._use_uni_vlan(uni_a)
-        try:
-            uni_z = evc.uni_z
-            evc._use_uni_vlan(uni_z)
-        except KytosTagError as err:
-            evc.make_uni_vlan_available(uni_a)
-            raise err
+    def _deploy_circuit(evc) -> dict:
+        """Deploy a recently created circuit."""
+        with evc.lock:
+            return {"deployed": evc.deploy()}
+
+    def _use_uni_tags(self, evc):
+        """Use the tags of both UNIs of an EVC, all or nothing."""
+        use_uni_tags(self.controller, [evc.uni_a, evc.uni_z])
 
     @listen_to('kytos/flow_manager.flow.removed')
+    @profiling.profiled
     def on_flow_delete(self, event):
         """Capture delete messages to keep track when flows got removed."""
         self.handle_flow_delete(event)
@@ -359,9 +566,13 @@ class Main(KytosNApp):
 
         The EVC attributes (creation_time, active, current_path,
         failover_path, _id, archived) can't be updated.
+
+        If the async query arg is true, the redeploy is queued and 202 is
+        returned with an operation_id, check GET /v2/evc/operations/{id}.
         """
         data = get_json_or_400(request, self.controller.loop)
         circuit_id = request.path_params["circuit_id"]
+        async_deploy = self._get_bool_query_arg(request, "async")
         log.debug("update /v2/evc/%s", circuit_id)
         try:
             evc = self.circuits[circuit_id]
@@ -377,6 +588,8 @@ class Main(KytosNApp):
                 updated_data.get("uni_z")
             )
             enable, redeploy = evc.update(**updated_data)
+            if "service_level" in updated_data:
+                self.circuits.reorder(evc.id)
         except (ValueError, KytosTagError, ValidationError) as exception:
             log.debug("update result %s %s", exception, 400)
             raise HTTPException(400, detail=str(exception)) from exception
@@ -389,6 +602,28 @@ class Main(KytosNApp):
                     409,
                     detail=f"Path is not valid: {exception}"
                 ) from exception
+        if async_deploy:
+            result = {evc.id: evc.as_dict(), "redeployed": False}
+            operation = self.operations.submit(
+                "update", evc.id, self._update_deploy, evc, enable, redeploy
+            )
+            result["operation_id"] = operation.id
+            status = 202
+        else:
+            redeployed = self._update_deploy(
+                evc, enable, redeploy
+            )["redeployed"]
+            result = {evc.id: evc.as_dict(), 'redeployed': redeployed}
+            status = 200
+
+        log.debug("update result %s %s", result, status)
+        emit_event(self.controller, "updated",
+                   content=map_evc_event_content(evc, **data))
+        return JSONResponse(result, status_code=status)
+
+    @staticmethod
+    def _update_deploy(evc, enable, redeploy) -> dict:
+        """Remove, deploy or redeploy an updated EVC accordingly."""
         redeployed = False
         if evc.is_active():
             if enable is False:  # disable if active
@@ -406,13 +641,7 @@ class Main(KytosNApp):
                 with evc.lock:
                     evc.remove()
                     redeployed = evc.deploy()
-        result = {evc.id: evc.as_dict(), 'redeployed': redeployed}
-        status = 200
-
-        log.debug("update result %s %s", result, status)
-        emit_event(self.controller, "updated",
-                   content=map_evc_event_content(evc, **data))
-        return JSONResponse(result, status_code=status)
+        return {"redeployed": redeployed}
 
     @rest("/v2/evc/{circuit_id}", methods=["DELETE"])
     def delete_circuit(self, request: Request) -> JSONResponse:
@@ -481,6 +710,7 @@ class Main(KytosNApp):
             try:
                 evc = self.circuits[_id]
                 evc.extend_metadata(data)
+                self.read_model.update(evc)
             except KeyError:
                 fail_evcs.append(_id)
 
@@ -524,6 +754,7 @@ class Main(KytosNApp):
             try:
                 evc = self.circuits[_id]
                 evc.remove_metadata(key)
+                self.read_model.update(evc)
             except KeyError:
                 fail_evcs.append(_id)
 
@@ -550,15 +781,16 @@ class Main(KytosNApp):
 
     @rest("/v2/evc/{circuit_id}/redeploy", methods=["PATCH"])
     def redeploy(self, request: Request) -> JSONResponse:
-        """Endpoint to force the redeployment of an EVC."""
+        """Endpoint to force the redeployment of an EVC.
+
+        If the async query arg is true, the redeploy is queued and an
+        operation_id is returned, check GET /v2/evc/operations/{id}.
+        """
         circuit_id = request.path_params["circuit_id"]
-        try_avoid_same_s_vlan = request.query_params.get(
-            "try_avoid_same_s_vlan", "true"
+        async_deploy = self._get_bool_query_arg(request, "async")
+        try_avoid_same_s_vlan = self._get_bool_query_arg(
+            request, "try_avoid_same_s_vlan", "true"
         )
-        try_avoid_same_s_vlan = try_avoid_same_s_vlan.lower()
-        if try_avoid_same_s_vlan not in {"true", "false"}:
-            msg = "Parameter try_avoid_same_s_vlan has an invalid value."
-            raise HTTPException(400, detail=msg)
         log.debug("redeploy /v2/evc/%s/redeploy", circuit_id)
         try:
             evc = self.circuits[circuit_id]
@@ -568,15 +800,23 @@ class Main(KytosNApp):
                 detail=f"circuit_id {circuit_id} not found"
             ) from KeyError
         deployed = False
-        if evc.is_enabled():
-            with evc.lock:
-                path_dict = evc.remove_current_flows(
-                    sync=False,
-                    return_path=try_avoid_same_s_vlan == "true"
-                )
-                evc.remove_failover_flows(sync=True)
-                deployed = evc.deploy(path_dict)
-        if deployed:
+        operation = None
+        if evc.is_enabled() and async_deploy:
+            operation = self.operations.submit(
+                "redeploy", evc.id, self._redeploy_circuit, evc,
+                try_avoid_same_s_vlan
+            )
+        elif evc.is_enabled():
+            deployed = self._redeploy_circuit(
+                evc, try_avoid_same_s_vlan
+            )["deployed"]
+        if operation:
+            result = {
+                "response": f"Circuit {circuit_id} redeploy queued.",
+                "operation_id": operation.id,
+            }
+            status = 202
+        elif deployed:
             result = {"response": f"Circuit {circuit_id} redeploy received."}
             status = 202
         else:
@@ -587,6 +827,342 @@ class Main(KytosNApp):
 
         return JSONResponse(result, status_code=status)
 
+    @staticmethod
+    def _redeploy_circuit(evc, try_avoid_same_s_vlan: bool) -> dict:
+        """Remove the flows of an EVC and deploy it again."""
+        with evc.lock:
+            path_dict = evc.remove_current_flows(
+                sync=False,
+                return_path=try_avoid_same_s_vlan
+            )
+            evc.remove_failover_flows(sync=True)
+            return {"deployed": evc.deploy(path_dict)}
+
+    @rest("/v2/evc/operations/{operation_id}", methods=["GET"])
+    def get_operation(self, request: Request) -> JSONResponse:
+        """Endpoint to return the status and result of an operation."""
+        operation_id = request.path_params["operation_id"]
+        log.debug("get_operation /v2/evc/operations/%s", operation_id)
+        operation = self.operations.get(operation_id)
+        if not operation:
+            result = f"operation_id {operation_id} not found"
+            log.debug("get_operation result %s %s", result, 404)
+            raise HTTPException(404, detail=result)
+        return JSONResponse(operation.as_dict())
+
+    # pylint: disable=unused-argument
+    @rest("/v2/metrics", methods=["GET"])
+    def get_metrics(self, request: Request) -> Response:
+        """Endpoint to return the metrics in the Prometheus text format."""
+        return Response(
+            metrics.registry.exposition(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    # pylint: disable=unused-argument
+    @rest("/v2/restoration", methods=["GET"])
+    def get_restoration(self, request: Request) -> JSONResponse:
+        """Endpoint to return the restoration latency after link down.
+
+        Percentiles of the seconds from the link down to the flows
+        dispatched, the deploy completed and the EVC active are returned
+        per service level, with the summaries of the last link downs.
+        """
+        return JSONResponse({
+            "service_levels": self.restoration.percentiles(),
+            "link_downs": list(self.restoration.summaries),
+        })
+
+    @rest("/v2/debug/traces", methods=["GET"])
+    def get_traces(self, request: Request) -> JSONResponse:
+        """Endpoint to return the last traces, newest first.
+
+        Query args filter the traces by their root span "name", e.g.
+        deploy_to_path, "circuit_id" and "min_duration" in seconds, "limit"
+        the number of traces and "format=otlp" returns OTLP JSON instead of
+        span trees.
+        """
+        args = request.query_params
+        limit = self._get_limit_arg(args)
+        try:
+            min_duration = float(args.get("min_duration", 0))
+        except ValueError as err:
+            raise HTTPException(
+                400, detail="Parameter min_duration has an invalid value."
+            ) from err
+        attributes = {}
+        if "circuit_id" in args:
+            attributes["circuit_id"] = args["circuit_id"]
+        log.debug("get_traces /v2/debug/traces %s", dict(args))
+        traces = tracing.tracer.find(
+            args.get("name"), attributes, min_duration, limit
+        )
+        if args.get("format") == "otlp":
+            return JSONResponse({"resourceSpans": [
+                resource_spans for spans in traces for resource_spans in
+                tracing.tracer.as_otlp(spans)["resourceSpans"]
+            ]})
+        return JSONResponse(
+            {"traces": [tracing.tracer.as_tree(spans) for spans in traces]}
+        )
+
+    @rest("/v2/debug/profile", methods=["POST"])
+    def start_profile(self, request: Request) -> JSONResponse:
+        """Endpoint to start profiling the mef_eline handlers.
+
+        The body sets the "mode", sampling or deterministic, the
+        "duration" in seconds, the number of handled "events" and the
+        sampling "interval" in seconds. The session stops when either the
+        duration or the number of events is reached.
+        """
+        data = get_json_or_400(request, self.controller.loop)
+        log.debug("start_profile /v2/debug/profile %s", data)
+        if not isinstance(data, dict):
+            raise HTTPException(400, detail="The body must be an object.")
+        try:
+            status = profiling.profiler.start(
+                data.get("mode", "sampling"),
+                float(data.get("duration", 30)),
+                int(data["events"]) if "events" in data else None,
+                float(data.get("interval", 0.01)),
+            )
+        except (TypeError, ValueError) as exception:
+            log.debug("start_profile result %s %s", exception, 400)
+            raise HTTPException(400, detail=str(exception)) from exception
+        except ProfilingError as exception:
+            log.debug("start_profile result %s %s", exception, 409)
+            raise HTTPException(409, detail=str(exception)) from exception
+        return JSONResponse(status, status_code=201)
+
+    @rest("/v2/debug/profile", methods=["GET"])
+    def get_profile(self, request: Request) -> Response:
+        """Endpoint to return the profile of the last profiling session.
+
+        Deterministic sessions return pstats text sorted by the "sort"
+        query arg and sampling sessions return collapsed stacks, limited
+        to "limit" lines. "format=text" returns only the profile as text.
+        """
+        args = request.query_params
+        limit = self._get_limit_arg(args)
+        session = profiling.profiler.session
+        if session is None:
+            raise HTTPException(404, detail="No profiling session")
+        try:
+            if session.mode == "deterministic":
+                profile = session.pstats(args.get("sort", "cumulative"),
+                                         limit)
+            else:
+                profile = session.collapsed(limit)
+        except ValueError as exception:
+            raise HTTPException(400, detail=str(exception)) from exception
+        if args.get("format") == "text":
+            return Response(profile, media_type="text/plain")
+        return JSONResponse(session.status() | {"profile": profile})
+
+    # pylint: disable=unused-argument
+    @rest("/v2/debug/profile", methods=["DELETE"])
+    def stop_profile(self, request: Request) -> JSONResponse:
+        """Endpoint to stop the running profiling session."""
+        status = profiling.profiler.stop()
+        if status is None:
+            raise HTTPException(404, detail="No profiling session")
+        return JSONResponse(status)
+
+    @rest("/v2/debug/locks", methods=["GET"])
+    def get_locks(self, request: Request) -> JSONResponse:
+        """Endpoint to return the lock contention.
+
+        The locks held right now are returned, the longest held first,
+        and the wait and hold times per call site.
+        """
+        limit = self._get_limit_arg(request.query_params)
+        log.debug("get_locks /v2/debug/locks limit %s", limit)
+        return JSONResponse({
+            "held": locks.held_locks(limit),
+            "sites": locks.lock_sites(limit),
+        })
+
+    @staticmethod
+    def _get_bool_query_arg(
+        request: Request, name: str, default: str = "false"
+    ) -> bool:
+        """Get a boolean query arg, raising 400 if it's not true or false."""
+        value = request.query_params.get(name, default).lower()
+        if value not in {"true", "false"}:
+            msg = f"Parameter {name} has an invalid value."
+            raise HTTPException(400, detail=msg)
+        return value == "true"
+
+    def _get_bulk_evcs(self, data: dict) -> tuple[list, list]:
+        """Get the EVCs of a bulk request and the circuit ids not found.
+
+        EVCs are selected either by circuit_ids or by a metadata filter,
+        which has to match every given key-value pair. The read model
+        metadata index narrows the EVCs compared to the filter.
+        """
+        evcs, fail_evcs = [], []
+        if "circuit_ids" in data:
+            for _id in data["circuit_ids"]:
+                try:
+                    evcs.append(self.circuits[_id])
+                except KeyError:
+                    fail_evcs.append(_id)
+            return evcs, fail_evcs
+
+        metadata = data["metadata"]
+        evc_ids = self.read_model.candidate_ids(metadata)
+        if evc_ids is None:
+            candidates = self.circuits.copy().values()
+        else:
+            candidates = filter(None, map(self.circuits.get, sorted(evc_ids)))
+        for evc in candidates:
+            if all(
+                key in evc.metadata and evc.metadata[key] == value
+                for key, value in metadata.items()
+            ):
+                evcs.append(evc)
+        return evcs, fail_evcs
+
+    def _update_evcs(self, evcs: list) -> None:
+        """Save EVCs with a single bulk write and update the read model."""
+        evc_dicts = [evc.as_dict() for evc in evcs]
+        self.mongo_controller.update_evcs(evc_dicts)
+        for evc, evc_dict in zip(evcs, evc_dicts):
+            self.read_model.update(evc, evc_dict)
+
+    @staticmethod
+    def _send_bulk_cookie_deletions(cookie_switches: dict) -> None:
+        """Remove flows of many EVCs with a single flow_manager request."""
+        flows_by_switch = prepare_cookie_delete_flows(cookie_switches)
+        if not flows_by_switch:
+            return
+        try:
+            EVCDeploy._send_flow_mods(
+                flows_by_switch, "delete", force=True, by_switch=True
+            )
+        except FlowModException as err:
+            log.error(f"Error deleting flows of {len(cookie_switches)} "
+                      f"EVCs in bulk, {err}")
+
+    @rest("/v2/evc/", methods=["DELETE"])
+    @validate_openapi(spec)
+    def bulk_delete_circuits(self, request: Request) -> JSONResponse:
+        """Remove a bulk of circuits.
+
+        The circuits are selected by circuit_ids or by a metadata filter,
+        nothing is done if any of them isn't found. Their flows are removed
+        with a single request to flow_manager, with cookie deletions merged
+        per switch, before their tags are made available, and then the EVCs
+        are archived and saved with a single bulk write.
+        """
+        data = get_json_or_400(request, self.controller.loop)
+        log.debug("bulk_delete_circuits /v2/evc/")
+        evcs, fail_evcs = self._get_bulk_evcs(data)
+        if fail_evcs:
+            raise HTTPException(404, detail=fail_evcs)
+
+        cookie_switches, deleted_evcs = {}, []
+        released_paths, released_unis = [], []
+        for evc in evcs:
+            self.circuits.pop(evc.id, None)
+            with evc.lock:
+                if evc.archived:
+                    continue
+                cookie_switches[evc.get_cookie()] = (
+                    evc.get_flow_removal_switches()
+                )
+                evc.deactivate()
+                evc.disable()
+                self.sched.remove(evc)
+                evc.clear_paths(released_paths=released_paths)
+                evc.archive()
+                released_unis.extend((evc.uni_a, evc.uni_z))
+                deleted_evcs.append(evc)
+
+        self._send_bulk_cookie_deletions(cookie_switches)
+        make_paths_vlans_available(self.controller, released_paths)
+        make_uni_tags_available(self.controller, released_unis)
+        self._update_evcs(deleted_evcs)
+        for evc in deleted_evcs:
+            emit_event(
+                self.controller, "deleted",
+                content=map_evc_event_content(evc)
+            )
+        log.info(f"{len(deleted_evcs)} EVCs removed in bulk.")
+
+        result = {"deleted": [evc.id for evc in deleted_evcs]}
+        status = 200
+        log.debug("bulk_delete_circuits result %s %s", result, status)
+        return JSONResponse(result, status_code=status)
+
+    @rest("/v2/evc/redeploy", methods=["PATCH"])
+    @validate_openapi(spec)
+    def bulk_redeploy(self, request: Request) -> JSONResponse:
+        """Endpoint to force the redeployment of a bulk of EVCs.
+
+        The circuits are selected by circuit_ids or by a metadata filter,
+        nothing is done if any of them isn't found. Their flows are removed
+        with a single request to flow_manager before their S-VLANs are made
+        available, then the EVCs are deployed with at most
+        settings.BULK_REDEPLOY_MAX_WORKERS deployments running concurrently.
+        The result of each EVC is returned once they're all done.
+        """
+        data = get_json_or_400(request, self.controller.loop)
+        try_avoid_same_s_vlan = self._get_bool_query_arg(
+            request, "try_avoid_same_s_vlan", "true"
+        )
+        log.debug("bulk_redeploy /v2/evc/redeploy")
+        evcs, fail_evcs = self._get_bulk_evcs(data)
+        if fail_evcs:
+            raise HTTPException(404, detail=fail_evcs)
+
+        cookie_switches, path_dicts, disabled = {}, {}, []
+        evcs_to_deploy, released_paths = [], []
+        for evc in evcs:
+            with evc.lock:
+                if not evc.is_enabled():
+                    disabled.append(evc.id)
+                    continue
+                cookie_switches[evc.get_cookie()] = (
+                    evc.get_flow_removal_switches()
+                )
+                path_dicts[evc.id] = evc.clear_paths(
+                    return_path=try_avoid_same_s_vlan,
+                    released_paths=released_paths,
+                )
+                # it also keeps the consistency routine away until deployed
+                evc.set_flow_removed_at()
+                evcs_to_deploy.append(evc)
+
+        self._send_bulk_cookie_deletions(cookie_switches)
+        make_paths_vlans_available(self.controller, released_paths)
+        self._update_evcs(evcs_to_deploy)
+
+        def deploy(evc):
+            with evc.lock:
+                try:
+                    return evc.deploy(path_dicts[evc.id])
+                # pylint: disable=broad-except
+                except Exception:
+                    err = traceback.format_exc().replace("\n", ", ")
+                    log.error(f"Error redeploying {evc} in bulk: {err}")
+                    return False
+
+        with ThreadPoolExecutor(
+            max_workers=settings.BULK_REDEPLOY_MAX_WORKERS
+        ) as executor:
+            results = executor.map(deploy, evcs_to_deploy)
+            deployed = dict(zip((evc.id for evc in evcs_to_deploy), results))
+
+        result = {
+            "redeployed": [_id for _id, ok in deployed.items() if ok],
+            "failed": [_id for _id, ok in deployed.items() if not ok],
+            "disabled": disabled,
+        }
+        status = 200
+        log.debug("bulk_redeploy result %s %s", result, status)
+        return JSONResponse(result, status_code=status)
+
     @rest("/v2/evc/schedule/", methods=["POST"])
     @validate_openapi(spec)
     def create_schedule(self, request: Request) -> JSONResponse:
@@ -750,23 +1326,75 @@ class Main(KytosNApp):
                 if uni_z and uni_z.user_tag is None:
                     circuit.check_no_tag_duplicate(uni_z)
 
+    @listen_to("kytos/topology.*", ".*.switch.interface.*")
+    @profiling.profiled
+    def on_topology_change(self, event):  # pylint: disable=unused-argument
+        """Invalidate the cached status of the paths on topology changes."""
+        Path.topology_changed()
+
     @listen_to("kytos/topology.link_up")
+    @profiling.profiled
     def on_link_up(self, event):
         """Change circuit when link is up or end_maintenance."""
         self.handle_link_up(event)
 
     def handle_link_up(self, event):
-        """Change circuit when link is up or end_maintenance."""
-        log.info("Event handle_link_up %s", event.content["link"])
+        """Change circuit when link is up or end_maintenance.
+
+        Links suppressed by flap dampening are skipped, they're handled
+        once they're released by release_dampened_links. Active EVCs that
+        can go back to their primary path are queued to be re-optimized
+        by reoptimize_to_primary, meanwhile they're kept on their current
+        path with its failover path.
+        """
+        link = event.content["link"]
+        log.info("Event handle_link_up %s", link)
+        Path.topology_changed()
+        if self.link_dampening.is_suppressed(link.id):
+            log.info(f"Link {link.id} is suppressed by flap dampening, "
+                     "skipping link up")
+            return
         for evc in self.get_evcs_by_svc_level():
             if evc.is_enabled() and not evc.archived:
+                if (
+                    settings.REOPTIMIZATION_QUEUE
+                    and self._should_reoptimize(evc, link)
+                ):
+                    self.reoptimization.add(evc)
+                    continue
                 with evc.lock:
                     evc.handle_link_up(event.content["link"])
 
+    @staticmethod
+    def _should_reoptimize(evc, link) -> bool:
+        """Whether an active EVC can go back to its primary path."""
+        return bool(
+            evc.is_active()
+            and not evc.is_using_primary_path()
+            and evc.primary_path.is_affected_by_link(link)
+        )
+
+    def reoptimize_to_primary(self, evc):
+        """Move a queued EVC back to its primary path if it's still UP."""
+        with evc.lock:
+            if (
+                evc.archived
+                or not evc.is_enabled()
+                or not evc.is_active()
+                or evc.is_using_primary_path()
+                or evc.primary_path.status is not EntityStatus.UP
+            ):
+                return
+            if evc.deploy_to_primary_path():
+                log.info(f"{evc} moved back to its primary path")
+                emit_event(self.controller, "redeployed_link_up",
+                           content=map_evc_event_content(evc))
+
     # Possibly replace this with interruptions?
     @listen_to(
         '.*.switch.interface.(link_up|link_down|created|deleted)'
     )
+    @profiling.profiled
     def on_interface_link_change(self, event: KytosEvent):
         """
         Handler for interface link_up and link_down events.
@@ -779,38 +1407,29 @@ class Main(KytosNApp):
 
         To avoid multiple database updated (link flap):
         Every interface is identfied and processed in parallel.
-        Once an interface event is received a time is started.
-        While time is running self._intf_events will be updated.
-        After time has passed last received event will be processed.
+        Once an interface event is received a timer is started.
+        While the timer is running newer events replace it and older ones
+        are discarded. After the delay the last event is processed by
+        handle_debounced_interface_event, without blocking this thread.
         """
         iface = event.content.get("interface")
-        with self._lock_interfaces[iface.id]:
-            _now = event.timestamp
-            # Return out of order events
-            if (
-                iface.id in self._intf_events
-                and self._intf_events[iface.id]["event"].timestamp > _now
-            ):
-                return
-            self._intf_events[iface.id].update({"event": event})
-            if "last_acquired" in self._intf_events[iface.id]:
-                return
-            self._intf_events[iface.id].update({"last_acquired": now()})
-        time.sleep(settings.UNI_STATE_CHANGE_DELAY)
-        with self._lock_interfaces[iface.id]:
-            event = self._intf_events[iface.id]["event"]
-            self._intf_events[iface.id].pop('last_acquired', None)
-            _, _, event_type = event.name.rpartition('.')
-            if event_type in ('link_up', 'created'):
-                self.handle_interface_link_up(iface)
-            elif event_type in ('link_down', 'deleted'):
-                self.handle_interface_link_down(iface)
+        self._intf_debouncer.push(iface.id, event, event.timestamp)
+
+    def handle_debounced_interface_event(self, _iface_id, event: KytosEvent):
+        """Handle the last interface event received in the delay."""
+        iface = event.content.get("interface")
+        _, _, event_type = event.name.rpartition('.')
+        if event_type in ('link_up', 'created'):
+            self.handle_interface_link_up(iface)
+        elif event_type in ('link_down', 'deleted'):
+            self.handle_interface_link_down(iface)
 
     def handle_interface_link_up(self, interface):
         """
         Handler for interface link_up events
         """
         log.info("Event handle_interface_link_up %s", interface)
+        Path.topology_changed()
         for evc in self.get_evcs_by_svc_level():
             with evc.lock:
                 evc.handle_interface_link_up(
@@ -822,23 +1441,49 @@ class Main(KytosNApp):
         Handler for interface link_down events
         """
         log.info("Event handle_interface_link_down %s", interface)
+        Path.topology_changed()
         for evc in self.get_evcs_by_svc_level():
             with evc.lock:
                 evc.handle_interface_link_down(
                     interface
                 )
 
+    def release_dampened_links(self):
+        """Release the links whose flap penalty decayed.
+
+        The released links that are up are handled as a link up.
+        """
+        released = self.link_dampening.release()
+        if not released:
+            return
+        Path.set_suppressed_links(self.link_dampening.suppressed())
+        for link in released:
+            log.info(f"Link {link.id} is no longer suppressed by flap "
+                     "dampening")
+            if link.status == EntityStatus.UP:
+                self.handle_link_up(
+                    KytosEvent(name="kytos/mef_eline.link_released",
+                               content={"link": link})
+                )
+
     @listen_to("kytos/topology.link_down", pool="dynamic_single")
+    @profiling.profiled
     def on_link_down(self, event):
         """Change circuit when link is down or under_mantenance."""
         self.handle_link_down(event)
 
     # pylint: disable=too-many-branches
     # pylint: disable=too-many-locals
+    @metrics.LINK_DOWN.time()
     def handle_link_down(self, event):
         """Change circuit when link is down or under_mantenance."""
         link = event.content["link"]
         log.info("Event handle_link_down %s", link)
+        Path.topology_changed()
+        if settings.LINK_FLAP_DAMPENING and self.link_dampening.flap(link):
+            log.warning(f"Link {link.id} is flapping, it's suppressed by "
+                        "flap dampening")
+            Path.set_suppressed_links(self.link_dampening.suppressed())
         switch_flows = {}
         evcs_with_failover = []
         evcs_normal = []
@@ -884,10 +1529,21 @@ class Main(KytosNApp):
                     evc.failover_path = Path([])
                     check_failover.append(evc)
 
+        summaries = self.restoration.start(
+            link.id, event.timestamp,
+            {
+                evc.id: (evc.service_level, "failover")
+                for evc in evcs_with_failover
+            } | {
+                evc.id: (evc.service_level, "redeploy")
+                for evc in evcs_normal
+            },
+        )
         if failover_event_contents:
             emit_event(self.controller, "failover_link_down",
                        content=deepcopy(failover_event_contents))
         send_flow_mods_event(self.controller, switch_flows, 'install')
+        dispatched_at = now()
 
         for evc in evcs_normal:
             emit_event(
@@ -896,16 +1552,18 @@ class Main(KytosNApp):
                 content={"link": link} | map_evc_event_content(evc)
             )
 
-        evcs_to_update = []
         for evc in evcs_with_failover:
-            evcs_to_update.append(evc.as_dict())
             log.info(
                 f"{evc} redeployed with failover due to link down {link.id}"
             )
-        for evc in check_failover:
-            evcs_to_update.append(evc.as_dict())
+            summaries.append(self.restoration.finish(link.id, evc.id, {
+                "dispatched": dispatched_at,
+                "deployed": dispatched_at,
+                "activated": dispatched_at if evc.is_active() else None,
+            }))
+        self.emit_restoration_summaries(summaries)
 
-        self.mongo_controller.update_evcs(evcs_to_update)
+        self._update_evcs(evcs_with_failover + check_failover)
 
         emit_event(
             self.controller,
@@ -914,6 +1572,7 @@ class Main(KytosNApp):
         )
 
     @listen_to("kytos/mef_eline.evc_affected_by_link_down")
+    @profiling.profiled
     def on_evc_affected_by_link_down(self, event):
         """Change circuit when link is down or under_mantenance."""
         self.handle_evc_affected_by_link_down(event)
@@ -926,16 +1585,38 @@ class Main(KytosNApp):
             return
         with evc.lock:
             if not evc.is_affected_by_link(link):
+                self.emit_restoration_summaries([
+                    self.restoration.finish(link.id, evc.id, None)
+                ])
                 return
             result = evc.handle_link_down()
+            deployed_at = now()
+            stages = None
+            if result:
+                stages = {
+                    "dispatched": evc.flows_sent_at,
+                    "deployed": deployed_at,
+                    "activated": deployed_at if evc.is_active() else None,
+                }
         event_name = "error_redeploy_link_down"
         if result:
             log.info(f"{evc} redeployed due to link down {link.id}")
             event_name = "redeployed_link_down"
         emit_event(self.controller, event_name,
                    content=map_evc_event_content(evc))
+        self.emit_restoration_summaries([
+            self.restoration.finish(link.id, evc.id, stages)
+        ])
+
+    def emit_restoration_summaries(self, summaries: list) -> None:
+        """Emit the summary of each link down restoration finished."""
+        for summary in summaries:
+            if summary:
+                emit_event(self.controller, "link_down_restoration",
+                           content=summary)
 
     @listen_to("kytos/mef_eline.(redeployed_link_(up|down)|deployed)")
+    @profiling.profiled
     def on_evc_deployed(self, event):
         """Handle EVC deployed|redeployed_link_down."""
         self.handle_evc_deployed(event)
@@ -948,6 +1629,7 @@ class Main(KytosNApp):
         evc.try_setup_failover_path()
 
     @listen_to("kytos/mef_eline.cleanup_evcs_old_path")
+    @profiling.profiled
     def on_cleanup_evcs_old_path(self, event):
         """Handle cleanup evcs old path."""
         self.handle_cleanup_evcs_old_path(event)
@@ -992,36 +1674,138 @@ class Main(KytosNApp):
                        content=event_contents)
 
     @listen_to("kytos/topology.topology_loaded")
+    @profiling.profiled
     def on_topology_loaded(self, event):  # pylint: disable=unused-argument
         """Load EVCs once the topology is available."""
         self.load_all_evcs()
 
     def load_all_evcs(self):
-        """Try to load all EVCs on startup."""
-        circuits = self.mongo_controller.get_circuits()['circuits'].items()
-        for circuit_id, circuit in circuits:
-            if circuit_id not in self.circuits:
-                self._load_evc(circuit)
-        emit_event(self.controller, "evcs_loaded", content=dict(circuits),
+        """Try to load all EVCs on startup.
+
+        Circuits are streamed from the MongoDB cursor in chunks, which are
+        built in parallel while interface lookups are cached. EVCs are then
+        registered in order by this thread.
+        """
+        start = time.monotonic()
+        circuits = {}
+        stats = {"loaded": 0, "failed": 0}
+        max_workers = settings.LOAD_EVCS_MAX_WORKERS
+        pending = deque()
+        self._interface_cache = {}
+        try:
+            with ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="mef_eline_load"
+            ) as executor:
+                for chunk in self._iter_circuit_chunks(circuits):
+                    pending.append(executor.submit(self._build_evcs, chunk))
+                    if len(pending) > 2 * max_workers:
+                        self._register_evcs(pending.popleft().result(), stats)
+                while pending:
+                    self._register_evcs(pending.popleft().result(), stats)
+        finally:
+            self._interface_cache = None
+        stats["total"] = len(circuits)
+        stats["duration"] = round(time.monotonic() - start, 3)
+        self.load_stats = stats
+        log.info(f"Loaded {stats['loaded']} EVCs ({stats['failed']} failed, "
+                 f"{stats['total']} stored) in {stats['duration']}s")
+        self.s_vlan_pools.reclaim(self._get_pooled_s_vlans(circuits.values()))
+        self.s_vlan_pools.start()
+        emit_event(self.controller, "evcs_loaded", content=circuits,
                    timeout=1)
 
+    def _get_pooled_s_vlans(self, circuits) -> dict[str, set[int]]:
+        """Return the S-VLANs of the circuit dicts by pooled link id."""
+        link_ids = {}
+        for link_id in self.s_vlan_pools.levels():
+            link = self.controller.links.get(link_id)
+            if link:
+                endpoints = frozenset((link.endpoint_a.id, link.endpoint_b.id))
+                link_ids[endpoints] = link_id
+        s_vlans = {link_id: set() for link_id in link_ids.values()}
+        for circuit in circuits:
+            for attribute in ("current_path", "failover_path"):
+                for link_dict in circuit.get(attribute) or []:
+                    endpoints = frozenset((link_dict["endpoint_a"]["id"],
+                                           link_dict["endpoint_b"]["id"]))
+                    s_vlan = (link_dict.get("metadata") or {}).get("s_vlan")
+                    if endpoints in link_ids and s_vlan:
+                        s_vlans[link_ids[endpoints]].add(s_vlan["value"])
+        return s_vlans
+
+    def _iter_circuit_chunks(self, circuits: dict):
+        """Yield chunks of the stored circuits that aren't loaded yet.
+
+        Every circuit streamed is also added to circuits.
+        """
+        chunk = []
+        for circuit in self.mongo_controller.iter_circuits():
+            circuits[circuit["id"]] = circuit
+            if circuit["id"] in self.circuits:
+                continue
+            chunk.append(circuit)
+            if len(chunk) >= settings.LOAD_EVCS_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _build_evcs(self, circuit_dicts: list) -> list[tuple]:
+        """Build the EVCs of a chunk, None for the ones that failed.
+
+        Return a list of (circuit_dict, EVC) tuples.
+        """
+        return [
+            (circuit, self._build_evc(circuit)) for circuit in circuit_dicts
+        ]
+
+    def _register_evcs(self, evcs: list[tuple], stats: dict) -> None:
+        """Register EVCs built by _build_evcs, counting the failed ones."""
+        for circuit, evc in evcs:
+            if evc is None:
+                stats["failed"] += 1
+            elif self._register_evc(evc, circuit):
+                stats["loaded"] += 1
+
     def _load_evc(self, circuit_dict):
         """Load one EVC from mongodb to memory."""
+        evc = self._build_evc(circuit_dict)
+        if not evc:
+            return None
+        return self._register_evc(evc, circuit_dict)
+
+    def _build_evc(self, circuit_dict):
+        """Build an EVC from its stored dict, None if it's invalid.
+
+        Its paths are kept compact until they're first accessed.
+        """
         try:
-            evc = self._evc_from_dict(circuit_dict)
+            return self._evc_from_dict(circuit_dict, lazy_paths=True)
         except (ValueError, KytosTagError) as exception:
             log.error(
                 f"Could not load EVC: dict={circuit_dict} error={exception}"
             )
             return None
+
+    def _register_evc(self, evc, circuit_dict: dict = None):
+        """Add a loaded EVC to the circuits, read model and scheduler.
+
+        The stored circuit_dict, if given, is used by the read model, so
+        lazy paths aren't materialized only to be serialized.
+        """
         if evc.archived:
             return None
 
-        self.circuits.setdefault(evc.id, evc)
+        current = self.circuits.setdefault(evc.id, evc)
+        if current is evc and circuit_dict is not None:
+            self.read_model.update(evc, circuit_dict)
+        else:
+            self.read_model.update(current)
         self.sched.add(evc)
         return evc
 
     @listen_to("kytos/flow_manager.flow.error")
+    @profiling.profiled
     def on_flow_mod_error(self, event):
         """Handle flow mod errors related to an EVC."""
         self.handle_flow_mod_error(event)
@@ -1038,10 +1822,11 @@ class Main(KytosNApp):
                 evc.remove_current_flows(sync=False)
                 evc.remove_failover_flows(sync=True)
 
-    def _evc_dict_with_instances(self, evc_dict):
+    def _evc_dict_with_instances(self, evc_dict, lazy_paths=False):
         """Convert some dict values to instance of EVC classes.
 
-        This method will convert: [UNI, Link]
+        This method will convert: [UNI, Link]. If lazy_paths, paths are
+        converted to CompactPath instead, building their Links on demand.
         """
         data = evc_dict.copy()  # Do not modify the original dict
         for attribute, value in data.items():
@@ -1062,36 +1847,46 @@ class Main(KytosNApp):
             # Get multiple attributes.
             # Ex: primary_links,
             #     backup_links,
-            #     current_links_cache,
-            #     primary_links_cache,
-            #     backup_links_cache
-            if "links" in attribute:
-                data[attribute] = [
-                    self._link_from_dict(link, attribute) for link in value
-                ]
-
-            # Ex: current_path,
+            #     current_path,
             #     primary_path,
             #     backup_path
-            if "path" in attribute and attribute != "dynamic_backup_path":
-                data[attribute] = Path(
-                    [self._link_from_dict(link, attribute) for link in value]
-                )
+            if "links" in attribute or (
+                "path" in attribute and attribute != "dynamic_backup_path"
+            ):
+                if lazy_paths:
+                    data[attribute] = self._compact_path_from_dict(
+                        value, attribute
+                    )
+                else:
+                    data[attribute] = self._path_from_dict(value, attribute)
 
         return data
 
-    def _evc_from_dict(self, evc_dict):
-        data = self._evc_dict_with_instances(evc_dict)
+    def _evc_from_dict(self, evc_dict, lazy_paths=False):
+        data = self._evc_dict_with_instances(evc_dict, lazy_paths)
         data["table_group"] = self.table_group
+        data["read_model"] = self.read_model
         return EVC(self.controller, **data)
 
+    def _get_interface_by_id(self, interface_id: str):
+        """Get an interface, using the cache while EVCs are being loaded."""
+        cache = self._interface_cache
+        if cache is None:
+            return self.controller.get_interface_by_id(interface_id)
+        try:
+            return cache[interface_id]
+        except KeyError:
+            interface = self.controller.get_interface_by_id(interface_id)
+            cache[interface_id] = interface
+            return interface
+
     def _uni_from_dict(self, uni_dict):
         """Return a UNI object from python dict."""
         if uni_dict is None:
             return False
 
         interface_id = uni_dict.get("interface_id")
-        interface = self.controller.get_interface_by_id(interface_id)
+        interface = self._get_interface_by_id(interface_id)
         if interface is None:
             result = (
                 "Error creating UNI:"
@@ -1115,33 +1910,67 @@ class Main(KytosNApp):
         uni = UNI(interface, tag)
         return uni
 
-    def _link_from_dict(self, link_dict: dict, attribute: str) -> Link:
+    def _link_from_dict(self, link_dict: dict) -> Link:
         """Return a Link object from python dict."""
         id_a = link_dict.get("endpoint_a").get("id")
         id_b = link_dict.get("endpoint_b").get("id")
+        return self._link_from_ids(id_a, id_b)
 
-        endpoint_a = self.controller.get_interface_by_id(id_a)
-        endpoint_b = self.controller.get_interface_by_id(id_b)
+    def _link_from_ids(self, id_a: str, id_b: str) -> Link:
+        """Return the shared Link object between two interface ids."""
+        endpoint_a = self._get_interface_by_id(id_a)
+        endpoint_b = self._get_interface_by_id(id_b)
         if not endpoint_a:
             error_msg = f"Could not get interface endpoint_a id {id_a}"
             raise ValueError(error_msg)
         if not endpoint_b:
             error_msg = f"Could not get interface endpoint_b id {id_b}"
             raise ValueError(error_msg)
+        return intern_link(endpoint_a, endpoint_b)
 
-        link = Link(endpoint_a, endpoint_b)
+    @staticmethod
+    def _s_vlan_from_dict(link_dict: dict, attribute: str) -> Optional[TAG]:
+        """Return the S-VLAN of a link dict of current or failover paths."""
         allowed_paths = {"current_path", "failover_path"}
-        if "metadata" in link_dict and attribute in allowed_paths:
-            link.extend_metadata(link_dict.get("metadata"))
-
-        s_vlan = link.get_metadata("s_vlan")
-        if s_vlan:
-            tag = TAG.from_dict(s_vlan)
-            if tag is False:
-                error_msg = f"Could not instantiate tag from dict {s_vlan}"
+        if attribute not in allowed_paths:
+            return None
+        s_vlan = (link_dict.get("metadata") or {}).get("s_vlan")
+        if not s_vlan:
+            return None
+        tag = TAG.from_dict(s_vlan)
+        if tag is False:
+            error_msg = f"Could not instantiate tag from dict {s_vlan}"
+            raise ValueError(error_msg)
+        return tag
+
+    def _path_from_dict(self, links: list[dict], attribute: str) -> Path:
+        """Return a Path from python dicts, with the S-VLAN of each link."""
+        path = Path()
+        for link_dict in links:
+            link = self._link_from_dict(link_dict)
+            path.append(link)
+            s_vlan = self._s_vlan_from_dict(link_dict, attribute)
+            if s_vlan:
+                path.s_vlans[link.id] = s_vlan
+        return path
+
+    def _compact_path_from_dict(
+        self, links: list[dict], attribute: str
+    ) -> CompactPath:
+        """Return a CompactPath from python dicts, validating endpoints."""
+        compact_links = []
+        for link_dict in links:
+            id_a = link_dict.get("endpoint_a").get("id")
+            id_b = link_dict.get("endpoint_b").get("id")
+            if not self._get_interface_by_id(id_a):
+                error_msg = f"Could not get interface endpoint_a id {id_a}"
+                raise ValueError(error_msg)
+            if not self._get_interface_by_id(id_b):
+                error_msg = f"Could not get interface endpoint_b id {id_b}"
                 raise ValueError(error_msg)
-            link.update_metadata("s_vlan", tag)
-        return link
+            s_vlan = self._s_vlan_from_dict(link_dict, attribute)
+            compact_links.append((id_a, id_b, s_vlan))
+        return CompactPath(compact_links, self._link_from_ids)
 
     def _find_evc_by_schedule_id(self, schedule_id):
         """
@@ -1150,20 +1979,8 @@ class Main(KytosNApp):
         :param schedule_id: Schedule ID
         :return: EVC and Schedule
         """
-        circuits = self._get_circuits_buffer()
-        found_schedule = None
-        evc = None
-
-        # pylint: disable=unused-variable
-        for c_id, circuit in circuits.items():
-            for schedule in circuit.circuit_scheduler:
-                if schedule.id == schedule_id:
-                    found_schedule = schedule
-                    evc = circuit
-                    break
-            if found_schedule:
-                break
-        return evc, found_schedule
+        self._get_circuits_buffer()
+        return self.read_model.get_schedule(schedule_id)
 
     def _get_circuits_buffer(self):
         """
@@ -1177,6 +1994,7 @@ class Main(KytosNApp):
             for c_id, circuit in circuits.items():
                 evc = self._evc_from_dict(circuit)
                 self.circuits[c_id] = evc
+                self.read_model.update(evc)
         return self.circuits
 
     # pylint: disable=attribute-defined-outside-init
@@ -0,0 +1,235 @@
+"""Module responsible for the metrics of mef_eline.
+
+Metrics are kept in memory and exposed in the Prometheus text format by
+GET /v2/metrics. Histograms are updated where the time is spent and gauges
+are computed by their callbacks when the metrics are collected.
+"""
+import time
+from bisect import bisect_left
+from functools import wraps
+from threading import Lock
+from typing import Callable, Union
+
+from kytos.core import log
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+def _format_labels(labels: dict) -> str:
+    """Format labels as {name="value",...}, empty if there's none."""
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        value = value.replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Timer:
+    """Observe the duration of a block or a function in a Histogram."""
+
+    def __init__(self, histogram: "Histogram", labels: dict):
+        """Create a Timer of histogram with labels."""
+        self.histogram = histogram
+        self.labels = labels
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.monotonic() - self._start, **self.labels)
+
+    def __call__(self, func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with Timer(self.histogram, self.labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class Histogram:
+    """Cumulative histogram of observed values by labels."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        """Create a Histogram."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = Lock()
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._values: dict[tuple, list] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        """Label values in labelnames order."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} labels must be {self.labelnames}, "
+                f"not {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def observe(self, value: float, **labels) -> None:
+        """Observe a value."""
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(key)
+            if values is None:
+                values = self._values[key] = [0] * (len(self.buckets) + 2)
+            values[index] += 1
+            values[-1] += value
+
+    def time(self, **labels) -> Timer:
+        """Time a block with a with statement or a function decorated."""
+        self._key(labels)
+        return Timer(self, labels)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        """Return the (name, labels, value) samples."""
+        with self._lock:
+            values = {
+                key: list(counts) for key, counts in self._values.items()
+            }
+        samples = []
+        for key, counts in sorted(values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((
+                    f"{self.name}_bucket",
+                    labels | {"le": _format_value(bound)},
+                    cumulative,
+                ))
+            samples.append((f"{self.name}_sum", labels, counts[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Gauge:
+    """Values computed by a callback when the metrics are collected.
+
+    The callback returns a number, or a dict of numbers by label values
+    tuple when the gauge has labels.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable,
+                 labelnames: tuple = ()):
+        """Create a Gauge."""
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        """Return the (name, labels, value) samples."""
+        values: Union[float, dict] = self.callback()
+        if not self.labelnames:
+            return [(self.name, {}, values)]
+        return [
+            (self.name, dict(zip(self.labelnames, key)), value)
+            for key, value in sorted(values.items())
+        ]
+
+
+class MetricsRegistry:
+    """Metrics by name."""
+
+    def __init__(self):
+        """Create an empty registry."""
+        self._metrics: dict[str, Union[Histogram, Gauge]] = {}
+        self._lock = Lock()
+
+    def register(self, metric: Union[Histogram, Gauge]):
+        """Register a metric, replacing the one with the same name."""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str) -> None:
+        """Remove a metric."""
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def histogram(self, name: str, documentation: str,
+                  labelnames: tuple = (),
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        """Register a Histogram."""
+        return self.register(
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def gauge(self, name: str, documentation: str, callback: Callable,
+              labelnames: tuple = ()) -> Gauge:
+        """Register a Gauge."""
+        return self.register(
+            Gauge(name, documentation, callback, labelnames)
+        )
+
+    def exposition(self) -> str:
+        """Return every metric in the Prometheus text format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            # pylint: disable=broad-except
+            except Exception as exc:
+                log.error(f"Failed to collect metric {metric.name}: {exc}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in samples:
+                lines.append(
+                    f"{name}{_format_labels(labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+DEPLOY_TO_PATH = registry.histogram(
+    "mef_eline_deploy_to_path_seconds",
+    "Duration of EVC deployments to a path.",
+)
+EXTERNAL_REQUESTS = registry.histogram(
+    "mef_eline_external_request_seconds",
+    "Duration of the requests to pathfinder, flow_manager and sdntrace_cp.",
+    ("service",),
+)
+LINK_DOWN = registry.histogram(
+    "mef_eline_link_down_seconds",
+    "Duration of the link down handler, including failover.",
+)
+CONSISTENCY_ROUND = registry.histogram(
+    "mef_eline_consistency_round_seconds",
+    "Duration of the consistency routine rounds.",
+)
+MONGO_WRITES = registry.histogram(
+    "mef_eline_mongo_write_seconds",
+    "Duration of the MongoDB writes.",
+    ("operation",),
+)
@@ -1,5 +1,5 @@
 """MEF E-Line models."""
 from .evc import EVC, EVCDeploy, LinkProtection
-from .path import DynamicPathManager, Path
+from .path import CompactPath, DynamicPathManager, Path
 
-__all__ = ["Path", "DynamicPathManager", "EVC"]
+__all__ = ["Path", "CompactPath", "DynamicPathManager", "EVC"]
@@ -3,13 +3,12 @@ import traceback
 from collections import OrderedDict, defaultdict
 from copy import deepcopy
 from datetime import datetime
+from itertools import count
 from operator import eq, ne
-from threading import Lock
 from typing import Union
 from uuid import uuid4
 
 import httpx
-from glom import glom
 from tenacity import (retry, retry_if_exception_type, stop_after_attempt,
                       wait_combine, wait_fixed, wait_random)
 
@@ -19,26 +18,40 @@ from kytos.core.exceptions import KytosNoTagAvailableError, KytosTagError
 from kytos.core.helpers import get_time, now
 from kytos.core.interface import UNI, Interface, TAGRange
 from kytos.core.link import Link
-from kytos.core.retry import before_sleep
 from kytos.core.tag_ranges import range_difference
-from napps.kytos.mef_eline import controllers, settings
+from napps.kytos.mef_eline import controllers, metrics, settings, tracing
 from napps.kytos.mef_eline.exceptions import (ActivationError,
                                               DuplicatedNoTagUNI,
                                               EVCPathNotInstalled,
                                               FlowModException, InvalidPath)
+from napps.kytos.mef_eline.locks import make_lock
 from napps.kytos.mef_eline.utils import (check_disabled_component,
                                          compare_endpoint_trace,
                                          compare_uni_out_trace, emit_event,
-                                         make_uni_list, map_dl_vlan,
+                                         get_trace_masks, make_uni_list,
+                                         map_dl_vlan,
                                          map_evc_event_content,
                                          merge_flow_dicts)
 
-from .path import DynamicPathManager, Path
+from .path import (CompactPath, DynamicPathManager, LazyPathAttribute,
+                   Path, get_link_s_vlan, make_paths_vlans_available)
+
+# Consistency rounds, rotating the sampled masks of TAGRange EVCs
+_TRACE_ROUNDS = count()
 
 
 class EVCBase(GenericEntity):
     """Class to represent a circuit."""
 
+    # Paths can be given as CompactPath, their Links are only built when
+    # they're first accessed
+    primary_links = LazyPathAttribute()
+    backup_links = LazyPathAttribute()
+    current_path = LazyPathAttribute()
+    failover_path = LazyPathAttribute()
+    primary_path = LazyPathAttribute()
+    backup_path = LazyPathAttribute()
+
     attributes_requiring_redeploy = [
         "primary_path",
         "backup_path",
@@ -134,12 +147,14 @@ class EVCBase(GenericEntity):
         self.queue_id = kwargs.get("queue_id", -1)
 
         self.bandwidth = kwargs.get("bandwidth", 0)
-        self.primary_links = Path(kwargs.get("primary_links", []))
-        self.backup_links = Path(kwargs.get("backup_links", []))
-        self.current_path = Path(kwargs.get("current_path", []))
-        self.failover_path = Path(kwargs.get("failover_path", []))
-        self.primary_path = Path(kwargs.get("primary_path", []))
-        self.backup_path = Path(kwargs.get("backup_path", []))
+        # path attribute -> CompactPath that couldn't be materialized
+        self.unresolved_paths: dict[str, CompactPath] = {}
+        for attribute in ("primary_links", "backup_links", "current_path",
+                          "failover_path", "primary_path", "backup_path"):
+            value = kwargs.get(attribute, [])
+            if not isinstance(value, (Path, CompactPath)):
+                value = Path(value)
+            setattr(self, attribute, value)
         self.dynamic_backup_path = kwargs.get("dynamic_backup_path", False)
         self.primary_constraints = kwargs.get("primary_constraints", {})
         self.secondary_constraints = kwargs.get("secondary_constraints", {})
@@ -158,8 +173,10 @@ class EVCBase(GenericEntity):
         self.backup_links_cache = set()
         self.affected_by_link_at = get_time("0001-01-01T00:00:00")
         self.old_path = Path([])
+        # last time flows of a path were sent to flow_manager
+        self.flows_sent_at = None
 
-        self.lock = Lock()
+        self.lock = make_lock("evc", self._id)
 
         self.archived = kwargs.get("archived", False)
 
@@ -186,14 +203,21 @@ class EVCBase(GenericEntity):
         # Special cases: No tag, any, untagged
         self.special_cases = {None, "4096/4096", 0}
         self.table_group = kwargs.get("table_group")
+        # in-memory read model to be kept up to date on every sync
+        self.read_model = kwargs.get("read_model")
 
+    @tracing.traced("sync")
     def sync(self, keys: set = None):
-        """Sync this EVC in the MongoDB."""
+        """Sync this EVC in the MongoDB and in the read model, if any."""
         self.updated_at = now()
+        evc_dict = None
         if keys:
             self._mongo_controller.update_evc(self.as_dict(keys))
-            return
-        self._mongo_controller.upsert_evc(self.as_dict())
+        else:
+            evc_dict = self.as_dict()
+            self._mongo_controller.upsert_evc(evc_dict)
+        if self.read_model:
+            self.read_model.update(self, evc_dict)
 
     def _get_unis_use_tags(self, **kwargs) -> tuple[UNI, UNI]:
         """Obtain both UNIs (uni_a, uni_z).
@@ -708,6 +732,7 @@ class EVCDeploy(EVCBase):
         if sync:
             self.sync()
 
+    @tracing.traced("remove_current_flows")
     def remove_current_flows(
         self,
         current_path=None,
@@ -724,7 +749,7 @@ class EVCDeploy(EVCBase):
 
         if return_path:
             for link in self.current_path:
-                s_vlan = link.metadata.get("s_vlan")
+                s_vlan = get_link_s_vlan(self.current_path, link)
                 if s_vlan:
                     old_path_dict[link.id] = s_vlan.value
 
@@ -757,6 +782,105 @@ class EVCDeploy(EVCBase):
             self.sync()
         return old_path_dict
 
+    def remove_unresolved_paths(self, sync=True) -> None:
+        """Handle the paths that couldn't be materialized.
+
+        An unresolved current path has its flows removed, by cookie, from
+        the UNI switches and the switches of its links, and the EVC is
+        deactivated. An unresolved failover path, with the links that can
+        still be built, is removed by remove_failover_flows, which is also
+        called when the current path is unresolved. The S-VLANs of the
+        links that can still be built are made available. Other unresolved
+        paths were already cleared, they're only logged.
+        """
+        unresolved, self.unresolved_paths = self.unresolved_paths, {}
+        current = unresolved.pop("current_path", None)
+        failover = unresolved.pop("failover_path", None)
+        if unresolved:
+            log.error(f"{self} {', '.join(sorted(unresolved))} couldn't be "
+                      "materialized, they were cleared")
+        if current is None and failover is None:
+            return
+        if failover is not None:
+            self.failover_path = failover.materialize(skip_invalid=True)
+        if current is not None:
+            self._remove_unresolved_current_path(current)
+        self.remove_failover_flows(sync=False)
+        if sync:
+            self.sync()
+
+    def _remove_unresolved_current_path(self, current: CompactPath) -> None:
+        """Remove the flows and S-VLANs of an unresolved current path."""
+        switches = {
+            self.uni_a.interface.switch.id, self.uni_z.interface.switch.id
+        }
+        switches.update(current.switch_ids())
+        flow_mods = {
+            "switches": sorted(switches),
+            "flows": [{
+                "cookie": self.get_cookie(),
+                "cookie_mask": int(0xffffffffffffffff),
+                "owner": "mef_eline",
+            }]
+        }
+        try:
+            self._send_flow_mods(flow_mods, "delete", force=True)
+        except FlowModException as err:
+            log.error(f"Error deleting {self} current_path flows, {err}")
+        make_paths_vlans_available(
+            self._controller, [current.materialize(skip_invalid=True)]
+        )
+        self.deactivate()
+
+    def get_flow_removal_switches(self) -> set[str]:
+        """Return the switches that might have flows with this EVC cookie.
+
+        It's meant to be used when removing flows of many EVCs at once, so
+        the cookie deletions can be merged per switch.
+        """
+        switches = set()
+        if self.current_path or self.is_intra_switch():
+            switches.add(self.uni_a.interface.switch.id)
+            switches.add(self.uni_z.interface.switch.id)
+        for link in self.current_path + self.failover_path:
+            switches.add(link.endpoint_a.switch.id)
+            switches.add(link.endpoint_b.switch.id)
+        return switches
+
+    def clear_paths(
+        self, return_path=False, released_paths: list = None
+    ) -> dict[str, int]:
+        """Release current_path and failover_path without sending FlowMods.
+
+        The flows are expected to have been removed in bulk, check
+        get_flow_removal_switches. It returns the s_vlan of each current_path
+        link if return_path is True. If released_paths is given, the paths
+        are appended to it instead, so the S-VLANs of many EVCs can be made
+        available at once by make_paths_vlans_available.
+        """
+        old_path_dict = {}
+        if return_path:
+            for link in self.current_path:
+                s_vlan = get_link_s_vlan(self.current_path, link)
+                if s_vlan:
+                    old_path_dict[link.id] = s_vlan.value
+
+        if released_paths is not None:
+            released_paths.extend((self.current_path, self.failover_path))
+        else:
+            for path_name in ("current_path", "failover_path"):
+                try:
+                    getattr(self, path_name).make_vlans_available(
+                        self._controller
+                    )
+                except KytosTagError as err:
+                    log.error(f"Error removing {self} {path_name}: {err}")
+        self.current_path = Path([])
+        self.failover_path = Path([])
+        self.deactivate()
+        return old_path_dict
+
+    @tracing.traced("remove_path_flows")
     def remove_path_flows(
         self, path=None, force=True
     ) -> dict[str, list[dict]]:
@@ -866,6 +990,7 @@ class EVCDeploy(EVCBase):
             for interface in interfaces
         }
 
+    @tracing.traced("activate")
     def try_to_activate(self) -> bool:
         """Try to activate the EVC."""
         if self.is_intra_switch():
@@ -900,6 +1025,8 @@ class EVCDeploy(EVCBase):
         return True
 
     # pylint: disable=too-many-branches, too-many-statements
+    @metrics.DEPLOY_TO_PATH.time()
+    @tracing.traced("deploy_to_path", root=True)
     def deploy_to_path(self, path=None, old_path_dict: dict = None):
         """Install the flows for this circuit.
 
@@ -915,6 +1042,7 @@ class EVCDeploy(EVCBase):
         7. Update links caches(primary, current, backup)
 
         """
+        tracing.set_attributes(circuit_id=self.id, circuit_name=self.name)
         self.remove_current_flows(sync=False)
         use_path = path or Path([])
         if not old_path_dict:
@@ -981,6 +1109,7 @@ class EVCDeploy(EVCBase):
                 self.setup_failover_path()
 
     # pylint: disable=too-many-statements
+    @tracing.traced("setup_failover_path", root=True)
     def setup_failover_path(self):
         """Install flows for the failover path of this EVC.
 
@@ -993,6 +1122,7 @@ class EVCDeploy(EVCBase):
         4. Install UNI egress flows
         5. Update failover_path
         """
+        tracing.set_attributes(circuit_id=self.id, circuit_name=self.name)
         # Intra-switch EVCs have no failover_path
         if self.is_intra_switch():
             return False
@@ -1153,6 +1283,7 @@ class EVCDeploy(EVCBase):
             self.uni_a.interface.switch.id, flows
         )
 
+    @tracing.traced("install_direct_uni_flows")
     def _install_direct_uni_flows(self):
         """Install flows connecting two UNIs.
 
@@ -1165,14 +1296,16 @@ class EVCDeploy(EVCBase):
             self._send_flow_mods(flow_mods, "install")
         except FlowModException as err:
             raise EVCPathNotInstalled(str(err)) from err
+        self.flows_sent_at = now()
 
+    @tracing.traced("prepare_nni_flows")
     def _prepare_nni_flows(self, path=None):
         """Prepare NNI flows."""
         nni_flows = OrderedDict()
         previous = self.uni_a.interface.switch.dpid
         for incoming, outcoming in self.links_zipped(path):
-            in_vlan = incoming.get_metadata("s_vlan").value
-            out_vlan = outcoming.get_metadata("s_vlan").value
+            in_vlan = get_link_s_vlan(path, incoming).value
+            out_vlan = get_link_s_vlan(path, outcoming).value
             in_endpoint = self.get_endpoint_by_id(incoming, previous, ne)
             out_endpoint = self.get_endpoint_by_id(
                 outcoming, in_endpoint.switch.id, eq
@@ -1204,6 +1337,7 @@ class EVCDeploy(EVCBase):
             nni_flows[in_endpoint.switch.id] = flows
         return nni_flows
 
+    @tracing.traced("install_flows")
     def _install_flows(
         self, path=None, skip_in=False, skip_out=False
     ) -> dict[str, list[dict]]:
@@ -1223,6 +1357,7 @@ class EVCDeploy(EVCBase):
             self._send_flow_mods(flows_by_switch, "install", by_switch=True)
         except FlowModException as err:
             raise EVCPathNotInstalled(str(err)) from err
+        self.flows_sent_at = now()
 
         return new_flows
 
@@ -1239,6 +1374,7 @@ class EVCDeploy(EVCBase):
         return None
 
     # pylint: disable=too-many-locals
+    @tracing.traced("prepare_uni_flows")
     def _prepare_uni_flows(self, path=None, skip_in=False, skip_out=False):
         """Prepare flows to install UNIs."""
         uni_flows = {}
@@ -1248,10 +1384,10 @@ class EVCDeploy(EVCBase):
 
         # Determine VLANs
         in_vlan_a = self._get_value_from_uni_tag(self.uni_a)
-        out_vlan_a = path[0].get_metadata("s_vlan").value
+        out_vlan_a = get_link_s_vlan(path, path[0]).value
 
         in_vlan_z = self._get_value_from_uni_tag(self.uni_z)
-        out_vlan_z = path[-1].get_metadata("s_vlan").value
+        out_vlan_z = get_link_s_vlan(path, path[-1]).value
 
         # Get endpoints from path
         endpoint_a = self.get_endpoint_by_id(
@@ -1346,7 +1482,7 @@ class EVCDeploy(EVCBase):
         stop=stop_after_attempt(3),
         wait=wait_combine(wait_fixed(3), wait_random(min=2, max=7)),
         retry=retry_if_exception_type(FlowModException),
-        before_sleep=before_sleep,
+        before_sleep=tracing.before_sleep,
         reraise=True,
     )
     def _send_flow_mods(
@@ -1369,17 +1505,24 @@ class EVCDeploy(EVCBase):
         else:
             endpoint = f"{settings.MANAGER_URL}/flows"
             data_content["force"] = force
-        try:
-            if command == "install":
-                res = httpx.post(endpoint, json=data_content, timeout=30)
-            elif command == "delete":
-                res = httpx.request(
-                    "DELETE", endpoint, json=data_content, timeout=30
-                )
-        except httpx.RequestError as err:
-            raise FlowModException(str(err)) from err
-        if res.is_server_error or res.status_code >= 400:
-            raise FlowModException(res.text)
+        with tracing.span(
+            f"flow_manager {command}", **{"url.full": endpoint}
+        ) as span:
+            try:
+                with metrics.EXTERNAL_REQUESTS.time(service="flow_manager"):
+                    if command == "install":
+                        res = httpx.post(
+                            endpoint, json=data_content, timeout=30
+                        )
+                    elif command == "delete":
+                        res = httpx.request(
+                            "DELETE", endpoint, json=data_content, timeout=30
+                        )
+            except httpx.RequestError as err:
+                raise FlowModException(str(err)) from err
+            span.set_attribute("http.response.status_code", res.status_code)
+            if res.is_server_error or res.status_code >= 400:
+                raise FlowModException(res.text)
 
     def get_cookie(self):
         """Return the cookie integer from evc id."""
@@ -1545,15 +1688,23 @@ class EVCDeploy(EVCBase):
                                             "dl_vlan": uni_dl_vlan,
                                             }
             data.append(data_uni)
-        try:
-            response = httpx.put(endpoint, json=data, timeout=30)
-        except httpx.TimeoutException as exception:
-            log.error(f"Request has timed out: {exception}")
-            return {"result": []}
-        if response.status_code >= 400:
-            log.error(f"Failed to run sdntrace-cp: {response.text}")
-            return {"result": []}
-        return response.json()
+        with tracing.span(
+            "sdntrace_cp traces", root=True, traces=len(data),
+            **{"url.full": endpoint}
+        ) as span:
+            try:
+                with metrics.EXTERNAL_REQUESTS.time(service="sdntrace_cp"):
+                    response = httpx.put(endpoint, json=data, timeout=30)
+            except httpx.TimeoutException as exception:
+                log.error(f"Request has timed out: {exception}")
+                span.record_exception(exception)
+                return {"result": []}
+            span.set_attribute("http.response.status_code",
+                               response.status_code)
+            if response.status_code >= 400:
+                log.error(f"Failed to run sdntrace-cp: {response.text}")
+                return {"result": []}
+            return response.json()
 
     # pylint: disable=too-many-return-statements, too-many-arguments
     @staticmethod
@@ -1608,8 +1759,8 @@ class EVCDeploy(EVCBase):
                                         trace_path_begin[1:],
                                         trace_path_end[:0:-1]):
             metadata_vlan = None
-            if link.metadata:
-                metadata_vlan = glom(link.metadata, 's_vlan.value')
+            if s_vlan := get_link_s_vlan(current_path, link):
+                metadata_vlan = s_vlan.value
             if compare_endpoint_trace(
                                         link.endpoint_a,
                                         metadata_vlan,
@@ -1630,10 +1781,15 @@ class EVCDeploy(EVCBase):
         return True
 
     @staticmethod
-    def check_range(circuit, traces: list) -> bool:
-        """Check traces when for UNI with TAGRange"""
+    def check_range(circuit, traces: list, masks: list = None) -> bool:
+        """Check traces when for UNI with TAGRange
+
+        masks are the traced masks, every mask of uni_a by default.
+        """
+        if masks is None:
+            masks = circuit.uni_a.user_tag.mask_list
         check = True
-        for i, mask in enumerate(circuit.uni_a.user_tag.mask_list):
+        for i, mask in enumerate(masks):
             trace_a = traces[i*2]
             trace_z = traces[i*2+1]
             check &= EVCDeploy.check_trace(
@@ -1651,7 +1807,8 @@ class EVCDeploy(EVCBase):
         """Check if current_path is deployed comparing with SDN traces."""
         if not list_circuits:
             return {}
-        uni_list = make_uni_list(list_circuits)
+        trace_round = next(_TRACE_ROUNDS)
+        uni_list = make_uni_list(list_circuits, trace_round)
         traces = EVCDeploy.run_bulk_sdntraces(uni_list)["result"]
 
         if not traces:
@@ -1662,9 +1819,14 @@ class EVCDeploy(EVCBase):
             i = 0
             for circuit in list_circuits:
                 if isinstance(circuit.uni_a.user_tag, TAGRange):
-                    length = len(circuit.uni_a.user_tag.mask_list)
+                    masks = get_trace_masks(
+                        circuit.uni_a.user_tag.mask_list or
+                        circuit.uni_z.user_tag.mask_list,
+                        trace_round
+                    )
+                    length = len(masks)
                     circuits_checked[circuit.id] = EVCDeploy.check_range(
-                        circuit, traces[i:i+length*2]
+                        circuit, traces[i:i+length*2], masks
                     )
                     i += length*2
                 else:
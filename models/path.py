@@ -1,19 +1,92 @@
 """Classes related to paths"""
+from threading import Lock
+from weakref import WeakValueDictionary
+
 import httpx
 from tenacity import (retry, retry_if_exception_type, stop_after_attempt,
                       wait_combine, wait_fixed, wait_random)
 
 from kytos.core import log
 from kytos.core.common import EntityStatus, GenericEntity
+from kytos.core.exceptions import KytosNoTagAvailableError, KytosTagError
 from kytos.core.interface import TAG
 from kytos.core.link import Link
-from kytos.core.retry import before_sleep
-from napps.kytos.mef_eline import settings
+from napps.kytos.mef_eline import metrics, settings, tracing
 from napps.kytos.mef_eline.exceptions import InvalidPath, PathFinderException
+from napps.kytos.mef_eline.utils import merge_tag_ranges
+
+
+_interned_links: "WeakValueDictionary[tuple[str, str], Link]" = (
+    WeakValueDictionary()
+)
+_interned_links_lock = Lock()
+
+
+def intern_link(endpoint_a, endpoint_b) -> Link:
+    """Return the canonical Link between two interfaces.
+
+    The same Link object is shared by every path going through it in the
+    same direction, so per-EVC data such as the S-VLAN must be kept by the
+    Path. Links are released once no path uses them anymore.
+    """
+    key = (endpoint_a.id, endpoint_b.id)
+    with _interned_links_lock:
+        link = _interned_links.get(key)
+        if (
+            link is None
+            or link.endpoint_a is not endpoint_a
+            or link.endpoint_b is not endpoint_b
+        ):
+            link = Link(endpoint_a, endpoint_b)
+            _interned_links[key] = link
+        return link
+
+
+def get_link_s_vlan(path, link):
+    """Return the S-VLAN TAG of a link in a path, if any.
+
+    It's kept by the Path, links that weren't built by mef_eline may still
+    carry it in their metadata.
+    """
+    s_vlans = getattr(path, "s_vlans", None)
+    if s_vlans and link.id in s_vlans:
+        return s_vlans[link.id]
+    return link.get_metadata("s_vlan")
+
+
+def _endpoint_key(endpoint):
+    """Key of an interface in the Path indexes."""
+    return getattr(endpoint, "id", endpoint)
 
 
 class Path(list[Link], GenericEntity):
-    """Class to represent a Path."""
+    """Class to represent a Path.
+
+    The link ids and the links by interface id are indexed, and the status
+    is cached, so the queries done for every EVC on topology events don't
+    scan the links. The indexes are rebuilt after the list is changed and
+    the status is recomputed after Path.topology_changed() is called.
+    """
+
+    # Incremented on every topology change, see topology_changed
+    _topology_version = 0
+    # Ids of the links suppressed by flap dampening, considered DOWN
+    suppressed_links: frozenset = frozenset()
+    # S-VLANs reserved per link, see set_s_vlan_pools
+    s_vlan_pools = None
+
+    def __init__(self, links=(), s_vlans: dict = None):
+        """Create a Path.
+
+        Args:
+            links(list): Links of this path.
+            s_vlans(dict): S-VLAN TAG by link id used by this path.
+        """
+        super().__init__(links)
+        self.s_vlans = s_vlans if s_vlans is not None else {}
+        self._link_ids = None
+        self._interface_links = None
+        self._status_cache = None
 
     def __eq__(self, other=None):
         """Compare paths."""
@@ -21,6 +94,46 @@ class Path(list[Link], GenericEntity):
             return False
         return super().__eq__(other)
 
+    @classmethod
+    def topology_changed(cls):
+        """Invalidate the cached status of every Path."""
+        cls._topology_version += 1
+
+    @classmethod
+    def set_suppressed_links(cls, link_ids: frozenset):
+        """Set the ids of the links suppressed by flap dampening."""
+        if link_ids != cls.suppressed_links:
+            cls.suppressed_links = frozenset(link_ids)
+            cls.topology_changed()
+
+    @classmethod
+    def set_s_vlan_pools(cls, pools):
+        """Set the SVlanPools S-VLANs are taken from and returned to."""
+        cls.s_vlan_pools = pools
+
+    def _invalidate(self):
+        """Drop the indexes and the cached status after a list change."""
+        self._link_ids = None
+        self._interface_links = None
+        self._status_cache = None
+
+    def _build_indexes(self):
+        """Index the link ids and the links by interface id."""
+        link_ids = set()
+        interface_links = {}
+        for link in self:
+            link_ids.add(link.id)
+            for endpoint in (link.endpoint_a, link.endpoint_b):
+                interface_links.setdefault(_endpoint_key(endpoint), link)
+        self._interface_links = interface_links
+        self._link_ids = link_ids
+
+    def __contains__(self, link):
+        """Check if a link with the id of the given link is in this path."""
+        if self._link_ids is None:
+            self._build_indexes()
+        return getattr(link, "id", None) in self._link_ids
+
     def is_affected_by_link(self, link=None):
         """Verify if the current path is affected by link."""
         if not link:
@@ -31,37 +144,22 @@ class Path(list[Link], GenericEntity):
         """Return the link using this interface, if any, or None otherwise."""
         if not interface:
             return None
-        for link in self:
-            if interface in (link.endpoint_a, link.endpoint_b):
-                return link
-        return None
+        if self._interface_links is None:
+            self._build_indexes()
+        return self._interface_links.get(_endpoint_key(interface))
 
+    @tracing.traced("choose_vlans")
     def choose_vlans(self, controller, old_path_dict: dict = None):
-        """Choose the VLANs to be used for the circuit."""
-        old_path_dict = old_path_dict if old_path_dict else {}
-        for link in self:
-            tag_value = link.get_next_available_tag(
-                controller, link.id,
-                try_avoid_value=old_path_dict.get(link.id)
-            )
-            tag = TAG('vlan', tag_value)
-            link.add_metadata("s_vlan", tag)
+        """Choose the VLANs to be used for the circuit.
+
+        If any link has no available VLAN, the ones already chosen are made
+        available again, see choose_paths_vlans.
+        """
+        choose_paths_vlans(controller, [(self, old_path_dict)])
 
     def make_vlans_available(self, controller):
         """Make the VLANs used in a path available when undeployed."""
-        for link in self:
-            tag = link.get_metadata("s_vlan")
-            conflict_a, conflict_b = link.make_tags_available(
-                controller, tag.value, link.id, tag.tag_type,
-                check_order=False
-            )
-            if conflict_a:
-                log.error(f"Tags {conflict_a} was already available in"
-                          f"{link.endpoint_a.id}")
-            if conflict_b:
-                log.error(f"Tags {conflict_b} was already available in"
-                          f"{link.endpoint_b.id}")
-            link.remove_metadata("s_vlan")
+        make_paths_vlans_available(controller, [self])
 
     def is_valid(self, switch_a, switch_z, is_scheduled=False):
         """Check if this is a valid path."""
@@ -102,10 +200,22 @@ class Path(list[Link], GenericEntity):
         ref as topology. If any link in this path isn't UP,
         the path isn't considered UP.
         """
+        version = self._topology_version
+        cache = self._status_cache
+        if cache is not None and cache[0] == version:
+            return cache[1]
+        status = self._compute_status()
+        self._status_cache = (version, status)
+        return status
+
+    def _compute_status(self) -> EntityStatus:
+        """Compute the status of this path, see status."""
         if not self:
             return EntityStatus.DISABLED
 
         for path_link in self:
+            if path_link.id in self.suppressed_links:
+                return EntityStatus.DOWN
             link = path_link.endpoint_a.link
             if not link or link != path_link.endpoint_b.link:
                 return EntityStatus.DOWN
@@ -114,8 +224,271 @@ class Path(list[Link], GenericEntity):
         return EntityStatus.UP
 
     def as_dict(self):
-        """Return list comprehension of links as_dict."""
-        return [link.as_dict() for link in self if link]
+        """Return list comprehension of links as_dict.
+
+        The S-VLAN of each link is added to its metadata.
+        """
+        links = []
+        for link in self:
+            if not link:
+                continue
+            link_dict = link.as_dict()
+            if link.id in self.s_vlans:
+                link_dict["metadata"] = {
+                    **link_dict.get("metadata", {}),
+                    "s_vlan": self.s_vlans[link.id].as_dict(),
+                }
+            links.append(link_dict)
+        return links
+
+
+def choose_paths_vlans(controller, paths: list[tuple[Path, dict]]) -> None:
+    """Choose the S-VLANs of the links of many paths, all or nothing.
+
+    Args:
+        controller(Controller): Kytos controller.
+        paths(list): (path, old_path_dict) to choose S-VLANs for, the
+            old_path_dict has the S-VLAN to be avoided by link id.
+
+    The S-VLAN of a link with a pool is taken from it, the next available
+    tag is only searched if the pool is empty.
+
+    Raises:
+        KytosNoTagAvailableError: if any link has no available VLAN, the
+            S-VLANs chosen by this call are made available again.
+    """
+    pools = Path.s_vlan_pools
+    chosen = []
+    try:
+        for path, old_path_dict in paths:
+            old_path_dict = old_path_dict if old_path_dict else {}
+            for link in path:
+                avoid = old_path_dict.get(link.id)
+                tag_value = None
+                if pools is not None:
+                    tag_value = pools.take(link, try_avoid_value=avoid)
+                if tag_value is None:
+                    tag_value = link.get_next_available_tag(
+                        controller, link.id, try_avoid_value=avoid
+                    )
+                path.s_vlans[link.id] = TAG('vlan', tag_value)
+                chosen.append((path, link))
+    except KytosNoTagAvailableError:
+        _make_links_vlans_available(controller, chosen)
+        raise
+
+
+def make_paths_vlans_available(controller, paths: list[Path]) -> None:
+    """Make the S-VLANs of many paths available.
+
+    The S-VLANs of the paths sharing a link are made available with a
+    single call per link and the conflicts are logged once.
+    """
+    _make_links_vlans_available(
+        controller, [(path, link) for path in paths for link in path]
+    )
+
+
+def _make_links_vlans_available(controller, path_links: list[tuple]):
+    """Make the S-VLANs of (path, link) pairs available, grouped by link.
+
+    S-VLANs of links with a pool go back to it while it isn't full.
+    """
+    pools = Path.s_vlan_pools
+    groups = {}
+    for path, link in path_links:
+        tag = get_link_s_vlan(path, link)
+        if path.s_vlans.pop(link.id, None) is None:
+            link.remove_metadata("s_vlan")
+        if tag is None:
+            continue
+        if (
+            pools is not None
+            and tag.tag_type == "vlan"
+            and isinstance(tag.value, int)
+            and pools.put(link, tag.value)
+        ):
+            continue
+        key = (link.id, tag.tag_type)
+        if key not in groups:
+            groups[key] = (link, tag.tag_type, [])
+        groups[key][2].append(tag.value)
+
+    conflicts, errors = {}, {}
+    for link, tag_type, values in groups.values():
+        unique = list(dict.fromkeys(values))
+        if len(unique) < len(values):
+            errors[link.id] = f"S-VLANs released more than once {values}"
+        for conflict_a, conflict_b in _make_link_tags_available(
+            controller, link, tag_type, unique, errors
+        ):
+            if conflict_a:
+                conflicts.setdefault(link.endpoint_a.id, []).extend(
+                    conflict_a
+                )
+            if conflict_b:
+                conflicts.setdefault(link.endpoint_b.id, []).extend(
+                    conflict_b
+                )
+    if errors:
+        log.error(f"Error making S-VLANs available: {errors}")
+    if conflicts:
+        log.error(f"Tags were already available in {conflicts}")
+
+
+def _make_link_tags_available(
+    controller, link, tag_type: str, values: list, errors: dict
+) -> list[tuple]:
+    """Make unique tags of a link available, returning the conflicts.
+
+    They're made available with a single call and, if it fails, one at a
+    time, so one invalid tag doesn't keep the others in use. Errors are
+    added to errors by link id.
+    """
+    try:
+        tags = values[0]
+        if len(values) > 1:
+            tags = merge_tag_ranges([[value, value] for value in values])
+        return [link.make_tags_available(
+            controller, tags, link.id, tag_type, check_order=False
+        )]
+    except KytosTagError as err:
+        if len(values) == 1:
+            errors[link.id] = str(err)
+            return []
+    results = []
+    for value in values:
+        try:
+            results.append(link.make_tags_available(
+                controller, value, link.id, tag_type, check_order=False
+            ))
+        except KytosTagError as err:
+            errors[link.id] = f"{errors.get(link.id, '')} {err}".strip()
+    return results
+
+
+def _invalidating(name: str):
+    """Wrap a list method that changes the links of a Path."""
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._invalidate()  # pylint: disable=protected-access
+        return result
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in (
+    "__setitem__", "__delitem__", "__iadd__", "__imul__", "append",
+    "extend", "insert", "pop", "remove", "clear", "sort", "reverse",
+):
+    setattr(Path, _name, _invalidating(_name))
+
+
+class CompactPath:
+    """Id based representation of a stored path.
+
+    It keeps (endpoint_a id, endpoint_b id, S-VLAN TAG or None) per link
+    and the function to build a Link from them, so Link objects are only
+    created when the path is materialized.
+    """
+
+    __slots__ = ("links", "link_builder")
+
+    def __init__(self, links: list[tuple], link_builder):
+        """Create a CompactPath.
+
+        Args:
+            links(list): (endpoint_a id, endpoint_b id, s_vlan) per link.
+            link_builder(callable): link_builder(id_a, id_b) returns a Link
+                or raises ValueError.
+        """
+        self.links = tuple(links)
+        self.link_builder = link_builder
+
+    def __len__(self):
+        return len(self.links)
+
+    def materialize(self, skip_invalid: bool = False) -> Path:
+        """Build the Path.
+
+        Args:
+            skip_invalid(bool): skip the links that can't be built instead
+                of raising ValueError.
+
+        Raises:
+            ValueError: if a link can't be built and skip_invalid is False.
+        """
+        path = Path()
+        for id_a, id_b, s_vlan in self.links:
+            try:
+                link = self.link_builder(id_a, id_b)
+            except ValueError:
+                if skip_invalid:
+                    continue
+                raise
+            path.append(link)
+            if s_vlan:
+                path.s_vlans[link.id] = s_vlan
+        return path
+
+    def switch_ids(self) -> set[str]:
+        """Ids of the switches of every link endpoint, even invalid ones."""
+        return {
+            interface_id.rsplit(":", 1)[0]
+            for id_a, id_b, _ in self.links
+            for interface_id in (id_a, id_b)
+        }
+
+
+class LazyPathAttribute:
+    """Path attribute that materializes a CompactPath on first access.
+
+    If the CompactPath can't be materialized, e.g. an interface of it is
+    gone, the attribute becomes an empty Path and the CompactPath is kept
+    in the unresolved_paths dict of the object, so its flows and S-VLANs
+    can still be removed.
+    """
+
+    _lock = Lock()
+
+    def __set_name__(self, owner, name):
+        self.name = name  # pylint: disable=attribute-defined-outside-init
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name]
+        if isinstance(value, CompactPath):
+            with self._lock:
+                value = obj.__dict__[self.name]
+                if isinstance(value, CompactPath):
+                    value = self._materialize(obj, value)
+                    obj.__dict__[self.name] = value
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
+
+    def _materialize(self, obj, compact: CompactPath) -> Path:
+        """Materialize compact, keeping it as unresolved if it fails."""
+        try:
+            return compact.materialize()
+        except ValueError as err:
+            log.error(
+                f"Could not materialize {self.name} of {obj}: {err}. Its "
+                "flows and S-VLANs will be removed by the consistency routine"
+            )
+            obj.unresolved_paths[self.name] = compact
+            return Path([])
+
+    @staticmethod
+    def is_materialized(obj, name: str) -> bool:
+        """Whether the path attribute name of obj is materialized."""
+        return not isinstance(obj.__dict__.get(name), CompactPath)
 
 
 class DynamicPathManager:
@@ -133,7 +506,7 @@ class DynamicPathManager:
         stop=stop_after_attempt(3),
         wait=wait_combine(wait_fixed(3), wait_random(min=0, max=5)),
         retry=retry_if_exception_type(PathFinderException),
-        before_sleep=before_sleep,
+        before_sleep=tracing.before_sleep,
         reraise=True
     )
     def get_paths(circuit, max_paths=2, **kwargs) -> list[dict]:
@@ -147,15 +520,29 @@ class DynamicPathManager:
             "spf_attribute": spf_attribute
         }
         request_data.update(kwargs)
-        try:
-            api_reply = httpx.post(endpoint, json=request_data, timeout=10)
-        except httpx.RequestError as err:
-            raise PathFinderException(str(err)) from err
-
-        if api_reply.status_code >= 400:
-            raise PathFinderException(api_reply.text)
-        reply_data = api_reply.json()
-        return reply_data.get("paths", [])
+        if Path.suppressed_links:
+            request_data["undesired_links"] = sorted(
+                Path.suppressed_links.union(
+                    request_data.get("undesired_links") or []
+                )
+            )
+        with tracing.span(
+            "pathfinder paths", **{"url.full": endpoint}
+        ) as span:
+            try:
+                with metrics.EXTERNAL_REQUESTS.time(service="pathfinder"):
+                    api_reply = httpx.post(endpoint, json=request_data,
+                                           timeout=10)
+            except httpx.RequestError as err:
+                raise PathFinderException(str(err)) from err
+            span.set_attribute("http.response.status_code",
+                               api_reply.status_code)
+
+            if api_reply.status_code >= 400:
+                raise PathFinderException(api_reply.text)
+            reply_data = api_reply.json()
+            span.set_attribute("paths", len(reply_data.get("paths", [])))
+            return reply_data.get("paths", [])
 
     @staticmethod
     def _clear_path(path):
@@ -292,6 +679,6 @@ class DynamicPathManager:
             interface_b = cls.controller.get_interface_by_id(link[1])
             if interface_a is None or interface_b is None:
                 return None
-            new_path.append(Link(interface_a, interface_b))
+            new_path.append(intern_link(interface_a, interface_b))
 
         return new_path
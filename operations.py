@@ -0,0 +1,144 @@
+"""Module responsible for tracking asynchronous EVC operations."""
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Optional
+from uuid import uuid4
+
+from kytos.core import log
+from kytos.core.helpers import now
+from napps.kytos.mef_eline import settings
+
+
+class Operation:
+    """Asynchronous operation over an EVC, such as a deploy."""
+
+    def __init__(self, action: str, circuit_id: str):
+        """Create an Operation object.
+
+        Args:
+            action(str): Operation action, such as 'create' or 'redeploy'.
+            circuit_id(str): The id of the EVC this operation is about.
+        """
+        self.id = uuid4().hex  # pylint: disable=invalid-name
+        self.action = action
+        self.circuit_id = circuit_id
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = now()
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self):
+        """Mark this operation as running."""
+        self.status = "running"
+        self.started_at = now()
+
+    def finish(self, result: dict = None, error: str = None):
+        """Mark this operation as finished or failed if there's an error."""
+        self.result = result
+        self.error = error
+        self.status = "failed" if error else "finished"
+        self.finished_at = now()
+
+    def is_done(self) -> bool:
+        """Whether this operation has finished or failed."""
+        return self.status in {"finished", "failed"}
+
+    def as_dict(self) -> dict:
+        """Return a dictionary representing an operation."""
+        time_fmt = "%Y-%m-%dT%H:%M:%S"
+        op_dict = {
+            "id": self.id,
+            "action": self.action,
+            "circuit_id": self.circuit_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+        }
+        for attr in ("created_at", "started_at", "finished_at"):
+            value = getattr(self, attr)
+            if isinstance(value, datetime):
+                value = value.strftime(time_fmt)
+            op_dict[attr] = value
+        return op_dict
+
+
+class OperationManager:
+    """Run EVC operations in background keeping track of their status.
+
+    Finished operations are kept up to max_kept, the oldest are discarded
+    first.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.ASYNC_DEPLOY_MAX_WORKERS,
+        max_kept: int = settings.OPERATIONS_MAX_KEPT,
+    ):
+        """Create a new OperationManager."""
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="mef_eline_op"
+        )
+        self._operations: OrderedDict[str, Operation] = OrderedDict()
+        self._lock = Lock()
+        self.max_kept = max_kept
+
+    def submit(
+        self, action: str, circuit_id: str, func: Callable, *args
+    ) -> Operation:
+        """Queue func(*args) to be run as a new operation.
+
+        The value returned by func becomes the operation result.
+        """
+        operation = Operation(action, circuit_id)
+        with self._lock:
+            self._operations[operation.id] = operation
+            self._discard_old()
+        self._executor.submit(self._run, operation, func, *args)
+        return operation
+
+    @staticmethod
+    def _run(operation: Operation, func: Callable, *args) -> None:
+        """Run an operation."""
+        operation.start()
+        try:
+            result = func(*args)
+        # pylint: disable=broad-except
+        except Exception as exc:
+            err = traceback.format_exc().replace("\n", ", ")
+            log.error(f"Operation {operation.id} {operation.action} on EVC "
+                      f"{operation.circuit_id} failed: {err}")
+            operation.finish(error=str(exc) or exc.__class__.__name__)
+            return
+        operation.finish(result=result)
+
+    def _discard_old(self) -> None:
+        """Discard the oldest finished operations beyond max_kept."""
+        excess = len(self._operations) - self.max_kept
+        if excess <= 0:
+            return
+        for op_id in list(self._operations):
+            if excess <= 0:
+                break
+            if self._operations[op_id].is_done():
+                del self._operations[op_id]
+                excess -= 1
+
+    def get(self, operation_id: str) -> Optional[Operation]:
+        """Get an operation by id."""
+        return self._operations.get(operation_id)
+
+    def pending(self) -> int:
+        """Return the number of queued or running operations."""
+        with self._lock:
+            return sum(
+                1 for op in self._operations.values() if not op.is_done()
+            )
+
+    def shutdown(self) -> None:
+        """Shutdown the operations executor without waiting."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,308 @@
+"""Module responsible for the on-demand profiling of mef_eline handlers.
+
+A profiling session runs for a duration or a number of handled events,
+whichever comes first, and only covers the functions decorated with
+profiled, i.e. the event handlers and the consistency routine:
+
+- "deterministic" profiles every call with cProfile and aggregates them
+  in pstats, so its overhead is capped by the duration and events limits.
+- "sampling" takes the stack of the threads running a handler every
+  interval seconds and aggregates them as collapsed stacks, the format of
+  flamegraph.pl and speedscope. The interval is doubled whenever taking
+  samples uses more than max_overhead of the time.
+"""
+import cProfile
+import io
+import pstats
+import sys
+import time
+from collections import Counter
+from functools import wraps
+from threading import Event, Lock, Thread, get_ident, local
+from typing import Callable, Optional
+
+from kytos.core import log
+from napps.kytos.mef_eline import settings
+from napps.kytos.mef_eline.exceptions import ProfilingError
+
+MODES = ("deterministic", "sampling")
+SORT_KEYS = ("cumulative", "tottime", "calls", "pcalls", "name", "filename")
+
+# Frames kept per sampled stack, from the handler down
+MAX_STACK_DEPTH = 128
+# Longest interval the sampling interval backs off to
+MAX_INTERVAL = 1.0
+
+
+def _frame_name(frame) -> str:
+    """Return module:function of a frame."""
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_name}"
+
+
+class ProfilingSession:
+    """A profiling session of the mef_eline handlers."""
+
+    def __init__(self, mode: str, duration: float, events: int,
+                 interval: float, max_overhead: float):
+        """Create a session, see Profiler.start."""
+        self.mode = mode
+        self.duration = duration
+        self.max_events = events
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.started_at = time.time()
+        self.stopped_at = None
+        self.stop_reason = None
+        self.events = 0
+        self.completed = 0
+        self.skipped = 0
+        self.samples = 0
+        self.stats: Optional[pstats.Stats] = None
+        self.stacks: Counter = Counter()
+        # thread id -> frame of the handler it's running
+        self._active: dict[int, object] = {}
+        self._lock = Lock()
+        self._stopped = Event()
+        self._local = local()
+        self._thread = Thread(
+            target=self._run, name="mef_eline_profiler", daemon=True
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether the session is still running."""
+        return not self._stopped.is_set()
+
+    def start(self) -> None:
+        """Start the thread that samples and stops the session."""
+        self._thread.start()
+
+    def stop(self, reason: str) -> None:
+        """Stop the session."""
+        with self._lock:
+            if self._stopped.is_set():
+                return
+            self.stop_reason = reason
+            self.stopped_at = time.time()
+            self._stopped.set()
+
+    def _claim(self) -> bool:
+        """Claim an event to be profiled, False if the limit is reached."""
+        if getattr(self._local, "depth", 0):
+            return False
+        with self._lock:
+            if self._stopped.is_set() or self.events >= self.max_events:
+                return False
+            self.events += 1
+            return True
+
+    def _complete(self) -> None:
+        with self._lock:
+            self.completed += 1
+            completed = self.completed
+        if completed >= self.max_events:
+            self.stop("events")
+
+    def run(self, func: Callable, args: tuple, kwargs: dict):
+        """Run a handler, profiling it if the session has room for it."""
+        if not self._claim():
+            return func(*args, **kwargs)
+        self._local.depth = 1
+        try:
+            if self.mode == "deterministic":
+                return self._run_deterministic(func, args, kwargs)
+            # pylint: disable=protected-access
+            self._active[get_ident()] = sys._getframe()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                del self._active[get_ident()]
+        finally:
+            self._local.depth = 0
+            self._complete()
+
+    def _run_deterministic(self, func: Callable, args: tuple, kwargs: dict):
+        """Run a handler with its own cProfile, then aggregate it."""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # another profiler is active, e.g. from another handler thread
+            # on Python versions with a single profiler per process
+            with self._lock:
+                self.skipped += 1
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._lock:
+                if self.stats is None:
+                    self.stats = pstats.Stats(profile)
+                else:
+                    self.stats.add(profile)
+
+    def _sample(self) -> None:
+        """Take the stacks of the threads running a handler."""
+        frames = sys._current_frames()  # pylint: disable=protected-access
+        for thread_id, entry in self._active.copy().items():
+            frame = frames.get(thread_id)
+            stack = []
+            while frame is not None and frame is not entry:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if frame is None or not stack:
+                continue
+            self.stacks[";".join(reversed(stack[-MAX_STACK_DEPTH:]))] += 1
+            self.samples += 1
+
+    def _run(self) -> None:
+        """Sample until the session is stopped or its duration is over."""
+        deadline = time.monotonic() + self.duration
+        started, busy = time.monotonic(), 0.0
+        while self.running:
+            now = time.monotonic()
+            if now >= deadline:
+                self.stop("duration")
+                break
+            if self.mode == "sampling":
+                begin = time.thread_time()
+                self._sample()
+                busy += time.thread_time() - begin
+                elapsed = time.monotonic() - started
+                if (
+                    elapsed >= 1
+                    and busy > self.max_overhead * elapsed
+                    and self.interval < MAX_INTERVAL
+                ):
+                    started, busy = time.monotonic(), 0.0
+                    self.interval = min(self.interval * 2, MAX_INTERVAL)
+                    log.warning(
+                        "Profiling overhead above "
+                        f"{self.max_overhead:.0%}, sampling every "
+                        f"{self.interval}s"
+                    )
+                wait = self.interval
+            else:
+                wait = deadline - now
+            self._stopped.wait(min(wait, max(deadline - now, 0)))
+
+    def status(self) -> dict:
+        """Return the session parameters and counters."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "running": self.running,
+                "started_at": self.started_at,
+                "stopped_at": self.stopped_at,
+                "stop_reason": self.stop_reason,
+                "duration": self.duration,
+                "max_events": self.max_events,
+                "events": self.events,
+                "skipped": self.skipped,
+                "samples": self.samples,
+                "interval": self.interval,
+            }
+
+    def pstats(self, sort: str = "cumulative", limit: int = None) -> str:
+        """Return the aggregated profile as pstats text."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        with self._lock:
+            if self.stats is None:
+                return ""
+            stream = io.StringIO()
+            self.stats.stream = stream
+            self.stats.sort_stats(sort)
+            if limit:
+                self.stats.print_stats(limit)
+            else:
+                self.stats.print_stats()
+            return stream.getvalue()
+
+    def collapsed(self, limit: int = None) -> str:
+        """Return the sampled stacks as collapsed stacks, most common first."""
+        with self._lock:
+            stacks = self.stacks.most_common(limit)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+class Profiler:
+    """Start and stop profiling sessions, one at a time."""
+
+    def __init__(self, max_duration: float = 300, max_events: int = 10000,
+                 min_interval: float = 0.001, max_overhead: float = 0.05):
+        """Create a profiler with the limits of its sessions."""
+        self.max_duration = max_duration
+        self.max_events = max_events
+        self.min_interval = min_interval
+        self.max_overhead = max_overhead
+        self.session: Optional[ProfilingSession] = None
+        self._lock = Lock()
+
+    def start(self, mode: str = "sampling", duration: float = 30,
+              events: int = None, interval: float = 0.01) -> dict:
+        """Start a profiling session.
+
+        Args:
+            mode(str): "sampling" or "deterministic".
+            duration(float): seconds to profile, up to max_duration.
+            events(int): handled events to profile, up to max_events.
+            interval(float): seconds between samples, at least
+                min_interval.
+
+        Raises:
+            ValueError: if an argument is invalid.
+            ProfilingError: if a session is already running.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        if not 0 < duration <= self.max_duration:
+            raise ValueError(
+                f"duration must be between 0 and {self.max_duration}"
+            )
+        events = self.max_events if events is None else events
+        if not 0 < events <= self.max_events:
+            raise ValueError(f"events must be between 1 and {self.max_events}")
+        if interval < self.min_interval:
+            raise ValueError(f"interval must be at least {self.min_interval}")
+        with self._lock:
+            if self.session and self.session.running:
+                raise ProfilingError("A profiling session is already running")
+            self.session = ProfilingSession(
+                mode, duration, events, interval, self.max_overhead
+            )
+            self.session.start()
+            return self.session.status()
+
+    def stop(self) -> Optional[dict]:
+        """Stop the running session, return its status."""
+        session = self.session
+        if session is None:
+            return None
+        session.stop("stopped")
+        return session.status()
+
+    def run(self, func: Callable, args: tuple, kwargs: dict):
+        """Run a handler in the running session, if there's one."""
+        session = self.session
+        if session is None or not session.running:
+            return func(*args, **kwargs)
+        return session.run(func, args, kwargs)
+
+
+profiler = Profiler(
+    settings.PROFILING_MAX_DURATION,
+    settings.PROFILING_MAX_EVENTS,
+    settings.PROFILING_MIN_INTERVAL,
+    settings.PROFILING_MAX_OVERHEAD,
+)
+
+
+def profiled(func: Callable) -> Callable:
+    """Decorate a handler to be profiled by the profiling sessions."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return profiler.run(func, args, kwargs)
+    return wrapper
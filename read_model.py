@@ -0,0 +1,277 @@
+"""Module responsible for the in-memory read model of EVCs."""
+import json
+from bisect import bisect_right
+from collections import defaultdict
+from collections.abc import Hashable
+from datetime import datetime
+from threading import Lock
+from typing import Iterator, Optional
+
+TIME_FMT = "%Y-%m-%dT%H:%M:%S"
+METADATA_OPTIONS = {"null": None, "true": True, "false": False}
+
+
+def _json_default(value):
+    """Serialize values that json doesn't handle, such as datetime."""
+    if isinstance(value, datetime):
+        return value.strftime(TIME_FMT)
+    return str(value)
+
+
+def _metadata_filter_value(value: str):
+    """Convert a metadata query arg value like ELineController does."""
+    try:
+        return int(value)
+    except ValueError:
+        return METADATA_OPTIONS.get(value.lower(), value)
+
+
+class EVCReadModel:
+    """In-memory read model of the non archived EVCs.
+
+    Each EVC is kept already serialized as JSON, the same way it's returned
+    by the EVCBaseDoc projection, so GET requests don't need to hit MongoDB.
+    It must be updated on every EVC state change that's stored.
+    """
+
+    def __init__(self):
+        """Create an empty read model."""
+        self._lock = Lock()
+        # evc_id -> (metadata index keys, serialized JSON, schedule ids)
+        self._evcs: dict[str, tuple[frozenset, bytes, tuple]] = {}
+        # (metadata.<key>, is_bool, value) -> evc ids, inverted index used
+        # to filter by metadata without scanning every EVC
+        self._metadata_index: dict[tuple, set[str]] = defaultdict(set)
+        # schedule_id -> (EVC, CircuitSchedule)
+        self._schedules: dict[str, tuple] = {}
+
+    @staticmethod
+    def _index_key(key: str, value) -> tuple:
+        """Key of the metadata index, bools aren't mixed with 0 and 1."""
+        return (key, isinstance(value, bool), value)
+
+    @classmethod
+    def _metadata_keys(cls, value, key: str = "metadata"):
+        """Yield the index keys of every hashable metadata leaf value.
+
+        Like MongoDB queries, a key also matches each element of a list
+        value, the keys of its dict elements and its positional keys,
+        e.g. {"l": [1, {"a": 2}]} is indexed by metadata.l 1,
+        metadata.l.a 2, metadata.l.0 1 and metadata.l.1.a 2.
+        """
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                yield from cls._metadata_keys(sub_value, f"{key}.{sub_key}")
+        elif isinstance(value, list):
+            for position, item in enumerate(value):
+                if isinstance(item, dict):
+                    yield from cls._metadata_keys(item, key)
+                elif isinstance(item, Hashable):
+                    yield cls._index_key(key, item)
+                yield from cls._metadata_keys(item, f"{key}.{position}")
+        elif isinstance(value, Hashable):
+            yield cls._index_key(key, value)
+
+    def update(self, evc, evc_dict: dict = None) -> None:
+        """Update the serialized EVC, removing it if it's archived.
+
+        Args:
+            evc(EVC): The EVC to be serialized.
+            evc_dict(dict): evc.as_dict() if it's already computed.
+        """
+        if evc.archived:
+            self.remove(evc.id)
+            return
+        if evc_dict is None:
+            evc_dict = evc.as_dict()
+        evc_dict = {**evc_dict, "execution_rounds": evc.execution_rounds}
+        content = json.dumps(evc_dict, default=_json_default).encode()
+        index_keys = frozenset(self._metadata_keys(evc.metadata))
+        schedules = list(evc.circuit_scheduler or [])
+        with self._lock:
+            self._unindex(evc.id)
+            self._evcs[evc.id] = (
+                index_keys, content, tuple(sc.id for sc in schedules)
+            )
+            for index_key in index_keys:
+                self._metadata_index[index_key].add(evc.id)
+            for schedule in schedules:
+                self._schedules[schedule.id] = (evc, schedule)
+
+    def _unindex(self, evc_id: str) -> None:
+        """Remove an EVC from the metadata and schedule indexes.
+
+        Lock must be held.
+        """
+        item = self._evcs.get(evc_id)
+        if not item:
+            return
+        for index_key in item[0]:
+            evc_ids = self._metadata_index[index_key]
+            evc_ids.discard(evc_id)
+            if not evc_ids:
+                del self._metadata_index[index_key]
+        for schedule_id in item[2]:
+            self._schedules.pop(schedule_id, None)
+
+    def remove(self, evc_id: str) -> None:
+        """Remove an EVC."""
+        with self._lock:
+            self._unindex(evc_id)
+            self._evcs.pop(evc_id, None)
+
+    def get(self, evc_id: str) -> Optional[bytes]:
+        """Get the serialized EVC, if it's in this read model."""
+        item = self._evcs.get(evc_id)
+        return item[1] if item else None
+
+    def __contains__(self, evc_id: str) -> bool:
+        return evc_id in self._evcs
+
+    def __len__(self) -> int:
+        return len(self._evcs)
+
+    def get_schedule(self, schedule_id: str) -> tuple:
+        """Return the (EVC, CircuitSchedule) of a schedule id.
+
+        (None, None) is returned if the schedule isn't found.
+        """
+        return self._schedules.get(schedule_id, (None, None))
+
+    def list_schedules(
+        self, limit: Optional[int] = None, after: Optional[str] = None
+    ) -> list[dict]:
+        """List the schedules of the EVCs sorted by schedule id.
+
+        Args:
+            limit(int): maximum number of schedules.
+            after(str): only schedules with id greater than this one.
+        """
+        with self._lock:
+            schedule_ids = sorted(self._schedules)
+            if after is not None:
+                schedule_ids = schedule_ids[bisect_right(schedule_ids, after):]
+            if limit is not None:
+                schedule_ids = schedule_ids[:limit]
+            items = [self._schedules[sc_id] for sc_id in schedule_ids]
+        return [
+            {
+                "schedule_id": schedule.id,
+                "circuit_id": evc.id,
+                "schedule": schedule.as_dict(),
+            }
+            for evc, schedule in items
+        ]
+
+    def _filter_ids(self, filters: dict) -> set[str]:
+        """Ids of the EVCs matching every filter. Lock must be held."""
+        evc_ids = None
+        for key, value in filters.items():
+            if not isinstance(value, Hashable):
+                return set()
+            matched = self._metadata_index.get(self._index_key(key, value))
+            if not matched:
+                return set()
+            evc_ids = set(matched) if evc_ids is None else evc_ids & matched
+        return evc_ids
+
+    def candidate_ids(self, metadata: dict) -> Optional[set[str]]:
+        """Ids of the EVCs that may have every metadata key-value pair.
+
+        Only the EVCs indexed by every leaf value of metadata are returned,
+        they still have to be compared to it. None is returned if metadata
+        has no leaf value to rule out any EVC.
+        """
+        index_keys = set(self._metadata_keys(metadata))
+        if not index_keys:
+            return None
+        evc_ids = None
+        with self._lock:
+            for index_key in index_keys:
+                matched = self._metadata_index.get(index_key)
+                if not matched:
+                    return set()
+                evc_ids = (
+                    set(matched) if evc_ids is None else evc_ids & matched
+                )
+        return evc_ids
+
+    def _select(
+        self,
+        metadata: dict = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> list[tuple[str, bytes]]:
+        """Select the serialized EVCs sorted by id.
+
+        Args:
+            metadata(dict): query args, only metadata.<key> ones are used as
+                filters, with the same value conversions as MongoDB queries.
+            limit(int): maximum number of EVCs.
+            after(str): only EVCs with id greater than this one.
+        """
+        filters = {
+            key: _metadata_filter_value(value)
+            for key, value in (metadata or {}).items()
+            if "metadata." in key[:9]
+        }
+        with self._lock:
+            if filters:
+                snapshot = [
+                    (evc_id, self._evcs[evc_id][1])
+                    for evc_id in self._filter_ids(filters)
+                ]
+            else:
+                snapshot = [
+                    (evc_id, item[1]) for evc_id, item in self._evcs.items()
+                ]
+        snapshot.sort(key=lambda item: item[0])
+        if after is not None:
+            snapshot = snapshot[bisect_right(snapshot, (after,)):]
+            if snapshot and snapshot[0][0] == after:
+                snapshot = snapshot[1:]
+        if limit is not None:
+            snapshot = snapshot[:limit]
+        return snapshot
+
+    @staticmethod
+    def _project(content: bytes, fields: Optional[list[str]]) -> bytes:
+        """Keep only the given fields (and id) of a serialized EVC."""
+        if not fields:
+            return content
+        evc_dict = json.loads(content)
+        return json.dumps({
+            key: value for key, value in evc_dict.items()
+            if key == "id" or key in fields
+        }).encode()
+
+    def list_json(
+        self,
+        metadata: dict = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+    ) -> bytes:
+        """Return a JSON object of the EVCs indexed by id, sorted by id.
+
+        See _select for the arguments, fields are the ones to be kept.
+        """
+        items = [
+            json.dumps(evc_id).encode() + b":" + self._project(content, fields)
+            for evc_id, content in self._select(metadata, limit, after)
+        ]
+        return b"{" + b",".join(items) + b"}"
+
+    def iter_ndjson(
+        self,
+        metadata: dict = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+    ) -> Iterator[bytes]:
+        """Yield one JSON line per EVC, sorted by id.
+
+        See _select for the arguments, fields are the ones to be kept.
+        """
+        for _, content in self._select(metadata, limit, after):
+            yield self._project(content, fields) + b"\n"
@@ -0,0 +1,121 @@
+"""Module responsible for the rate limited re-optimization of EVCs."""
+import time
+from threading import Condition, Thread
+from typing import Callable
+
+from kytos.core import log
+
+
+class ReoptimizationQueue:
+    """Queue of EVCs to be moved back to a better path, such as primary.
+
+    EVCs are kept deduplicated by id and applied by a single thread in
+    batches of batch_size EVCs every interval seconds, the highest
+    service_level first. The first batch waits for delay seconds, so a
+    burst of link up events is handled together.
+    """
+
+    def __init__(
+        self,
+        callback: Callable,
+        delay: float,
+        interval: float,
+        batch_size: int,
+    ):
+        """Create a ReoptimizationQueue.
+
+        Args:
+            callback(callable): callback(evc) that re-optimizes an EVC.
+            delay(float): seconds to wait before the first batch.
+            interval(float): seconds between batches.
+            batch_size(int): maximum EVCs re-optimized per batch.
+        """
+        self.callback = callback
+        self.delay = delay
+        self.interval = interval
+        self.batch_size = batch_size
+        self._cond = Condition()
+        # evc_id -> EVC waiting to be re-optimized
+        self._pending: dict = {}
+        self._next_batch_at = None
+        self._thread = None
+        self._stopped = False
+
+    def __len__(self) -> int:
+        """Number of EVCs waiting to be re-optimized."""
+        return len(self._pending)
+
+    def __contains__(self, evc_id) -> bool:
+        return evc_id in self._pending
+
+    def add(self, evc) -> None:
+        """Queue an EVC to be re-optimized."""
+        with self._cond:
+            if self._stopped:
+                return
+            self._pending[evc.id] = evc
+            if self._next_batch_at is None:
+                self._next_batch_at = time.monotonic() + self.delay
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._run, name="mef_eline_reoptimization",
+                    daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def discard(self, evc_id) -> None:
+        """Remove an EVC from the queue, e.g. when it's deleted."""
+        with self._cond:
+            self._pending.pop(evc_id, None)
+
+    def pop_batch(self, now: float = None) -> list:
+        """Return the next batch if it's due, by priority.
+
+        Lock must be held.
+        """
+        now = time.monotonic() if now is None else now
+        if self._next_batch_at is None or self._next_batch_at > now:
+            return []
+        evcs = sorted(
+            self._pending.values(),
+            key=lambda evc: (-evc.service_level, evc.creation_time),
+        )[:self.batch_size]
+        for evc in evcs:
+            del self._pending[evc.id]
+        self._next_batch_at = now + self.interval if self._pending else None
+        return evcs
+
+    def _run_callback(self, evc) -> None:
+        """Run the callback logging any error."""
+        try:
+            self.callback(evc)
+        # pylint: disable=broad-except
+        except Exception as exc:
+            log.error(f"Failed to re-optimize {evc}: {exc}")
+
+    def _run(self) -> None:
+        """Re-optimize the batches of EVCs as they're due."""
+        with self._cond:
+            while not self._stopped:
+                batch = self.pop_batch()
+                if batch:
+                    self._cond.release()
+                    try:
+                        for evc in batch:
+                            self._run_callback(evc)
+                    finally:
+                        self._cond.acquire()
+                    continue
+                timeout = None
+                if self._next_batch_at is not None:
+                    timeout = max(self._next_batch_at - time.monotonic(), 0)
+                self._cond.wait(timeout)
+
+    def stop(self) -> None:
+        """Stop re-optimizing, discarding the queued EVCs."""
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._next_batch_at = None
+            self._cond.notify()
@@ -0,0 +1,214 @@
+"""Module responsible for the restoration latency of EVCs on link down.
+
+Each link down starts a LinkDownRestoration with the EVCs it affected.
+The latency of each EVC is measured from the link down event timestamp to
+the flows being dispatched, to the deploy being completed and to the EVC
+being active, whether it was moved to its failover path or redeployed.
+Once every EVC is handled, or after a timeout, the link down is
+summarized and the latencies are kept per service level.
+"""
+import math
+import time
+from collections import deque
+from datetime import datetime
+from threading import Lock
+from typing import Iterable, Optional
+
+from napps.kytos.mef_eline import metrics
+
+STAGES = ("dispatched", "deployed", "activated")
+PERCENTILES = (50, 90, 99)
+
+RESTORATION = metrics.registry.histogram(
+    "mef_eline_restoration_seconds",
+    "Time from a link down to the affected EVCs being restored.",
+    ("service_level", "mode"),
+)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(math.ceil(pct / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def summarize(values: Iterable[float]) -> Optional[dict]:
+    """Return the percentiles and max of values, None if there's none."""
+    values = sorted(values)
+    if not values:
+        return None
+    summary = {f"p{pct}": percentile(values, pct) for pct in PERCENTILES}
+    summary["max"] = values[-1]
+    return summary
+
+
+class LinkDownRestoration:
+    """Restoration of the EVCs affected by a link down."""
+
+    def __init__(self, link_id: str, timestamp: datetime,
+                 evcs: dict[str, tuple[int, str]]):
+        """Start the restoration of evcs, (service level, mode) by id."""
+        self.link_id = link_id
+        self.timestamp = timestamp
+        self.started_at = time.monotonic()
+        self.evcs = evcs
+        self.pending = set(evcs)
+        # evc id -> seconds from timestamp by stage, None if not restored
+        self.results: dict[str, Optional[dict]] = {}
+
+    def latencies(self, stages: dict[str, Optional[datetime]]) -> dict:
+        """Seconds from the link down to each stage reached after it."""
+        latencies = {}
+        for stage in STAGES:
+            if not stages.get(stage):
+                continue
+            seconds = (stages[stage] - self.timestamp).total_seconds()
+            if seconds >= 0:
+                latencies[stage] = seconds
+        return latencies
+
+    def summary(self) -> dict:
+        """Summary of the EVCs restored, failed and still pending."""
+        restored = [
+            result for result in self.results.values() if result is not None
+        ]
+        modes = [mode for _, mode in self.evcs.values()]
+        return {
+            "link_id": self.link_id,
+            "timestamp": self.timestamp.isoformat(),
+            "evcs": len(self.evcs),
+            "failover": modes.count("failover"),
+            "redeploy": modes.count("redeploy"),
+            "restored": len(restored),
+            "failed": len(self.results) - len(restored),
+            "pending": len(self.pending),
+            "latency": {
+                stage: summarize(
+                    result[stage] for result in restored if stage in result
+                )
+                for stage in STAGES
+            },
+        }
+
+
+class RestorationTracker:
+    """Restoration latencies per service level of the last EVCs affected.
+
+    Only the last max_samples latencies of each service level are kept and
+    link downs whose EVCs aren't all handled in timeout seconds are
+    summarized anyway, counting those EVCs as pending.
+    """
+
+    def __init__(self, max_samples: int = 1000, timeout: float = 120,
+                 max_summaries: int = 100):
+        """Create an empty tracker."""
+        self.max_samples = max_samples
+        self.timeout = timeout
+        self._lock = Lock()
+        # link id -> restoration in progress
+        self._link_downs: dict[str, LinkDownRestoration] = {}
+        # service level -> deque of seconds from link down by stage
+        self._samples: dict[int, deque] = {}
+        self.summaries: deque = deque(maxlen=max_summaries)
+
+    def _summarize(self, link_down: LinkDownRestoration) -> dict:
+        """Remove a link down and keep its summary."""
+        del self._link_downs[link_down.link_id]
+        summary = link_down.summary()
+        self.summaries.append(summary)
+        return summary
+
+    def start(self, link_id: str, timestamp: datetime,
+              evcs: dict[str, tuple[int, str]]) -> list[dict]:
+        """Start the restoration of the EVCs affected by a link down.
+
+        Args:
+            link_id(str): id of the link that went down.
+            timestamp(datetime): link down event timestamp.
+            evcs(dict): (service level, mode) by EVC id, mode is
+                "failover" or "redeploy".
+
+        Returns:
+            list: summaries of the link downs finished by this call, the
+            previous one of the same link and this one if it's empty.
+        """
+        with self._lock:
+            summaries = []
+            previous = self._link_downs.get(link_id)
+            if previous:
+                summaries.append(self._summarize(previous))
+            link_down = LinkDownRestoration(link_id, timestamp, evcs)
+            self._link_downs[link_id] = link_down
+            if not evcs:
+                summaries.append(self._summarize(link_down))
+            return summaries
+
+    def finish(self, link_id: str, evc_id: str,
+               stages: Optional[dict[str, Optional[datetime]]]
+               ) -> Optional[dict]:
+        """Record the restoration of an EVC affected by a link down.
+
+        Args:
+            link_id(str): id of the link that went down.
+            evc_id(str): EVC id.
+            stages(dict): datetime each stage was reached, None if the EVC
+                wasn't restored.
+
+        Returns:
+            dict: summary of the link down if it's finished, else None.
+        """
+        with self._lock:
+            link_down = self._link_downs.get(link_id)
+            if not link_down or evc_id not in link_down.pending:
+                return None
+            link_down.pending.discard(evc_id)
+            result = None
+            if stages is not None:
+                result = link_down.latencies(stages)
+                service_level, mode = link_down.evcs[evc_id]
+                samples = self._samples.get(service_level)
+                if samples is None:
+                    samples = self._samples[service_level] = deque(
+                        maxlen=self.max_samples
+                    )
+                samples.append(result)
+                restored = result.get("activated", result.get("deployed"))
+                if restored is not None:
+                    RESTORATION.observe(
+                        restored, service_level=service_level, mode=mode
+                    )
+            link_down.results[evc_id] = result
+            if link_down.pending:
+                return None
+            return self._summarize(link_down)
+
+    def expire(self, now: float = None) -> list[dict]:
+        """Summarize the link downs started more than timeout seconds ago."""
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            return [
+                self._summarize(link_down)
+                for link_down in list(self._link_downs.values())
+                if now - link_down.started_at >= self.timeout
+            ]
+
+    def in_progress(self) -> int:
+        """Number of link downs with EVCs not handled yet."""
+        with self._lock:
+            return len(self._link_downs)
+
+    def percentiles(self) -> dict[str, dict]:
+        """Latency percentiles by stage per service level."""
+        with self._lock:
+            samples = {
+                level: list(values) for level, values in self._samples.items()
+            }
+        result = {}
+        for level, values in sorted(samples.items()):
+            result[str(level)] = {"count": len(values)} | {
+                stage: summarize(
+                    value[stage] for value in values if stage in value
+                )
+                for stage in STAGES
+            }
+        return result
@@ -50,3 +50,95 @@ SPF_ATTRIBUTE = "hop"
 # Time (seconds) to update EVC after interface event
 # ".*.switch.interface.(link_up|link_down|created|deleted)"
 UNI_STATE_CHANGE_DELAY = 0.1
+# Interface events are handled by up to INTERFACE_EVENTS_MAX_WORKERS threads,
+# the state of an interface is evicted after INTERFACE_EVENTS_IDLE_TIMEOUT
+# seconds without events
+INTERFACE_EVENTS_MAX_WORKERS = 8
+INTERFACE_EVENTS_IDLE_TIMEOUT = 60
+
+# Maximum number of EVCs being redeployed concurrently by a bulk redeploy
+BULK_REDEPLOY_MAX_WORKERS = 8
+
+# Maximum number of asynchronous operations (e.g. "?async=true" deploys)
+# running concurrently and how many finished ones are kept to be queried
+ASYNC_DEPLOY_MAX_WORKERS = 4
+OPERATIONS_MAX_KEPT = 1000
+
+# Metadata keys to be indexed in MongoDB to filter EVCs by metadata, e.g.
+# ["tenant", "owner.name"]. "$**" creates a wildcard index on every key
+METADATA_INDEXES = ["$**"]
+
+# EVCs are loaded on startup in chunks of LOAD_EVCS_CHUNK_SIZE documents,
+# built by up to LOAD_EVCS_MAX_WORKERS threads
+LOAD_EVCS_CHUNK_SIZE = 200
+LOAD_EVCS_MAX_WORKERS = 4
+
+# Link flap dampening: every link down adds LINK_FLAP_PENALTY to the link,
+# which decays to its half every LINK_FLAP_HALF_LIFE seconds. Once the
+# penalty reaches LINK_FLAP_SUPPRESS_THRESHOLD the link is suppressed, i.e.
+# considered down for path selection and not re-optimized on link up, until
+# it decays below LINK_FLAP_REUSE_THRESHOLD. It's disabled by default, so
+# links are used again as soon as they're up
+LINK_FLAP_DAMPENING = False
+LINK_FLAP_PENALTY = 1000
+LINK_FLAP_HALF_LIFE = 60
+LINK_FLAP_SUPPRESS_THRESHOLD = 3000
+LINK_FLAP_REUSE_THRESHOLD = 750
+
+# On link up, active EVCs whose primary path is back are moved to it by a
+# queue, in batches of REOPTIMIZATION_BATCH_SIZE EVCs every
+# REOPTIMIZATION_INTERVAL seconds, the first one REOPTIMIZATION_DELAY seconds
+# after the link up, if REOPTIMIZATION_QUEUE is True. By default they're
+# moved right away by the link up handler
+REOPTIMIZATION_QUEUE = False
+REOPTIMIZATION_DELAY = 5
+REOPTIMIZATION_INTERVAL = 1
+REOPTIMIZATION_BATCH_SIZE = 10
+
+# S-VLANs reserved in advance for the links in S_VLAN_POOL_LINKS, e.g. hot
+# trunk links, so failover and redeploy take them without searching for an
+# available tag. Pools below S_VLAN_POOL_LOW_WATERMARK are refilled up to
+# S_VLAN_POOL_SIZE in the background, at least every
+# S_VLAN_POOL_REFILL_INTERVAL seconds. Released S-VLANs go back to the pool
+# while it isn't full. Pooled S-VLANs are made available on shutdown and the
+# ones left over by a previous run are reclaimed once the EVCs are loaded
+S_VLAN_POOL_LINKS = []
+S_VLAN_POOL_SIZE = 32
+S_VLAN_POOL_LOW_WATERMARK = 8
+S_VLAN_POOL_REFILL_INTERVAL = 30
+
+# Masks of TAGRange EVCs traced by each consistency round:
+# "all": every mask, "first_last": the first and the last masks,
+# "rotating": TAGRANGE_TRACE_SAMPLE_SIZE masks, the next ones on each round
+TAGRANGE_TRACE_STRATEGY = "all"
+TAGRANGE_TRACE_SAMPLE_SIZE = 4
+
+# Record the wait and hold times and the holder call site of the EVC locks
+# and of the consistency routine lock, exposed by GET /v2/metrics and
+# GET /v2/debug/locks
+LOCK_INSTRUMENTATION = True
+
+# Restoration latency of the EVCs affected by link down, from the event
+# timestamp to the flows dispatched, the deploy completed and the EVC
+# active. Percentiles of the last RESTORATION_MAX_SAMPLES EVCs of each
+# service level are served by GET /v2/restoration. A link down is
+# summarized when all its EVCs are handled or after
+# RESTORATION_SUMMARY_TIMEOUT seconds
+RESTORATION_MAX_SAMPLES = 1000
+RESTORATION_SUMMARY_TIMEOUT = 120
+
+# Tracing spans of the deploy_to_path and setup_failover_path steps, of
+# their HTTP requests and of the retries. The last TRACING_RING_SIZE traces
+# are served by GET /v2/debug/traces and, if TRACING_FILE is set, they're
+# also appended to it as OTLP JSON lines
+TRACING = True
+TRACING_RING_SIZE = 200
+TRACING_FILE = None
+
+# Limits of the profiling sessions started by POST /v2/debug/profile:
+# seconds, handled events, seconds between samples and fraction of the
+# time the sampling profiler may use before backing off its interval
+PROFILING_MAX_DURATION = 300
+PROFILING_MAX_EVENTS = 10000
+PROFILING_MIN_INTERVAL = 0.001
+PROFILING_MAX_OVERHEAD = 0.05
@@ -0,0 +1 @@
+"""kytos/mef_eline benchmarks."""
@@ -0,0 +1,418 @@
+"""Benchmark of the mef_eline hot paths with synthetic topologies.
+
+Run it with, e.g.::
+
+    python3 -m tests.benchmarks.bench_main --topology fat_tree --size 4 \\
+        --evcs 100 500 1000
+
+pathfinder, flow_manager and sdntrace_cp are replaced by the in-process
+stand-ins of tests.stubs and MongoDB by a dict, so the timings are the ones
+of mef_eline itself. For every number of EVCs a new topology and NApp are
+built, the EVCs are created through the REST API and then every operation
+is measured once, reporting its duration and its memory peak.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections import Counter, deque
+from unittest.mock import MagicMock, patch
+
+from kytos.core.events import KytosEvent
+from kytos.core.interface import Interface
+from kytos.core.link import Link
+from kytos.core.switch import Switch
+from kytos.lib.helpers import get_controller_mock, get_test_client
+
+from napps.kytos.mef_eline import settings
+from napps.kytos.mef_eline.main import Main
+from napps.kytos.mef_eline.tests.stubs.services import StubServices
+from napps.kytos.mef_eline.tests.stubs.topology import (TOPOLOGIES,
+                                                        split_interface_id)
+from napps.kytos.mef_eline.tests.stubs.transport import stub_httpx
+
+# Settings changed so every operation runs right away, in this thread
+BENCHMARK_SETTINGS = {
+    "LINK_FLAP_DAMPENING": False,
+    "REOPTIMIZATION_QUEUE": False,
+    "TIME_RECENT_UPDATED": 0,
+    "TIME_RECENT_DELETED_FLOWS": 0,
+}
+
+OPERATIONS = (
+    "create_circuit",
+    "setup_failover_path",
+    "load_all_evcs",
+    "execute_consistency",
+    "handle_link_down",
+    "handle_link_up",
+)
+
+
+class InMemoryELineController:
+    """ELineController stand-in keeping the EVC documents in a dict."""
+
+    def __init__(self):
+        """Create an empty store."""
+        self.circuits: dict[str, dict] = {}
+
+    def bootstrap_indexes(self) -> None:
+        """No indexes are needed."""
+
+    def upsert_evc(self, evc: dict) -> dict:
+        """Insert or replace an EVC."""
+        self.circuits[evc["id"]] = dict(evc)
+        return evc
+
+    def update_evc(self, evc: dict) -> dict:
+        """Update the fields of an EVC."""
+        self.circuits.setdefault(evc["id"], {}).update(evc)
+        return evc
+
+    def update_evcs(self, evcs: list[dict]) -> int:
+        """Update the fields of many EVCs."""
+        for evc in evcs:
+            self.update_evc(evc)
+        return len(evcs)
+
+    # pylint: disable=unused-argument
+    def iter_circuits(self, archived=False, metadata=None, limit=None,
+                      after=None, fields=None):
+        """Iterate over the EVCs sorted by id."""
+        for evc_id in sorted(self.circuits):
+            circuit = self.circuits[evc_id]
+            if archived is None or circuit.get("archived", False) == archived:
+                yield circuit
+
+    def get_circuits(self, archived=False, metadata=None, limit=None,
+                     after=None, fields=None) -> dict:
+        """Get the EVCs by id."""
+        return {"circuits": {
+            circuit["id"]: circuit
+            for circuit in self.iter_circuits(archived)
+        }}
+
+    def get_circuit(self, circuit_id: str):
+        """Get an EVC."""
+        return self.circuits.get(circuit_id)
+
+
+class EventSink:
+    """controller.buffers.app stand-in.
+
+    flow_manager events are sent to the stubs. The mef_eline events handled
+    by the NApp itself are queued and handled by drain, as the NApp
+    listeners would.
+    """
+
+    def __init__(self, services: StubServices):
+        """Create a sink sending flows to services."""
+        self.services = services
+        self.handlers: dict = {}
+        self.queue: deque = deque()
+        self.emitted: Counter = Counter()
+
+    # pylint: disable=unused-argument
+    def put(self, event, timeout=None) -> None:
+        """Handle an event emitted by mef_eline."""
+        self.emitted[event.name] += 1
+        if event.name.startswith("kytos.flow_manager.flows."):
+            self.services.handle_flow_mods_event(event.name, event.content)
+        elif event.name in self.handlers:
+            self.queue.append(event)
+
+    async def aput(self, event) -> None:
+        """Handle an event emitted by mef_eline."""
+        self.put(event)
+
+    def drain(self) -> int:
+        """Handle the queued events, return how many were handled."""
+        handled = 0
+        while self.queue:
+            event = self.queue.popleft()
+            self.handlers[event.name](event)
+            handled += 1
+        return handled
+
+
+def build_controller(topology: dict):
+    """Build a controller with the switches, interfaces and links.
+
+    The link ids of topology are replaced by the kytos Link ids.
+    """
+    controller = get_controller_mock()
+    for switch_id in topology["switches"]:
+        switch = Switch(switch_id)
+        switch.enable()
+        switch.activate()
+        controller.switches[switch_id] = switch
+
+    def get_interface(interface_id: str) -> Interface:
+        switch_id, port = split_interface_id(interface_id)
+        switch = controller.switches[switch_id]
+        interface = switch.interfaces.get(port)
+        if interface is None:
+            interface = Interface(f"eth{port}", port, switch)
+            interface.enable()
+            interface.activate()
+            switch.update_interface(interface)
+        return interface
+
+    links = {}
+    for link_dict in topology["links"]:
+        endpoint_a = get_interface(link_dict["endpoint_a"])
+        endpoint_b = get_interface(link_dict["endpoint_b"])
+        link = Link(endpoint_a, endpoint_b)
+        link.enable()
+        link.activate()
+        endpoint_a.update_link(link)
+        endpoint_b.update_link(link)
+        link_dict["id"] = link.id
+        links[link.id] = link
+    controller.links = links
+    for uni in topology["unis"]:
+        get_interface(uni)
+    return controller
+
+
+def evc_payloads(topology: dict, count: int) -> list[dict]:
+    """Payloads of EVCs mixing EVPL, TAGRange and EPL UNIs.
+
+    UNIs are chosen round robin between different switches, every UNI
+    interface has at most one EPL EVC.
+    """
+    unis = topology["unis"]
+    epl_free = set(unis)
+    next_vlan = {uni: 100 for uni in unis}
+    payloads = []
+    for i in range(count):
+        uni_a = unis[i % len(unis)]
+        j = (i * 7 + len(unis) // 2 + 1) % len(unis)
+        while split_interface_id(unis[j])[0] == split_interface_id(uni_a)[0]:
+            j = (j + 1) % len(unis)
+        uni_z = unis[j]
+        kind = ("evpl", "evpl", "tag_range", "epl")[i % 4]
+        if kind == "epl" and not {uni_a, uni_z} <= epl_free:
+            kind = "evpl"
+        vlan = max(next_vlan[uni_a], next_vlan[uni_z])
+        if kind == "epl":
+            epl_free -= {uni_a, uni_z}
+            tag = None
+        elif kind == "tag_range":
+            tag = {"tag_type": "vlan",
+                   "value": [[vlan, vlan + 2], [vlan + 4, vlan + 6]]}
+            vlan += 8
+        else:
+            tag = {"tag_type": "vlan", "value": vlan}
+            vlan += 1
+        next_vlan[uni_a] = next_vlan[uni_z] = vlan
+        payload = {
+            "name": f"bench_{kind}_{i}",
+            "uni_a": {"interface_id": uni_a},
+            "uni_z": {"interface_id": uni_z},
+            "dynamic_backup_path": True,
+            "service_level": i % 8,
+        }
+        if tag:
+            payload["uni_a"]["tag"] = dict(tag)
+            payload["uni_z"]["tag"] = dict(tag)
+        payloads.append(payload)
+    return payloads
+
+
+def measure(func, memory: bool) -> dict:
+    """Run func, return its result, duration and memory peak."""
+    if memory:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = func()
+    duration = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1] - before
+    return {"result": result, "duration": duration, "peak": peak}
+
+
+class Benchmark:
+    """mef_eline NApp with N EVCs over a synthetic topology."""
+
+    def __init__(self, topology: dict, memory: bool = True):
+        """Build the controller, the stand-ins and the NApp."""
+        self.topology = topology
+        self.memory = memory
+        self.controller = build_controller(topology)
+        self.services = StubServices(topology)
+        self.sink = EventSink(self.services)
+        self.controller.buffers = MagicMock()
+        self.controller.buffers.app = self.sink
+        self.store = InMemoryELineController()
+        self.napp = None
+        self.new_napp()
+
+    def new_napp(self) -> Main:
+        """Replace the NApp by a new one using the same store."""
+        if self.napp:
+            self.napp.shutdown()
+            self.napp.sched.shutdown()
+        with patch.object(
+            Main, "get_eline_controller", return_value=self.store
+        ):
+            self.napp = Main(self.controller)
+        self.sink.handlers = {
+            "kytos/mef_eline.evc_affected_by_link_down":
+                self.napp.handle_evc_affected_by_link_down,
+            "kytos/mef_eline.cleanup_evcs_old_path":
+                self.napp.handle_cleanup_evcs_old_path,
+            "kytos/mef_eline.redeployed_link_down":
+                self.napp.handle_evc_deployed,
+            "kytos/mef_eline.redeployed_link_up":
+                self.napp.handle_evc_deployed,
+        }
+        return self.napp
+
+    def busiest_link(self) -> Link:
+        """Link in the current path of the most EVCs, None if there's none."""
+        usage = Counter()
+        for evc in self.napp.circuits.values():
+            usage.update(link.id for link in evc.current_path)
+        if not usage:
+            return None
+        return self.controller.links[usage.most_common(1)[0][0]]
+
+    async def _create(self, payloads: list[dict]) -> int:
+        """Create EVCs through the REST API, return how many failed."""
+        self.controller.loop = asyncio.get_running_loop()
+        client = get_test_client(self.controller, self.napp)
+        failed = 0
+        for payload in payloads:
+            response = await client.post(
+                "kytos/mef_eline/v2/evc/", json=payload
+            )
+            failed += response.status_code != 201
+        return failed
+
+    def create_circuit(self, payloads: list[dict]) -> dict:
+        """Create the EVCs, the deployed events aren't handled."""
+        result = measure(
+            lambda: asyncio.run(self._create(payloads)), self.memory
+        )
+        self.sink.queue.clear()
+        return result
+
+    def setup_failover_path(self) -> dict:
+        """Set up the failover path of every EVC."""
+        def run():
+            for evc in list(self.napp.circuits.values()):
+                with evc.lock:
+                    evc.setup_failover_path()
+            return sum(
+                bool(evc.failover_path)
+                for evc in self.napp.circuits.values()
+            )
+        return measure(run, self.memory)
+
+    def load_all_evcs(self) -> dict:
+        """Load the stored EVCs in a new NApp."""
+        self.new_napp()
+        return measure(self.napp.load_all_evcs, self.memory)
+
+    def execute_consistency(self) -> dict:
+        """Run a consistency round with every EVC inactive."""
+        for evc in self.napp.circuits.values():
+            evc.deactivate()
+
+        def run():
+            self.napp.execute_consistency()
+            return sum(
+                evc.is_active() for evc in self.napp.circuits.values()
+            )
+        return measure(run, self.memory)
+
+    def _link_event(self, name: str, handler, link: Link) -> dict:
+        """Handle a link event and the events emitted meanwhile."""
+        event = KytosEvent(name=name, content={"link": link})
+
+        def run():
+            handler(event)
+            return self.sink.drain()
+        return measure(run, self.memory)
+
+    def handle_link_down(self, link: Link) -> dict:
+        """Take link down, end-to-end."""
+        link.deactivate()
+        return self._link_event(
+            "kytos/topology.link_down", self.napp.handle_link_down, link
+        )
+
+    def handle_link_up(self, link: Link) -> dict:
+        """Bring link up, end-to-end."""
+        link.activate()
+        return self._link_event(
+            "kytos/topology.link_up", self.napp.handle_link_up, link
+        )
+
+    def run(self, count: int) -> dict:
+        """Measure every operation with count EVCs."""
+        payloads = evc_payloads(self.topology, count)
+        results = {}
+        results["create_circuit"] = self.create_circuit(payloads)
+        results["setup_failover_path"] = self.setup_failover_path()
+        results["load_all_evcs"] = self.load_all_evcs()
+        results["execute_consistency"] = self.execute_consistency()
+        link = self.busiest_link()
+        if link:
+            results["handle_link_down"] = self.handle_link_down(link)
+            results["handle_link_up"] = self.handle_link_up(link)
+        self.napp.shutdown()
+        self.napp.sched.shutdown()
+        return results
+
+
+def print_results(count: int, results: dict) -> None:
+    """Print the results of a number of EVCs."""
+    print(f"\n{count} EVCs")
+    print(f"{'operation':<22}{'total (s)':>11}{'per EVC (ms)':>14}"
+          f"{'peak (MiB)':>12}  result")
+    for operation in OPERATIONS:
+        result = results.get(operation)
+        if result is None:
+            continue
+        peak = "-"
+        if result["peak"] is not None:
+            peak = f"{result['peak'] / 2 ** 20:.2f}"
+        print(f"{operation:<22}{result['duration']:>11.3f}"
+              f"{result['duration'] * 1000 / count:>14.3f}{peak:>12}"
+              f"  {result['result']}")
+
+
+def main() -> None:
+    """Run the benchmark for every number of EVCs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES),
+                        default="ring")
+    parser.add_argument("--size", type=int, default=8,
+                        help="switches of ring and mesh, k of fat_tree")
+    parser.add_argument("--unis", type=int, default=4,
+                        help="UNI interfaces per (edge) switch")
+    parser.add_argument("--evcs", type=int, nargs="+",
+                        default=[100, 500, 1000])
+    parser.add_argument("--no-memory", action="store_true",
+                        help="don't trace memory, it slows every operation")
+    args = parser.parse_args()
+
+    memory = not args.no_memory
+    if memory:
+        tracemalloc.start()
+    with patch.multiple(settings, **BENCHMARK_SETTINGS):
+        for count in args.evcs:
+            topology = TOPOLOGIES[args.topology](args.size, args.unis)
+            benchmark = Benchmark(topology, memory)
+            with stub_httpx(benchmark.services):
+                results = benchmark.run(count)
+            print_results(count, results)
+            print(f"requests: {benchmark.services.calls}")
+
+
+if __name__ == "__main__":
+    main()
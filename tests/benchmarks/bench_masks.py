@@ -0,0 +1,75 @@
+"""Micro-benchmark of get_vlan_tags_and_masks with fragmented ranges.
+
+Run it with ``python3 -m tests.benchmarks.bench_masks``.
+"""
+import timeit
+
+from napps.kytos.mef_eline.utils import (_ranges_masks,
+                                         get_vlan_tags_and_masks,
+                                         max_power2_divisor)
+
+REPEAT = 5
+NUMBER = 20
+
+
+def reference_masks(tag_ranges: list[list[int]]) -> list:
+    """Nested loops implementation, used as the baseline."""
+    masks_list = []
+    for start, end in tag_ranges:
+        limit = end + 1
+        while start < limit:
+            divisor = max_power2_divisor(start)
+            while divisor > limit - start:
+                divisor //= 2
+            mask = 4096 - divisor
+            if mask == 4095:
+                masks_list.append(start)
+            else:
+                masks_list.append(f"{start}/{mask}")
+            start += divisor
+    return masks_list
+
+
+# Worst cases: every other VLAN, unaligned short ranges and one unaligned
+# range, which has the longest mask list of a single range.
+CASES = {
+    "every other vlan": [[vlan, vlan] for vlan in range(1, 4095, 2)],
+    "unaligned 3 vlans": [[start, start + 2] for start in range(1, 4092, 4)],
+    "1-4094": [[1, 4094]],
+}
+
+
+def clear_cache() -> None:
+    """Clear the memoized masks."""
+    _ranges_masks.cache_clear()
+
+
+def best(func, setup=None) -> float:
+    """Best time of a call in ms."""
+    setup = setup or (lambda: None)
+    times = []
+    for _ in range(REPEAT):
+        total = 0.0
+        for _ in range(NUMBER):
+            setup()
+            total += timeit.timeit(func, number=1)
+        times.append(total / NUMBER)
+    return min(times) * 1000
+
+
+def main() -> None:
+    """Print the duration of each implementation per case."""
+    print(f"{'case':<20}{'masks':>7}{'reference':>12}"
+          f"{'cold':>10}{'memoized':>10}  (ms)")
+    for name, tag_ranges in CASES.items():
+        expected = reference_masks(tag_ranges)
+        assert list(get_vlan_tags_and_masks(tag_ranges)) == expected
+        reference = best(lambda: reference_masks(tag_ranges))
+        cold = best(lambda: get_vlan_tags_and_masks(tag_ranges), clear_cache)
+        warm = best(lambda: get_vlan_tags_and_masks(tag_ranges))
+        print(f"{name:<20}{len(expected):>7}{reference:>12.3f}"
+              f"{cold:>10.3f}{warm:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
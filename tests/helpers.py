@@ -1,5 +1,5 @@
 """Module to help to create tests."""
-from unittest.mock import Mock
+from unittest.mock import MagicMock, Mock
 
 from kytos.core import Controller
 from kytos.core.common import EntityStatus
@@ -115,6 +115,33 @@ def get_uni_mocked(**kwargs):
     return uni
 
 
+def get_evc_mocked(**kwargs):
+    """Create an EVC mocked.
+
+    Args:
+        evc_id(str): EVC id. Defaults to "1".
+        service_level(int): Service level. Defaults to 0.
+        creation_time(int): Creation time. Defaults to 1.
+        metadata(dict): Metadata. Defaults to {}.
+        archived(bool): Whether it's archived. Defaults to False.
+        as_dict(dict): Other items of the dict returned by as_dict.
+    """
+    evc_id = kwargs.get("evc_id", "1")
+    metadata = kwargs.get("metadata") or {}
+    evc = MagicMock(
+        id=evc_id,
+        service_level=kwargs.get("service_level", 0),
+        creation_time=kwargs.get("creation_time", 1),
+        metadata=metadata,
+        archived=kwargs.get("archived", False),
+        execution_rounds=0,
+    )
+    evc.as_dict.return_value = {
+        "id": evc_id, "metadata": metadata, **kwargs.get("as_dict", {})
+    }
+    return evc
+
+
 class MockResponse:
     """
     Mock a httpx response object.
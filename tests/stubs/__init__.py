@@ -0,0 +1 @@
+"""Stand-ins for the NApps mef_eline depends on, driven by a topology."""
@@ -0,0 +1,203 @@
+"""HTTP server of the pathfinder, flow_manager and sdntrace_cp stand-ins.
+
+Run it with a topology description file or a synthetic topology, e.g.::
+
+    python3 -m tests.stubs.server --topology fat_tree --size 4 \\
+        --port 8282 --latency 0.02 --error-rate 0.05
+
+and point mef_eline settings to it::
+
+    PATHFINDER_URL = "http://localhost:8282/api/kytos/pathfinder/v3/"
+    MANAGER_URL = "http://localhost:8282/api/kytos/flow_manager/v2"
+    SDN_TRACE_CP_URL = "http://localhost:8282/api/amlight/sdntrace_cp/v1"
+
+Faults are injected per request: latency (plus a random jitter), errors
+replied with status 500 and timeouts, which hold the request for
+timeout seconds before replying 504. The "faults" key of a topology file
+overrides them per service, e.g. {"faults": {"pathfinder": {"latency": 1}}}.
+GET /stubs/stats returns the requests handled and the flows per switch.
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from .services import StubServices
+from .topology import TOPOLOGIES, load_topology
+
+SERVICES = ("pathfinder", "flow_manager", "sdntrace_cp")
+
+
+class Faults:
+    """Faults injected in the requests of a service."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout: float = 60.0,
+        rng: random.Random = None,
+    ):
+        """Create the faults of a service.
+
+        Args:
+            latency(float): seconds added to every request.
+            jitter(float): up to jitter random seconds added to latency.
+            error_rate(float): fraction of requests replied with 500.
+            timeout_rate(float): fraction of requests that time out.
+            timeout(float): seconds a timed out request is held.
+            rng(random.Random): random generator, seeded for repeatable runs.
+        """
+        for name, rate in (("error_rate", error_rate),
+                           ("timeout_rate", timeout_rate)):
+            if not 0 <= rate <= 1:
+                raise ValueError(f"{name} must be between 0 and 1")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout = timeout
+        self.rng = rng or random.Random()
+
+    def replace(self, **kwargs) -> "Faults":
+        """Return a copy with some attributes replaced."""
+        attrs = {
+            "latency": self.latency, "jitter": self.jitter,
+            "error_rate": self.error_rate,
+            "timeout_rate": self.timeout_rate, "timeout": self.timeout,
+            "rng": self.rng,
+        }
+        return Faults(**(attrs | kwargs))
+
+    def inject(self, sleep=time.sleep) -> Optional[tuple[int, dict]]:
+        """Wait for the latency, return the fault reply if there's one."""
+        delay = self.latency
+        if self.jitter:
+            delay += self.rng.uniform(0, self.jitter)
+        if delay:
+            sleep(delay)
+        draw = self.rng.random()
+        if draw < self.timeout_rate:
+            sleep(self.timeout)
+            return 504, {"description": "Injected timeout"}
+        if draw < self.timeout_rate + self.error_rate:
+            return 500, {"description": "Injected error"}
+        return None
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server of StubServices with fault injection."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, services: StubServices,
+                 faults: dict[str, Faults]):
+        """Serve services on address, faults by service name."""
+        super().__init__(address, StubRequestHandler)
+        self.services = services
+        self.faults = faults
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Handle a request to the stand-in services."""
+
+    server: StubServer
+
+    def _reply(self, status: int, payload: dict) -> None:
+        """Reply a JSON payload."""
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        """Read the JSON body, None if there's none."""
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def _handle(self) -> None:
+        """Inject the service faults and then handle the request."""
+        if self.command == "GET" and self.path.rstrip("/") == "/stubs/stats":
+            self._reply(200, self.server.services.stats())
+            return
+        try:
+            body = self._body()
+        except ValueError as err:
+            self._reply(400, {"description": f"Invalid JSON: {err}"})
+            return
+        service = StubServices.service_of(self.path)
+        faults = self.server.faults.get(service)
+        fault = faults.inject() if faults else None
+        if fault:
+            self._reply(*fault)
+            return
+        self._reply(*self.server.services.handle(self.command, self.path,
+                                                 body))
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    # pylint: disable=redefined-builtin
+    def log_message(self, format, *args) -> None:
+        """Don't log every request."""
+
+
+def build_faults(args, overrides: dict) -> dict[str, Faults]:
+    """Faults of each service, from the arguments and the overrides."""
+    rng = random.Random(args.seed)
+    default = Faults(args.latency, args.jitter, args.error_rate,
+                     args.timeout_rate, args.timeout, rng)
+    return {
+        service: default.replace(**overrides.get(service, {}))
+        for service in SERVICES
+    }
+
+
+def main() -> None:
+    """Serve the stand-in services until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("topology_file", nargs="?",
+                        help="topology description JSON file")
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES),
+                        default="ring", help="synthetic topology")
+    parser.add_argument("--size", type=int, default=8,
+                        help="switches of ring and mesh, k of fat_tree")
+    parser.add_argument("--unis", type=int, default=4,
+                        help="UNI interfaces per (edge) switch")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8282)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.topology_file:
+        topology = load_topology(args.topology_file)
+    else:
+        topology = TOPOLOGIES[args.topology](args.size, args.unis)
+    faults = build_faults(args, topology.get("faults", {}))
+    server = StubServer((args.host, args.port), StubServices(topology),
+                        faults)
+    print(f"Serving {len(topology['switches'])} switches and "
+          f"{len(topology['links'])} links on "
+          f"http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""pathfinder, flow_manager and sdntrace_cp stand-ins for a topology."""
+from collections import deque
+from threading import Lock
+from typing import Optional
+from urllib.parse import urlsplit
+
+from .topology import split_interface_id
+
+
+def vlan_matches(dl_vlan, stack: list) -> bool:
+    """Whether a flow match dl_vlan matches a packet VLAN stack."""
+    if dl_vlan is None:
+        return True
+    if dl_vlan == 0:
+        return not stack
+    if not stack:
+        return False
+    if dl_vlan == "4096/4096":
+        return True
+    if isinstance(dl_vlan, int):
+        return stack[0] == dl_vlan
+    value, mask = map(int, dl_vlan.split("/"))
+    return stack[0] & mask & 4095 == value & mask & 4095
+
+
+def apply_actions(actions: list, stack: list) -> tuple[list, Optional[int]]:
+    """Apply the actions of a flow to a VLAN stack.
+
+    Returns:
+        tuple: the new stack and the output port, None if there's none.
+    """
+    stack = list(stack)
+    out_port = None
+    for action in actions:
+        action_type = action.get("action_type")
+        if action_type == "push_vlan":
+            stack.insert(0, 0)
+        elif action_type == "pop_vlan" and stack:
+            stack.pop(0)
+        elif action_type == "set_vlan":
+            if stack:
+                stack[0] = action["vlan_id"]
+            else:
+                stack.append(action["vlan_id"])
+        elif action_type == "output":
+            out_port = action["port"]
+    return stack, out_port
+
+
+class StubServices:
+    """Stand-ins for pathfinder, flow_manager and sdntrace_cp.
+
+    Paths are computed over the topology, flows are recorded per switch
+    and traces follow the recorded flows through the topology links.
+    """
+
+    def __init__(self, topology: dict):
+        """Create the stand-ins of a topology description."""
+        self.topology = topology
+        # dpid -> [(port, neighbor dpid, neighbor port, link id)]
+        self.adjacency: dict[str, list[tuple]] = {
+            switch_id: [] for switch_id in topology["switches"]
+        }
+        # (dpid, port) -> (neighbor dpid, neighbor port)
+        self.peers: dict[tuple, tuple] = {}
+        for link in topology["links"]:
+            dpid_a, port_a = split_interface_id(link["endpoint_a"])
+            dpid_b, port_b = split_interface_id(link["endpoint_b"])
+            self.adjacency[dpid_a].append((port_a, dpid_b, port_b, link["id"]))
+            self.adjacency[dpid_b].append((port_b, dpid_a, port_a, link["id"]))
+            self.peers[(dpid_a, port_a)] = (dpid_b, port_b)
+            self.peers[(dpid_b, port_b)] = (dpid_a, port_a)
+        # dpid -> flows installed
+        self.flows: dict[str, list[dict]] = {
+            switch_id: [] for switch_id in topology["switches"]
+        }
+        self.calls: dict[str, int] = {
+            "paths": 0, "install": 0, "delete": 0, "traces": 0
+        }
+        self._lock = Lock()
+
+    # pathfinder
+
+    def _shortest(
+        self, source: str, destination: str, banned_links: set,
+        banned_switches: set
+    ) -> Optional[list[tuple]]:
+        """Breadth-first shortest path, as a list of edges.
+
+        An edge is (dpid, port, neighbor dpid, neighbor port, link id).
+        """
+        if source == destination:
+            return []
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            switch_id = queue.popleft()
+            for port, neighbor, neighbor_port, link_id in self.adjacency.get(
+                switch_id, []
+            ):
+                if (
+                    neighbor in previous
+                    or neighbor in banned_switches
+                    or link_id in banned_links
+                ):
+                    continue
+                previous[neighbor] = (
+                    switch_id, port, neighbor, neighbor_port, link_id
+                )
+                if neighbor == destination:
+                    edges = []
+                    edge = previous[destination]
+                    while edge:
+                        edges.append(edge)
+                        edge = previous[edge[0]]
+                    return edges[::-1]
+                queue.append(neighbor)
+        return None
+
+    def _k_shortest(
+        self, source: str, destination: str, max_paths: int,
+        undesired_links: set
+    ) -> list[list[tuple]]:
+        """Yen's k shortest loopless paths, by number of links."""
+        first = self._shortest(source, destination, undesired_links, set())
+        if first is None:
+            return []
+        paths, candidates = [first], []
+        while len(paths) < max_paths:
+            last = paths[-1]
+            for i in range(len(last)):
+                root = last[:i]
+                spur = last[i][0]
+                banned_links = set(undesired_links)
+                for path in paths:
+                    if path[:i] == root:
+                        banned_links.add(path[i][4])
+                banned_switches = {edge[0] for edge in root}
+                spur_path = self._shortest(
+                    spur, destination, banned_links, banned_switches
+                )
+                if spur_path is None:
+                    continue
+                candidate = root + spur_path
+                if candidate not in candidates and candidate not in paths:
+                    candidates.append(candidate)
+            if not candidates:
+                break
+            candidates.sort(key=len)
+            paths.append(candidates.pop(0))
+        return paths
+
+    def paths(self, request: dict) -> dict:
+        """Reply a pathfinder request."""
+        with self._lock:
+            self.calls["paths"] += 1
+        source, destination = request["source"], request["destination"]
+        source_switch = split_interface_id(source)[0]
+        destination_switch = split_interface_id(destination)[0]
+        edges_list = self._k_shortest(
+            source_switch, destination_switch,
+            request.get("spf_max_paths", 2),
+            set(request.get("undesired_links") or []),
+        )
+        paths = []
+        for edges in edges_list:
+            hops = [source, source_switch]
+            for dpid_a, port_a, dpid_b, port_b, _ in edges:
+                hops.extend([f"{dpid_a}:{port_a}", f"{dpid_b}:{port_b}",
+                             dpid_b])
+            hops.append(destination)
+            paths.append({"hops": hops, "cost": len(edges)})
+        return {"paths": paths}
+
+    # flow_manager
+
+    @staticmethod
+    def _flows_by_switch(body: dict) -> dict[str, list[dict]]:
+        """Get the flows per switch of a flows or flows_by_switch body."""
+        if "flows" in body and "switches" in body:
+            return {dpid: body["flows"] for dpid in body["switches"]}
+        return {
+            dpid: value["flows"] for dpid, value in body.items()
+            if isinstance(value, dict)
+        }
+
+    def install_flows(self, flows_by_switch: dict[str, list[dict]]) -> None:
+        """Install flows, replacing the ones with the same cookie and match."""
+        with self._lock:
+            self.calls["install"] += 1
+            for dpid, flows in flows_by_switch.items():
+                installed = self.flows.setdefault(dpid, [])
+                for flow in flows:
+                    installed[:] = [
+                        current for current in installed
+                        if current.get("cookie") != flow.get("cookie")
+                        or current.get("match") != flow.get("match")
+                        or current.get("priority") != flow.get("priority")
+                    ]
+                    installed.append(flow)
+
+    def delete_flows(self, flows_by_switch: dict[str, list[dict]]) -> None:
+        """Delete the flows matching cookie, cookie_mask and match."""
+        with self._lock:
+            self.calls["delete"] += 1
+            for dpid, flows in flows_by_switch.items():
+                installed = self.flows.get(dpid, [])
+                for flow in flows:
+                    mask = flow.get("cookie_mask", 0)
+                    cookie = flow.get("cookie", 0) & mask
+                    match = flow.get("match")
+                    installed[:] = [
+                        current for current in installed
+                        if current.get("cookie", 0) & mask != cookie
+                        or (match is not None
+                            and current.get("match") != match)
+                    ]
+
+    def handle_flow_mods_event(self, name: str, content: dict) -> None:
+        """Handle a kytos.flow_manager.flows.(install|delete) event."""
+        flows = {content["dpid"]: content["flow_dict"]["flows"]}
+        if name.endswith("install"):
+            self.install_flows(flows)
+        elif name.endswith("delete"):
+            self.delete_flows(flows)
+
+    # sdntrace_cp
+
+    def _match(self, dpid: str, in_port: int, stack: list) -> Optional[dict]:
+        """Highest priority flow of a switch matching a packet."""
+        best = None
+        for flow in self.flows.get(dpid, []):
+            match = flow.get("match", {})
+            if match.get("in_port", in_port) != in_port:
+                continue
+            if not vlan_matches(match.get("dl_vlan"), stack):
+                continue
+            if best is None or flow.get("priority", 0) > best.get(
+                "priority", 0
+            ):
+                best = flow
+        return best
+
+    def trace(self, dpid: str, in_port: int, vlan: int = None) -> list:
+        """Follow the flows of a packet, like sdntrace_cp."""
+        stack = [vlan] if vlan else []
+        step = {"dpid": dpid, "port": in_port, "type": "starting"}
+        if stack:
+            step["vlan"] = stack[0]
+        steps, visited = [], set()
+        while True:
+            steps.append(step)
+            state = (dpid, in_port, tuple(stack))
+            flow = self._match(dpid, in_port, stack)
+            if flow is None or state in visited:
+                step["type"] = "last"
+                step["out"] = None
+                return steps
+            visited.add(state)
+            stack, out_port = apply_actions(flow.get("actions", []), stack)
+            peer = self.peers.get((dpid, out_port))
+            if out_port is None or peer is None:
+                step["type"] = "last"
+                step["out"] = {
+                    "port": out_port, "vlan": stack[0] if stack else None
+                }
+                return steps
+            dpid, in_port = peer
+            step = {"dpid": dpid, "port": in_port, "type": "intermediary"}
+            if stack:
+                step["vlan"] = stack[0]
+
+    def traces(self, data: list[dict]) -> dict:
+        """Reply a bulk sdntrace_cp request."""
+        result = []
+        with self._lock:
+            self.calls["traces"] += 1
+            for item in data:
+                trace = item["trace"]
+                vlan = trace.get("eth", {}).get("dl_vlan")
+                result.append(self.trace(
+                    trace["switch"]["dpid"], trace["switch"]["in_port"], vlan
+                ))
+        return {"result": result}
+
+    # routing
+
+    @staticmethod
+    def service_of(url: str) -> Optional[str]:
+        """Name of the service of a URL, None if it's unknown."""
+        path = urlsplit(url).path.rstrip("/")
+        if path.endswith("/pathfinder/v3"):
+            return "pathfinder"
+        if path.endswith("/sdntrace_cp/v1/traces"):
+            return "sdntrace_cp"
+        if path.endswith("/flow_manager/v2/flows_by_switch") or path.endswith(
+            "/flow_manager/v2/flows"
+        ):
+            return "flow_manager"
+        return None
+
+    def handle(self, method: str, url: str, body) -> tuple[int, dict]:
+        """Route a request by its URL path, return (status code, reply)."""
+        service = self.service_of(url)
+        if service == "pathfinder" and method == "POST":
+            return 200, self.paths(body)
+        if service == "sdntrace_cp" and method == "PUT":
+            return 200, self.traces(body)
+        if service == "flow_manager" and method == "POST":
+            self.install_flows(self._flows_by_switch(body))
+            return 202, {"response": "FlowMod Messages Sent"}
+        if service == "flow_manager" and method == "DELETE":
+            self.delete_flows(self._flows_by_switch(body))
+            return 202, {"response": "FlowMod Messages Sent"}
+        path = urlsplit(url).path
+        return 404, {"description": f"{method} {path} not found"}
+
+    def stats(self) -> dict:
+        """Requests handled and flows installed per switch."""
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "flows": {
+                    dpid: len(flows) for dpid, flows in self.flows.items()
+                },
+            }
@@ -0,0 +1,160 @@
+"""Synthetic topology descriptions.
+
+A topology description is a JSON serializable dict::
+
+    {
+        "switches": ["00:00:00:00:00:00:00:01", ...],
+        "links": [
+            {"id": "...", "endpoint_a": "<dpid>:<port>",
+             "endpoint_b": "<dpid>:<port>"},
+            ...
+        ],
+        "unis": ["<dpid>:<port>", ...],
+    }
+
+Link ids are computed like kytos Link ids when they're missing.
+"""
+import hashlib
+import json
+from itertools import combinations
+
+
+def dpid(number: int) -> str:
+    """Return the datapath id of a switch number."""
+    return ":".join(
+        f"{(number >> shift) & 0xff:02x}" for shift in range(56, -8, -8)
+    )
+
+
+def split_interface_id(interface_id: str) -> tuple[str, int]:
+    """Split an interface id in its dpid and port number."""
+    switch_id, port = interface_id.rsplit(":", 1)
+    return switch_id, int(port)
+
+
+def link_id(endpoint_a: str, endpoint_b: str) -> str:
+    """Return the id of a link, like kytos Link.id."""
+    elements = sorted([
+        split_interface_id(endpoint_a), split_interface_id(endpoint_b)
+    ])
+    str_id = "{}:{}:{}:{}".format(*elements[0], *elements[1])
+    return hashlib.sha256(str_id.encode("utf-8")).hexdigest()
+
+
+class TopologyBuilder:
+    """Build a topology description, numbering the ports of each switch."""
+
+    def __init__(self):
+        """Create an empty topology."""
+        self.switches: list[str] = []
+        self.links: list[dict] = []
+        self.unis: list[str] = []
+        self._next_port: dict[str, int] = {}
+
+    def add_switch(self, number: int) -> str:
+        """Add a switch, return its dpid."""
+        switch_id = dpid(number)
+        self.switches.append(switch_id)
+        self._next_port[switch_id] = 1
+        return switch_id
+
+    def _new_interface(self, switch_id: str) -> str:
+        """Return the next free interface id of a switch."""
+        port = self._next_port[switch_id]
+        self._next_port[switch_id] = port + 1
+        return f"{switch_id}:{port}"
+
+    def add_link(self, switch_a: str, switch_b: str) -> dict:
+        """Link two switches through new interfaces."""
+        endpoint_a = self._new_interface(switch_a)
+        endpoint_b = self._new_interface(switch_b)
+        link = {
+            "id": link_id(endpoint_a, endpoint_b),
+            "endpoint_a": endpoint_a,
+            "endpoint_b": endpoint_b,
+        }
+        self.links.append(link)
+        return link
+
+    def add_unis(self, switch_id: str, count: int) -> None:
+        """Add count UNI interfaces to a switch."""
+        for _ in range(count):
+            self.unis.append(self._new_interface(switch_id))
+
+    def build(self) -> dict:
+        """Return the topology description."""
+        return {
+            "switches": list(self.switches),
+            "links": list(self.links),
+            "unis": list(self.unis),
+        }
+
+
+def ring(size: int, unis_per_switch: int = 2) -> dict:
+    """Switches linked in a ring."""
+    builder = TopologyBuilder()
+    switches = [builder.add_switch(i) for i in range(1, size + 1)]
+    for switch_a, switch_b in zip(switches, switches[1:] + switches[:1]):
+        builder.add_link(switch_a, switch_b)
+    for switch_id in switches:
+        builder.add_unis(switch_id, unis_per_switch)
+    return builder.build()
+
+
+def mesh(size: int, unis_per_switch: int = 2) -> dict:
+    """Switches linked to every other switch."""
+    builder = TopologyBuilder()
+    switches = [builder.add_switch(i) for i in range(1, size + 1)]
+    for switch_a, switch_b in combinations(switches, 2):
+        builder.add_link(switch_a, switch_b)
+    for switch_id in switches:
+        builder.add_unis(switch_id, unis_per_switch)
+    return builder.build()
+
+
+def fat_tree(k: int = 4, unis_per_switch: int = 2) -> dict:
+    """A k-ary fat-tree, UNIs are in the edge switches.
+
+    There are k pods of k/2 edge and k/2 aggregation switches and (k/2)^2
+    core switches.
+    """
+    if k % 2:
+        raise ValueError("k must be even")
+    half = k // 2
+    builder = TopologyBuilder()
+    number = 1
+    cores = []
+    for _ in range(half * half):
+        cores.append(builder.add_switch(number))
+        number += 1
+    for _ in range(k):
+        aggregations, edges = [], []
+        for _ in range(half):
+            aggregations.append(builder.add_switch(number))
+            number += 1
+        for _ in range(half):
+            edges.append(builder.add_switch(number))
+            number += 1
+        for edge in edges:
+            for aggregation in aggregations:
+                builder.add_link(edge, aggregation)
+            builder.add_unis(edge, unis_per_switch)
+        for i, aggregation in enumerate(aggregations):
+            for core in cores[i * half:(i + 1) * half]:
+                builder.add_link(aggregation, core)
+    return builder.build()
+
+
+TOPOLOGIES = {"ring": ring, "mesh": mesh, "fat_tree": fat_tree}
+
+
+def load_topology(path: str) -> dict:
+    """Load a topology description from a JSON file, filling link ids."""
+    with open(path, encoding="utf-8") as file:
+        topology = json.load(file)
+    for link in topology["links"]:
+        link.setdefault(
+            "id", link_id(link["endpoint_a"], link["endpoint_b"])
+        )
+    topology.setdefault("unis", [])
+    return topology
@@ -0,0 +1,75 @@
+"""In-process httpx stand-in routing mef_eline requests to StubServices."""
+import json
+from contextlib import ExitStack, contextmanager
+from unittest.mock import patch
+
+import httpx
+
+from .services import StubServices
+
+# Modules of mef_eline sending requests with httpx
+HTTPX_MODULES = (
+    "napps.kytos.mef_eline.models.evc.httpx",
+    "napps.kytos.mef_eline.models.path.httpx",
+)
+
+
+class StubResponse:
+    """Minimal httpx.Response stand-in."""
+
+    def __init__(self, status_code: int, payload):
+        """Create a response with a JSON payload."""
+        self.status_code = status_code
+        self._payload = payload
+
+    @property
+    def is_server_error(self) -> bool:
+        """Whether it's a 5xx response."""
+        return self.status_code >= 500
+
+    @property
+    def text(self) -> str:
+        """Payload as text."""
+        return json.dumps(self._payload)
+
+    def json(self):
+        """Payload."""
+        return self._payload
+
+
+class StubHttpx:
+    """httpx module stand-in sending requests to StubServices."""
+
+    RequestError = httpx.RequestError
+    TimeoutException = httpx.TimeoutException
+
+    def __init__(self, services: StubServices):
+        """Route requests to services."""
+        self.services = services
+
+    # pylint: disable=unused-argument,redefined-outer-name
+    def request(self, method: str, url: str, json=None, **kwargs):
+        """Send a request to the services."""
+        return StubResponse(*self.services.handle(method.upper(), url, json))
+
+    def post(self, url: str, json=None, **kwargs):
+        """Send a POST request."""
+        return self.request("POST", url, json=json)
+
+    def put(self, url: str, json=None, **kwargs):
+        """Send a PUT request."""
+        return self.request("PUT", url, json=json)
+
+    def get(self, url: str, **kwargs):
+        """Send a GET request."""
+        return self.request("GET", url)
+
+
+@contextmanager
+def stub_httpx(services: StubServices):
+    """Send the httpx requests of mef_eline to services meanwhile."""
+    fake = StubHttpx(services)
+    with ExitStack() as stack:
+        for target in HTTPX_MODULES:
+            stack.enter_context(patch(target, fake))
+        yield fake
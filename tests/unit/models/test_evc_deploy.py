@@ -18,7 +18,8 @@ sys.path.insert(0, "/var/lib/kytos/napps/..")
 from napps.kytos.mef_eline.exceptions import (ActivationError,
                                               FlowModException,   # NOQA
                                               EVCPathNotInstalled)
-from napps.kytos.mef_eline.models import EVC, EVCDeploy, Path  # NOQA
+from napps.kytos.mef_eline.models import (CompactPath, EVC,  # NOQA
+                                          EVCDeploy, Path)
 from napps.kytos.mef_eline.settings import (ANY_SB_PRIORITY,  # NOQA
                                             EPL_SB_PRIORITY, EVPL_SB_PRIORITY,
                                             MANAGER_URL,
@@ -844,14 +845,14 @@ class TestEVC():
             switch_b=switch_b,
             endpoint_a_port=9,
             endpoint_b_port=10,
-            metadata={"s_vlan": Mock(value=5)},
+            metadata={"s_vlan": 5},
         )
         link_b_c = get_link_mocked(
             switch_a=switch_b,
             switch_b=switch_c,
             endpoint_a_port=11,
             endpoint_b_port=12,
-            metadata={"s_vlan": Mock(value=6)},
+            metadata={"s_vlan": 6},
         )
 
         attributes = {
@@ -898,6 +899,93 @@ class TestEVC():
         evc.remove_current_flows()
         log_error_mock.assert_called()
 
+    @patch("napps.kytos.mef_eline.models.evc.make_paths_vlans_available")
+    @patch("napps.kytos.mef_eline.controllers.ELineController.upsert_evc")
+    @patch("napps.kytos.mef_eline.models.evc.EVC._send_flow_mods")
+    @patch("napps.kytos.mef_eline.models.path.log")
+    def test_remove_unresolved_paths(self, *args):
+        """Test remove the flows of paths that couldn't be materialized."""
+        (_, send_flow_mods_mocked, _, make_available_mock) = args
+        uni_a = get_uni_mocked(switch_id="switch_uni_a", is_valid=True)
+        uni_z = get_uni_mocked(switch_id="switch_uni_z", is_valid=True)
+        link = get_link_mocked()
+        link_builder = MagicMock(
+            side_effect=[ValueError("err"), ValueError("err"), link]
+        )
+        compact = CompactPath(
+            [("00:01:1", "00:02:1", None), ("00:02:2", "00:03:1", None)],
+            link_builder
+        )
+        evc = EVC(
+            controller=get_controller_mock(), name="custom_name",
+            uni_a=uni_a, uni_z=uni_z, active=True, enabled=True,
+            current_path=compact,
+        )
+        evc.remove_unresolved_paths()
+        send_flow_mods_mocked.assert_not_called()
+
+        assert evc.current_path == Path([])
+        assert evc.unresolved_paths == {"current_path": compact}
+        evc.remove_unresolved_paths()
+        assert not evc.unresolved_paths
+        assert evc.is_active() is False
+        args = send_flow_mods_mocked.call_args[0]
+        assert set(args[0]["switches"]) == {
+            "00:01", "00:02", "00:03", "switch_uni_a", "switch_uni_z"
+        }
+        assert args[0]["flows"][0]["cookie"] == evc.get_cookie()
+        assert args[1] == "delete"
+        paths = make_available_mock.call_args[0][1]
+        assert [list(path) for path in paths] == [[link]]
+
+    @patch("napps.kytos.mef_eline.models.path.Path.make_vlans_available")
+    @patch("napps.kytos.mef_eline.controllers.ELineController.upsert_evc")
+    @patch("napps.kytos.mef_eline.models.evc.EVC._send_flow_mods")
+    @patch("napps.kytos.mef_eline.models.evc.log")
+    @patch("napps.kytos.mef_eline.models.path.log")
+    def test_remove_unresolved_failover_backup(self, *args):
+        """Test unresolved failover and backup paths keep current flows."""
+        (_, log_mock, send_flow_mods_mocked, _, make_available_mock) = args
+        uni_a = get_uni_mocked(switch_id="switch_uni_a", is_valid=True)
+        uni_z = get_uni_mocked(switch_id="switch_uni_z", is_valid=True)
+        current_link = get_link_mocked()
+        failover_link = get_link_mocked(
+            switch_a=Switch("00:00:00:00:00:03"),
+            switch_b=Switch("00:00:00:00:00:04"),
+        )
+        failover = CompactPath(
+            [("00:05:1", "00:06:1", None), ("00:03:1", "00:04:1", None)],
+            MagicMock(side_effect=[ValueError("err"), ValueError("err"),
+                                   failover_link])
+        )
+        backup = CompactPath(
+            [("00:07:1", "00:08:1", None)],
+            MagicMock(side_effect=ValueError("err"))
+        )
+        evc = EVC(
+            controller=get_controller_mock(), name="custom_name",
+            uni_a=uni_a, uni_z=uni_z, active=True, enabled=True,
+            current_path=[current_link], failover_path=failover,
+            backup_path=backup,
+        )
+        assert evc.failover_path == Path([])
+        assert evc.backup_path == Path([])
+        assert set(evc.unresolved_paths) == {"failover_path", "backup_path"}
+
+        evc.remove_unresolved_paths()
+        assert not evc.unresolved_paths
+        assert evc.is_active() is True
+        assert evc.current_path == Path([current_link])
+        assert evc.failover_path == Path([])
+        assert "backup_path" in log_mock.error.call_args[0][0]
+        send_flow_mods_mocked.assert_called_once()
+        args = send_flow_mods_mocked.call_args[0]
+        assert set(args[0]["switches"]) == {
+            "00:00:00:00:00:03", "00:00:00:00:00:04"
+        }
+        assert args[1] == "delete"
+        make_available_mock.assert_called_once()
+
     @patch("napps.kytos.mef_eline.controllers.ELineController.upsert_evc")
     @patch("napps.kytos.mef_eline.models.evc.EVC._send_flow_mods")
     @patch("napps.kytos.mef_eline.models.evc.log.error")
@@ -1092,6 +1180,95 @@ class TestEVC():
         assert args[1] == 'delete'
         assert mock_upsert.call_count == 1
 
+    def test_get_flow_removal_switches(self):
+        """Test get_flow_removal_switches."""
+        uni_a = get_uni_mocked(switch_id="00:00:00:00:00:00:00:01")
+        uni_z = get_uni_mocked(switch_id="00:00:00:00:00:00:00:03")
+        switch_a = Switch("00:00:00:00:00:00:00:01")
+        switch_b = Switch("00:00:00:00:00:00:00:02")
+        switch_c = Switch("00:00:00:00:00:00:00:03")
+        switch_d = Switch("00:00:00:00:00:00:00:04")
+        attributes = {
+            "controller": get_controller_mock(),
+            "name": "custom_name",
+            "uni_a": uni_a,
+            "uni_z": uni_z,
+            "current_path": [
+                get_link_mocked(switch_a=switch_a, switch_b=switch_b),
+                get_link_mocked(switch_a=switch_b, switch_b=switch_c),
+            ],
+            "failover_path": [
+                get_link_mocked(switch_a=switch_a, switch_b=switch_d),
+                get_link_mocked(switch_a=switch_d, switch_b=switch_c),
+            ],
+        }
+        evc = EVC(**attributes)
+        assert evc.get_flow_removal_switches() == {
+            switch_a.id, switch_b.id, switch_c.id, switch_d.id
+        }
+
+        evc.current_path = Path([])
+        evc.failover_path = Path([])
+        assert not evc.get_flow_removal_switches()
+
+    @patch("napps.kytos.mef_eline.models.evc.log.error")
+    def test_clear_paths(self, log_error_mock):
+        """Test clear_paths."""
+        switch_a = Switch("00:00:00:00:00:01")
+        switch_b = Switch("00:00:00:00:00:02")
+        link = get_link_mocked(
+            switch_a=switch_a,
+            switch_b=switch_b,
+            metadata={"s_vlan": 5},
+        )
+        attributes = {
+            "controller": get_controller_mock(),
+            "name": "custom_name",
+            "uni_a": get_uni_mocked(is_valid=True),
+            "uni_z": get_uni_mocked(is_valid=True),
+            "active": True,
+            "enabled": True,
+        }
+        evc = EVC(**attributes)
+        evc.current_path = MagicMock()
+        evc.current_path.__iter__.return_value = [link]
+        failover_path = MagicMock()
+        failover_path.make_vlans_available.side_effect = (
+            KytosTagtypeNotSupported("")
+        )
+        evc.failover_path = failover_path
+        current_path = evc.current_path
+
+        assert evc.clear_paths(return_path=True) == {link.id: 5}
+        current_path.make_vlans_available.assert_called_once()
+        failover_path.make_vlans_available.assert_called_once()
+        log_error_mock.assert_called_once()
+        assert not evc.current_path
+        assert not evc.failover_path
+        assert not evc.is_active()
+        assert evc.is_enabled()
+
+    def test_clear_paths_released_paths(self):
+        """Test clear_paths appending the paths to be released."""
+        attributes = {
+            "controller": get_controller_mock(),
+            "name": "custom_name",
+            "uni_a": get_uni_mocked(is_valid=True),
+            "uni_z": get_uni_mocked(is_valid=True),
+            "active": True,
+            "enabled": True,
+        }
+        evc = EVC(**attributes)
+        current_path, failover_path = MagicMock(), MagicMock()
+        evc.current_path, evc.failover_path = current_path, failover_path
+        released_paths = []
+        assert not evc.clear_paths(released_paths=released_paths)
+        assert released_paths == [current_path, failover_path]
+        current_path.make_vlans_available.assert_not_called()
+        failover_path.make_vlans_available.assert_not_called()
+        assert not evc.current_path
+        assert not evc.failover_path
+
     @staticmethod
     def create_evc_intra_switch():
         """Create intra-switch EVC."""
@@ -1520,8 +1697,6 @@ class TestEVC():
         """Test check_list_traces with UNIs ordered and unordered."""
         evc = self.create_evc_inter_switch()
 
-        for link in evc.primary_links:
-            link.metadata['s_vlan'] = MagicMock(value=link.metadata['s_vlan'])
         evc.current_path = evc.primary_links
 
         trace_a = [
@@ -1575,8 +1750,6 @@ class TestEVC():
         """Test check_list_traces method."""
         evc = self.create_evc_inter_switch()
 
-        for link in evc.primary_links:
-            link.metadata['s_vlan'] = MagicMock(value=link.metadata['s_vlan'])
         evc.current_path = evc.primary_links
 
         trace_a = [
@@ -1694,8 +1867,6 @@ class TestEVC():
         """Test check_list_traces method."""
         evc = self.create_evc_inter_switch("any", "any")
 
-        for link in evc.primary_links:
-            link.metadata['s_vlan'] = MagicMock(value=link.metadata['s_vlan'])
         evc.current_path = evc.primary_links
 
         trace_a = [
@@ -1759,8 +1930,6 @@ class TestEVC():
         """Test check_list_traces method."""
         evc = self.create_evc_inter_switch("untagged", "untagged")
 
-        for link in evc.primary_links:
-            link.metadata['s_vlan'] = MagicMock(value=link.metadata['s_vlan'])
         evc.current_path = evc.primary_links
 
         trace_a = [
@@ -1824,8 +1993,6 @@ class TestEVC():
         """Test check_list_traces method for invalid traces by trace type."""
         evc = self.create_evc_inter_switch()
 
-        for link in evc.primary_links:
-            link.metadata['s_vlan'] = MagicMock(value=link.metadata['s_vlan'])
         evc.current_path = evc.primary_links
 
         trace_a = [
@@ -1920,6 +2087,24 @@ class TestEVC():
         assert args[0] == evc
         assert args[1] == ["mock"] * 6
 
+    @patch("napps.kytos.mef_eline.utils.settings")
+    @patch("napps.kytos.mef_eline.models.evc.EVCDeploy.check_range")
+    @patch("napps.kytos.mef_eline.models.evc.EVCDeploy.run_bulk_sdntraces")
+    def test_check_list_traces_vlan_list_first_last(self, *args):
+        """Test check_list_traces only traces the first and last masks"""
+        mock_bulk, mock_range, mock_settings = args
+        mock_settings.TAGRANGE_TRACE_STRATEGY = "first_last"
+        mask_list = [1, '2/4094', '4/4094']
+        evc = self.create_evc_inter_switch([[1, 5]], [[1, 5]])
+        evc.uni_a.user_tag.mask_list = mask_list
+        evc.uni_z.user_tag.mask_list = mask_list
+        mock_bulk.return_value = {"result": ["mock"] * 4}
+        mock_range.return_value = True
+        assert EVC.check_list_traces([evc]) == {evc._id: True}
+        uni_list = mock_bulk.call_args[0][0]
+        assert [mask for _, mask in uni_list] == [1, 1, '4/4094', '4/4094']
+        mock_range.assert_called_once_with(evc, ["mock"] * 4, [1, '4/4094'])
+
     @patch("napps.kytos.mef_eline.models.evc.EVCDeploy.check_trace")
     @patch("napps.kytos.mef_eline.models.evc.log")
     @patch("napps.kytos.mef_eline.models.evc.EVCDeploy.run_bulk_sdntraces")
@@ -5,6 +5,8 @@ import pytest
 from napps.kytos.mef_eline import settings
 from httpx import TimeoutException, ConnectError
 from kytos.core.common import EntityStatus
+from kytos.core.exceptions import KytosNoTagAvailableError, KytosTagError
+from kytos.core.interface import TAG
 from kytos.core.link import Link
 from kytos.core.switch import Switch
 
@@ -14,7 +16,10 @@ sys.path.insert(0, "/var/lib/kytos/napps/..")
 # pylint: enable=wrong-import-position
 from napps.kytos.mef_eline.exceptions import InvalidPath  # NOQA pycodestyle
 from napps.kytos.mef_eline.models import (  # NOQA pycodestyle
-    DynamicPathManager, Path)
+    CompactPath, DynamicPathManager, Path)
+from napps.kytos.mef_eline.models.path import (  # NOQA pycodestyle
+    LazyPathAttribute, choose_paths_vlans, get_link_s_vlan, intern_link,
+    make_paths_vlans_available)
 from napps.kytos.mef_eline.tests.helpers import (  # NOQA pycodestyle
     MockResponse, get_link_mocked, id_to_interface_mock)
 
@@ -133,6 +138,87 @@ class TestPath():
         current_path = Path(links)
         assert current_path.status == EntityStatus.DOWN
 
+    def test_status_cache(self):
+        """Test the status is cached until the topology changes."""
+        link1 = get_link_mocked(status=EntityStatus.UP)
+        link1.id = "def"
+        current_path = Path([link1])
+        assert current_path.status == EntityStatus.UP
+        link1.status = EntityStatus.DOWN
+        assert current_path.status == EntityStatus.UP
+        Path.topology_changed()
+        assert current_path.status == EntityStatus.DOWN
+
+        link2 = get_link_mocked(status=EntityStatus.DISABLED)
+        link2.id = "abc"
+        link1.status = EntityStatus.UP
+        current_path.append(link2)
+        assert current_path.status == EntityStatus.DISABLED
+
+    def test_status_suppressed_link(self):
+        """Test links suppressed by flap dampening are considered DOWN."""
+        link1 = get_link_mocked(status=EntityStatus.UP)
+        link1.id = "def"
+        current_path = Path([link1])
+        assert current_path.status == EntityStatus.UP
+        Path.set_suppressed_links(frozenset({"def"}))
+        try:
+            assert current_path.status == EntityStatus.DOWN
+        finally:
+            Path.set_suppressed_links(frozenset())
+        assert current_path.status == EntityStatus.UP
+
+    def test_indexes_list_changes(self):
+        """Test the link and interface indexes follow list changes."""
+        link1 = get_link_mocked(endpoint_a_port=1, endpoint_b_port=2)
+        link2 = get_link_mocked(endpoint_a_port=3, endpoint_b_port=4)
+        link1.id, link2.id = "link1", "link2"
+        path = Path([link1])
+        assert path.is_affected_by_link(link1)
+        assert not path.is_affected_by_link(link2)
+        assert path.link_affected_by_interface(link1.endpoint_b) == link1
+        assert path.link_affected_by_interface(link2.endpoint_a) is None
+
+        path.append(link2)
+        assert path.is_affected_by_link(link2)
+        assert path.link_affected_by_interface(link2.endpoint_a) == link2
+
+        path[0] = link2
+        assert not path.is_affected_by_link(link1)
+        assert path.link_affected_by_interface(link1.endpoint_b) is None
+
+        path.clear()
+        assert not path.is_affected_by_link(link2)
+
+        path += [link1]
+        assert path.is_affected_by_link(link1)
+        del path[0]
+        assert not path.is_affected_by_link(link1)
+
+    def test_contains_list_changes(self):
+        """Test link membership uses the index and follows list changes."""
+        link1 = get_link_mocked(endpoint_a_port=1, endpoint_b_port=2)
+        link2 = get_link_mocked(endpoint_a_port=3, endpoint_b_port=4)
+        link1.id, link2.id = "link1", "link2"
+        path = Path([link1])
+        assert link1 in path
+        assert link2 not in path
+        assert MagicMock(id="link1") in path
+        assert None not in path
+
+        path.append(link2)
+        assert link2 in path
+        path.remove(link1)
+        assert link1 not in path
+        path.insert(0, link1)
+        assert link1 in path
+        path.pop()
+        assert link2 not in path
+        path.extend([link2])
+        assert link2 in path
+        path.clear()
+        assert link1 not in path and link2 not in path
+
     def test_compare_same_paths(self):
         """Test compare paths with same links."""
         links = [
@@ -182,6 +268,153 @@ class TestPath():
         expected_dict = [{"id": 3}, {"id": 2}]
         assert expected_dict == current_path.as_dict()
 
+    def test_as_dict_s_vlan(self):
+        """Test path as dict with the S-VLAN of its links."""
+        link = get_link_mocked(link_dict={"id": 3, "metadata": {"a": 1}})
+        path = Path([link], s_vlans={link.id: TAG("vlan", 5)})
+        assert path.as_dict() == [{
+            "id": 3, "metadata": {"a": 1, "s_vlan": TAG("vlan", 5).as_dict()}
+        }]
+
+    def test_choose_vlans(self):
+        """Test choose_vlans keeps the S-VLANs in the path."""
+        link = get_link_mocked()
+        link.get_next_available_tag.return_value = 10
+        path = Path([link])
+        controller = MagicMock()
+        path.choose_vlans(controller, {link.id: 11})
+        link.get_next_available_tag.assert_called_with(
+            controller, link.id, try_avoid_value=11
+        )
+        assert path.s_vlans[link.id] == TAG("vlan", 10)
+        assert get_link_s_vlan(path, link) == TAG("vlan", 10)
+        link.add_metadata.assert_not_called()
+
+        path.make_vlans_available(controller)
+        link.make_tags_available.assert_called_with(
+            controller, 10, link.id, "vlan", check_order=False
+        )
+        assert not path.s_vlans
+        link.remove_metadata.assert_not_called()
+
+    def test_choose_paths_vlans_rollback(self):
+        """Test choose_paths_vlans makes the chosen S-VLANs available."""
+        link1 = get_link_mocked(endpoint_a_port=1, endpoint_b_port=2)
+        link2 = get_link_mocked(endpoint_a_port=3, endpoint_b_port=4)
+        link1.id, link2.id = "link1", "link2"
+        link1.get_next_available_tag.return_value = 10
+        link2.get_next_available_tag.side_effect = KytosNoTagAvailableError(
+            link2
+        )
+        path1, path2 = Path([link1]), Path([link2])
+        controller = MagicMock()
+        with pytest.raises(KytosNoTagAvailableError):
+            choose_paths_vlans(controller, [(path1, None), (path2, {})])
+        link1.make_tags_available.assert_called_once_with(
+            controller, 10, "link1", "vlan", check_order=False
+        )
+        link2.make_tags_available.assert_not_called()
+        assert not path1.s_vlans
+        assert not path2.s_vlans
+
+    def test_make_paths_vlans_available(self):
+        """Test the S-VLANs of a link shared by many paths are merged."""
+        link = get_link_mocked()
+        link.id = "link1"
+        link.make_tags_available.return_value = [], []
+        path1 = Path([link], s_vlans={"link1": TAG("vlan", 11)})
+        path2 = Path([link], s_vlans={"link1": TAG("vlan", 10)})
+        controller = MagicMock()
+        make_paths_vlans_available(controller, [path1, path2])
+        link.make_tags_available.assert_called_once_with(
+            controller, [[10, 11]], "link1", "vlan", check_order=False
+        )
+        assert not path1.s_vlans
+        assert not path2.s_vlans
+
+    @patch("napps.kytos.mef_eline.models.path.log")
+    def test_make_paths_vlans_available_errors(self, log_mock):
+        """Test duplicated or invalid S-VLANs don't keep the others in use."""
+        link = get_link_mocked()
+        link.id = "link1"
+        link.make_tags_available.return_value = [], []
+        paths = [
+            Path([link], s_vlans={"link1": TAG("vlan", value)})
+            for value in (11, 10, 11)
+        ]
+        controller = MagicMock()
+        make_paths_vlans_available(controller, paths)
+        link.make_tags_available.assert_called_once_with(
+            controller, [[10, 11]], "link1", "vlan", check_order=False
+        )
+        assert "more than once" in log_mock.error.call_args[0][0]
+
+        link.make_tags_available.reset_mock()
+        link.make_tags_available.side_effect = [
+            KytosTagError("bulk"), ([], []), KytosTagError("12"), ([], [11])
+        ]
+        paths = [
+            Path([link], s_vlans={"link1": TAG("vlan", value)})
+            for value in (10, 12, 11)
+        ]
+        make_paths_vlans_available(controller, paths)
+        link.make_tags_available.assert_has_calls([
+            call(controller, [[10, 12]], "link1", "vlan", check_order=False),
+            call(controller, 10, "link1", "vlan", check_order=False),
+            call(controller, 12, "link1", "vlan", check_order=False),
+            call(controller, 11, "link1", "vlan", check_order=False),
+        ])
+        assert all(not path.s_vlans for path in paths)
+        log_mock.error.assert_any_call(
+            "Error making S-VLANs available: {'link1': '12'}"
+        )
+
+    def test_s_vlan_pools(self):
+        """Test S-VLANs are taken from and returned to the link pools."""
+        link = get_link_mocked()
+        link.id = "link1"
+        link.get_next_available_tag.return_value = 20
+        pools = MagicMock()
+        pools.take.side_effect = [10, None]
+        pools.put.side_effect = [True, False]
+        controller = MagicMock()
+        path1, path2 = Path([link]), Path([link])
+        Path.set_s_vlan_pools(pools)
+        try:
+            choose_paths_vlans(controller, [(path1, {"link1": 5})])
+            pools.take.assert_called_with(link, try_avoid_value=5)
+            link.get_next_available_tag.assert_not_called()
+            choose_paths_vlans(controller, [(path2, None)])
+            link.get_next_available_tag.assert_called_once_with(
+                controller, "link1", try_avoid_value=None
+            )
+            assert path1.s_vlans["link1"].value == 10
+            assert path2.s_vlans["link1"].value == 20
+
+            link.make_tags_available.return_value = [], []
+            make_paths_vlans_available(controller, [path1, path2])
+        finally:
+            Path.set_s_vlan_pools(None)
+        pools.put.assert_any_call(link, 10)
+        link.make_tags_available.assert_called_once_with(
+            controller, 20, "link1", "vlan", check_order=False
+        )
+
+    def test_get_link_s_vlan_from_metadata(self):
+        """Test get_link_s_vlan falls back to the link metadata."""
+        link = get_link_mocked(metadata={"s_vlan": 5})
+        assert get_link_s_vlan(Path([link]), link).value == 5
+        assert get_link_s_vlan([link], link).value == 5
+
+    def test_intern_link(self):
+        """Test intern_link shares links with the same endpoints."""
+        intf_a, intf_b = MagicMock(id="a"), MagicMock(id="b")
+        link = intern_link(intf_a, intf_b)
+        assert intern_link(intf_a, intf_b) is link
+        assert intern_link(intf_b, intf_a) is not link
+        new_intf_a = MagicMock(id="a")
+        assert intern_link(new_intf_a, intf_b) is not link
+
     def test_empty_is_valid(self) -> None:
         """Test empty path is valid."""
         path = Path([])
@@ -260,6 +493,87 @@ class TestPath():
             path.is_valid(switch3, switch6)
 
 
+class TestCompactPath():
+    """Tests for CompactPath and LazyPathAttribute."""
+
+    def test_materialize(self):
+        """Test materialize builds every link with its S-VLAN."""
+        link1, link2 = MagicMock(id="1"), MagicMock(id="2")
+        link_builder = MagicMock(side_effect=[link1, link2])
+        s_vlan = TAG("vlan", 5)
+        compact = CompactPath([("a", "b", None), ("c", "d", s_vlan)],
+                              link_builder)
+        assert len(compact) == 2
+        path = compact.materialize()
+        assert isinstance(path, Path)
+        assert list(path) == [link1, link2]
+        assert path.s_vlans == {"2": s_vlan}
+        link_builder.assert_has_calls([call("a", "b"), call("c", "d")])
+
+    def test_materialize_error(self):
+        """Test materialize raises ValueError if a link fails."""
+        link = MagicMock(id="2")
+
+        def link_builder(id_a, _id_b):
+            if id_a == "00:01:1":
+                raise ValueError("err")
+            return link
+
+        s_vlan = TAG("vlan", 5)
+        compact = CompactPath(
+            [("00:01:1", "00:02:1", None), ("00:02:2", "00:03:1", s_vlan)],
+            link_builder
+        )
+        with pytest.raises(ValueError):
+            compact.materialize()
+        path = compact.materialize(skip_invalid=True)
+        assert list(path) == [link]
+        assert path.s_vlans == {"2": s_vlan}
+        assert compact.switch_ids() == {"00:01", "00:02", "00:03"}
+
+    def test_lazy_path_attribute_error(self):
+        """Test LazyPathAttribute keeps the paths it can't materialize."""
+
+        class Dummy:
+            """Class with a lazy path."""
+            path = LazyPathAttribute()
+
+            def __init__(self):
+                self.unresolved_paths = {}
+
+        link_builder = MagicMock(side_effect=ValueError("err"))
+        obj = Dummy()
+        compact = CompactPath([("a", "b", None)], link_builder)
+        obj.path = compact
+        with patch("napps.kytos.mef_eline.models.path.log") as log_mock:
+            assert obj.path == Path([])
+            log_mock.error.assert_called_once()
+        assert obj.unresolved_paths == {"path": compact}
+        assert LazyPathAttribute.is_materialized(obj, "path")
+
+    def test_lazy_path_attribute(self):
+        """Test LazyPathAttribute materializes on first access only."""
+
+        class Dummy:
+            """Class with a lazy path."""
+            path = LazyPathAttribute()
+
+        link = MagicMock()
+        link_builder = MagicMock(return_value=link)
+        obj = Dummy()
+        obj.path = CompactPath([("a", "b", None)], link_builder)
+        assert not LazyPathAttribute.is_materialized(obj, "path")
+        link_builder.assert_not_called()
+        assert obj.path == Path([link])
+        assert obj.path is obj.path
+        assert link_builder.call_count == 1
+        assert LazyPathAttribute.is_materialized(obj, "path")
+        assert isinstance(Dummy.path, LazyPathAttribute)
+
+        obj.path = Path([])
+        assert obj.path == Path([])
+
+
 class TestDynamicPathManager():
     """Tests for the DynamicPathManager class"""
 
@@ -400,6 +714,23 @@ class TestDynamicPathManager():
         )
         mock_httpx_post.assert_has_calls([expected_call])
 
+    @patch("httpx.post")
+    def test_get_paths_suppressed_links(self, mock_httpx_post):
+        """Test suppressed links are undesired links of pathfinder."""
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = {"paths": []}
+        mock_httpx_post.return_value = mock_response
+        circuit = MagicMock()
+        circuit.uni_a.interface.id = "1"
+        circuit.uni_z.interface.id = "2"
+        Path.set_suppressed_links(frozenset({"def"}))
+        try:
+            DynamicPathManager.get_paths(circuit, undesired_links=["abc"])
+        finally:
+            Path.set_suppressed_links(frozenset())
+        request_data = mock_httpx_post.call_args[1]["json"]
+        assert request_data["undesired_links"] == ["abc", "def"]
+
     @patch('time.sleep')
     @patch("napps.kytos.mef_eline.models.path.log")
     @patch("httpx.post")
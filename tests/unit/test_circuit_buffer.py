@@ -0,0 +1,57 @@
+"""Module to test the circuit_buffer.py file."""
+# pylint: disable=protected-access
+from napps.kytos.mef_eline.circuit_buffer import CircuitBuffer
+from napps.kytos.mef_eline.tests.helpers import get_evc_mocked
+
+
+class TestCircuitBuffer():
+    """Tests to verify CircuitBuffer class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.evcs = {
+            "1": get_evc_mocked(service_level=1),
+            "2": get_evc_mocked(service_level=7),
+            "3": get_evc_mocked(service_level=1, creation_time=0),
+        }
+        self.buffer = CircuitBuffer(self.evcs)
+
+    def test_by_priority(self):
+        """Test EVCs are sorted by service level and creation time."""
+        assert self.buffer._order is None
+        assert self.buffer.by_priority() == [
+            self.evcs["2"], self.evcs["3"], self.evcs["1"]
+        ]
+        assert len(self.buffer._order) == 3
+
+    def test_changes_keep_order(self):
+        """Test the order is kept on every dict change."""
+        self.buffer.by_priority()
+        evc4 = get_evc_mocked(service_level=4)
+        self.buffer["4"] = evc4
+        assert self.buffer.setdefault("4", get_evc_mocked()) is evc4
+        evc5 = self.buffer.setdefault("5", get_evc_mocked(service_level=9))
+        assert self.buffer.by_priority() == [
+            evc5, self.evcs["2"], evc4, self.evcs["3"], self.evcs["1"]
+        ]
+
+        del self.buffer["2"]
+        assert self.buffer.pop("5") is evc5
+        assert self.buffer.pop("5", None) is None
+        self.buffer.update({"6": get_evc_mocked(service_level=0)})
+        assert self.buffer.by_priority() == [
+            evc4, self.evcs["3"], self.evcs["1"], self.buffer["6"]
+        ]
+
+        self.buffer.clear()
+        assert not self.buffer.by_priority()
+
+    def test_reorder(self):
+        """Test reorder after an EVC service level changes."""
+        self.buffer.by_priority()
+        self.evcs["1"].service_level = 8
+        self.buffer.reorder("1")
+        self.buffer.reorder("unknown")
+        assert self.buffer.by_priority() == [
+            self.evcs["1"], self.evcs["2"], self.evcs["3"]
+        ]
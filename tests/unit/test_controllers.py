@@ -1,5 +1,5 @@
 """Tests for the DB controller."""
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from controllers import ELineController
 
@@ -43,7 +43,17 @@ class TestControllers():
             ("evcs", [("archived", 1)]),
         ]
         mock = self.eline.mongo.bootstrap_index
-        assert mock.call_count == len(expected_indexes)
+        assert mock.call_count == len(expected_indexes) + 1
+        mock.assert_any_call("evcs", [("metadata.$**", 1)])
+
+    @patch("napps.kytos.mef_eline.settings.METADATA_INDEXES", ["a", "b.c"])
+    def test_bootstrap_indexes_metadata_keys(self):
+        """Test bootstrap_indexes with declared metadata keys"""
+        self.eline.bootstrap_indexes()
+        mock = self.eline.mongo.bootstrap_index
+        assert mock.call_count == 4
+        mock.assert_any_call("evcs", [("metadata.a", 1)])
+        mock.assert_any_call("evcs", [("metadata.b.c", 1)])
 
     def test_get_circuits(self):
         """Test get_circuits"""
@@ -70,6 +80,22 @@ class TestControllers():
         args = self.eline.db.evcs.aggregate.call_args[0][0][0]
         assert args["$match"]["metadata.test"] == 123
 
+    def test_get_circuits_paginated(self):
+        """Test get_circuits with limit, after and fields"""
+        self.eline.get_circuits(limit=10, after="abc", fields=["name"])
+        args = self.eline.db.evcs.aggregate.call_args[0][0]
+        assert args[0]["$match"] == {"archived": False, "_id": {"$gt": "abc"}}
+        assert args[1] == {"$sort": {"_id": 1}}
+        assert args[2] == {"$limit": 10}
+        assert args[3] == {"$project": {"_id": 0, "id": 1, "name": 1}}
+
+    def test_iter_circuits(self):
+        """Test iter_circuits"""
+        self.eline.db.evcs.aggregate.return_value = iter([{"id": "1"}])
+        assert list(self.eline.iter_circuits()) == [{"id": "1"}]
+        args = self.eline.db.evcs.aggregate.call_args[0][0]
+        assert len(args) == 3
+
     def test_upsert_evc(self):
         """Test upsert_evc"""
 
@@ -0,0 +1,53 @@
+"""Module to test the dampening.py file."""
+from unittest.mock import MagicMock
+
+import pytest
+
+from napps.kytos.mef_eline.dampening import LinkDampening
+
+
+class TestLinkDampening():
+    """Tests to verify LinkDampening class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.dampening = LinkDampening(1000, 60, 3000, 750)
+        self.link = MagicMock(id="abc")
+
+    def test_invalid_thresholds(self):
+        """Test reuse_threshold must be lower than suppress_threshold."""
+        with pytest.raises(ValueError):
+            LinkDampening(1000, 60, 750, 3000)
+
+    def test_flap_suppress(self):
+        """Test a link is suppressed after flapping."""
+        assert not self.dampening.flap(self.link, now=0)
+        assert not self.dampening.flap(self.link, now=0)
+        assert not self.dampening.is_suppressed("abc")
+        assert self.dampening.flap(self.link, now=0)
+        assert self.dampening.is_suppressed("abc")
+        assert self.dampening.suppressed() == {"abc"}
+        assert not self.dampening.is_suppressed("def")
+
+    def test_flap_decay(self):
+        """Test the penalty decays with the half life."""
+        self.dampening.flap(self.link, now=0)
+        self.dampening.flap(self.link, now=0)
+        # 2000 decays to 1000 in a half life
+        assert not self.dampening.flap(self.link, now=60)
+        assert self.dampening.flap(self.link, now=60)
+
+    def test_release(self):
+        """Test suppressed links are released below reuse_threshold."""
+        for _ in range(4):
+            self.dampening.flap(self.link, now=0)
+        # 4000 decays to 1000
+        assert not self.dampening.release(now=120)
+        assert self.dampening.is_suppressed("abc")
+        # 4000 decays to 500
+        assert self.dampening.release(now=180) == [self.link]
+        assert not self.dampening.is_suppressed("abc")
+        assert not self.dampening.suppressed()
+        # 500 decays to 250, below half of the reuse_threshold
+        self.dampening.release(now=240)
+        assert not self.dampening._links  # pylint: disable=protected-access
@@ -0,0 +1,124 @@
+"""Module to test the debouncer.py file."""
+# pylint: disable=protected-access
+import time
+from threading import Event
+from unittest.mock import MagicMock
+
+from napps.kytos.mef_eline.debouncer import Debouncer
+
+
+class TestDebouncer():
+    """Tests to verify Debouncer class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.callback = MagicMock()
+        self.debouncer = Debouncer(self.callback, 10, 60)
+        # pop_due is called by the tests instead of the timer thread
+        self.debouncer._thread = MagicMock()
+
+    def teardown_method(self):
+        """Teardown method."""
+        self.debouncer.stop()
+
+    def test_push_last_value(self):
+        """Test only the last value pushed in the delay is due."""
+        assert self.debouncer.push("intf1", "down", 1)
+        assert self.debouncer.push("intf1", "up", 2)
+        assert self.debouncer.push("intf2", "down", 1)
+        assert not self.debouncer.pop_due()
+        assert self.debouncer.pending() == 2
+        now = time.monotonic() + 10
+        assert self.debouncer.pop_due(now) == [
+            ("intf1", "up"), ("intf2", "down")
+        ]
+        assert not self.debouncer.pop_due(now)
+        assert len(self.debouncer) == 2
+        assert self.debouncer.pending() == 0
+
+    def test_push_out_of_order(self):
+        """Test values older than the last one are discarded."""
+        assert self.debouncer.push("intf1", "up", 2)
+        assert not self.debouncer.push("intf1", "down", 1)
+        now = time.monotonic() + 10
+        assert self.debouncer.pop_due(now) == [("intf1", "up")]
+        assert not self.debouncer.push("intf1", "down", 1)
+
+    def test_evict_idle(self):
+        """Test the state of an idle key is evicted."""
+        self.debouncer.push("intf1", "up", 1)
+        now = time.monotonic() + 10
+        self.debouncer.pop_due(now)
+        assert len(self.debouncer) == 1
+        self.debouncer.pop_due(now + 60)
+        assert not len(self.debouncer)
+        assert self.debouncer.push("intf1", "down", 0)
+
+    def test_evict_not_idle(self):
+        """Test the state isn't evicted if the key got a newer value."""
+        self.debouncer.push("intf1", "up", 1)
+        now = time.monotonic() + 10
+        self.debouncer.pop_due(now)
+        self.debouncer._last["intf1"] = (2, now + 30)
+        self.debouncer.pop_due(now + 60)
+        assert len(self.debouncer) == 1
+
+    def test_timer_thread(self):
+        """Test the callback runs once after the delay."""
+        done = Event()
+        self.callback.side_effect = lambda *_: done.set()
+        debouncer = Debouncer(self.callback, 0.01, 60)
+        debouncer.push("intf1", "down", 1)
+        debouncer.push("intf1", "up", 2)
+        assert done.wait(5)
+        self.callback.assert_called_once_with("intf1", "up")
+        debouncer.stop()
+
+    def test_same_key_serialized(self):
+        """Test a value due while its key callback runs is held until then."""
+        assert self.debouncer.push("intf1", "down", 1)
+        now = time.monotonic() + 10
+        assert self.debouncer.pop_due(now) == [("intf1", "down")]
+        assert self.debouncer.push("intf1", "up", 2)
+        assert self.debouncer.push("intf2", "up", 2)
+        assert self.debouncer.pop_due(now + 10) == [("intf2", "up")]
+        assert self.debouncer.pending() == 1
+        self.debouncer._run_callback("intf1", "down")
+        assert self.debouncer.pop_due(now + 10) == [("intf1", "up")]
+
+    def test_same_key_no_overlap(self):
+        """Test callbacks of a key don't overlap and keep their order."""
+        calls, running, overlaps = [], set(), []
+        done = Event()
+
+        def callback(key, value):
+            if key in running:
+                overlaps.append(key)
+            running.add(key)
+            time.sleep(0.05)
+            calls.append((key, value))
+            running.discard(key)
+            if value == "up":
+                done.set()
+
+        debouncer = Debouncer(callback, 0.01, 60, max_workers=8)
+        debouncer.push("intf1", "down", 1)
+        time.sleep(0.03)
+        debouncer.push("intf1", "up", 2)
+        assert done.wait(5)
+        assert not overlaps
+        assert calls == [("intf1", "down"), ("intf1", "up")]
+        debouncer.stop()
+
+    def test_callback_error(self):
+        """Test a failing callback doesn't raise."""
+        self.callback.side_effect = ValueError
+        self.debouncer._run_callback("intf1", "up")
+        self.callback.assert_called_once_with("intf1", "up")
+
+    def test_stop(self):
+        """Test values aren't pushed after stop."""
+        self.debouncer.push("intf1", "up", 1)
+        self.debouncer.stop()
+        assert not self.debouncer.pop_due(time.monotonic() + 10)
+        assert not self.debouncer.push("intf1", "down", 2)
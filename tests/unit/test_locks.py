@@ -0,0 +1,67 @@
+"""Module to test the lock contention instrumentation."""
+from threading import Event, Thread
+from unittest.mock import patch
+
+from napps.kytos.mef_eline import locks
+from napps.kytos.mef_eline.locks import (InstrumentedLock, held_locks,
+                                         lock_sites, make_lock,
+                                         reset_lock_sites)
+
+
+class TestInstrumentedLock:
+    """Tests to verify InstrumentedLock class."""
+
+    def setup_method(self):
+        """Setup method."""
+        reset_lock_sites()
+        self.lock = InstrumentedLock("test", "evc1")
+
+    def test_hold(self):
+        """Test the holder is listed while the lock is held."""
+        with self.lock:
+            assert self.lock.locked()
+            held = held_locks()
+            assert len(held) == 1
+            assert held[0]["lock"] == "test"
+            assert held[0]["resource"] == "evc1"
+            assert ".test_hold:" in held[0]["site"]
+        assert not self.lock.locked()
+        assert not held_locks()
+        sites = lock_sites()
+        assert len(sites) == 1
+        assert sites[0]["count"] == 1
+        assert sites[0]["site"] == held[0]["site"]
+
+    def test_acquire(self):
+        """Test acquire and release like a threading.Lock."""
+        assert self.lock.acquire()
+        assert not self.lock.acquire(blocking=False)
+        assert not self.lock.acquire(timeout=0.01)
+        self.lock.release()
+        assert lock_sites()[0]["count"] == 1
+
+    def test_wait(self):
+        """Test the time waited to acquire the lock."""
+        acquired, release = Event(), Event()
+
+        def hold():
+            with self.lock:
+                acquired.set()
+                release.wait()
+
+        thread = Thread(target=hold)
+        thread.start()
+        acquired.wait()
+        Thread(target=lambda: (release.wait(0.05), release.set())).start()
+        with self.lock:
+            pass
+        thread.join()
+        waits = {site["site"]: site["wait_max"] for site in lock_sites()}
+        assert len(waits) == 2
+        assert max(waits.values()) >= 0.04
+
+    def test_make_lock(self):
+        """Test make_lock follows settings.LOCK_INSTRUMENTATION."""
+        assert isinstance(make_lock("evc"), InstrumentedLock)
+        with patch.object(locks.settings, "LOCK_INSTRUMENTATION", False):
+            assert not isinstance(make_lock("evc"), InstrumentedLock)
@@ -5,13 +5,16 @@ from unittest.mock import (AsyncMock, MagicMock, Mock, call,
 
 import pytest
 from kytos.lib.helpers import get_controller_mock, get_test_client
-from kytos.core.helpers import now
 from kytos.core.common import EntityStatus
 from kytos.core.events import KytosEvent
 from kytos.core.exceptions import KytosTagError
 from kytos.core.interface import TAGRange, UNI, Interface
+from napps.kytos.mef_eline import profiling, tracing
 from napps.kytos.mef_eline.exceptions import InvalidPath
 from napps.kytos.mef_eline.models import EVC
+from napps.kytos.mef_eline.models.path import (LazyPathAttribute,
+                                               get_link_s_vlan)
+from napps.kytos.mef_eline.scheduler import CircuitSchedule
 from napps.kytos.mef_eline.tests.helpers import get_uni_mocked
 
 
@@ -128,6 +131,7 @@ class TestMain:
         evc1.has_recent_removed_flow.return_value = False
         evc1.is_recent_updated.return_value = False
         evc1.execution_rounds = 0
+        evc1.unresolved_paths = {}
         evc2 = MagicMock(id=2, service_level=7, creation_time=1)
         evc2.is_enabled.return_value = True
         evc2.is_active.return_value = False
@@ -135,6 +139,7 @@ class TestMain:
         evc2.has_recent_removed_flow.return_value = False
         evc2.is_recent_updated.return_value = False
         evc2.execution_rounds = 0
+        evc2.unresolved_paths = {"current_path": MagicMock()}
         self.napp.circuits = {'1': evc1, '2': evc2}
         assert self.napp.get_evcs_by_svc_level() == [evc2, evc1]
 
@@ -147,6 +152,8 @@ class TestMain:
         assert evc1.activate.call_count == 1
         assert evc1.sync.call_count == 1
         assert evc2.deploy.call_count == 1
+        evc1.remove_unresolved_paths.assert_not_called()
+        evc2.remove_unresolved_paths.assert_called_once()
 
     @patch('napps.kytos.mef_eline.main.settings')
     @patch('napps.kytos.mef_eline.main.Main._load_evc')
@@ -341,18 +348,84 @@ class TestMain:
 
     async def test_list_with_circuits_stored(self):
         """Test if list circuits return all circuits stored."""
-        circuits = {
-            'circuits':
-            {"1": {"name": "circuit_1"}, "2": {"name": "circuit_2"}}
-        }
+        for evc_id in ("2", "1"):
+            evc = MagicMock(id=evc_id, archived=False, execution_rounds=0,
+                            metadata={"a": int(evc_id)})
+            evc.as_dict.return_value = {"id": evc_id, "name": f"c_{evc_id}"}
+            self.napp.read_model.update(evc)
         get_circuits = self.napp.mongo_controller.get_circuits
-        get_circuits.return_value = circuits
 
         url = f"{self.base_endpoint}/v2/evc/"
         response = await self.api_client.get(url)
-        expected_result = circuits["circuits"]
-        get_circuits.assert_called_with(archived="false", metadata={})
+        expected_result = {
+            "1": {"id": "1", "name": "c_1", "execution_rounds": 0},
+            "2": {"id": "2", "name": "c_2", "execution_rounds": 0},
+        }
+        get_circuits.assert_not_called()
+        assert response.status_code == 200, response.data
         assert response.json() == expected_result
+        assert list(response.json()) == ["1", "2"]
+
+        url = f"{self.base_endpoint}/v2/evc/?metadata.a=2"
+        response = await self.api_client.get(url)
+        get_circuits.assert_not_called()
+        assert response.json() == {"2": expected_result["2"]}
+
+    async def test_list_circuits_paginated(self):
+        """Test list circuits with limit, after and fields."""
+        for evc_id in ("3", "2", "1"):
+            evc = MagicMock(id=evc_id, archived=False, execution_rounds=0,
+                            metadata={})
+            evc.as_dict.return_value = {"id": evc_id, "name": f"c_{evc_id}"}
+            self.napp.read_model.update(evc)
+
+        url = f"{self.base_endpoint}/v2/evc/?limit=2"
+        response = await self.api_client.get(url)
+        assert response.status_code == 200, response.data
+        assert list(response.json()) == ["1", "2"]
+
+        url = f"{self.base_endpoint}/v2/evc/?limit=2&after=2&fields=name"
+        response = await self.api_client.get(url)
+        assert response.json() == {"3": {"id": "3", "name": "c_3"}}
+
+        url = f"{self.base_endpoint}/v2/evc/?fields=execution_rounds"
+        response = await self.api_client.get(url)
+        assert response.json()["1"] == {"id": "1", "execution_rounds": 0}
+
+    async def test_list_circuits_ndjson(self):
+        """Test list circuits streaming NDJSON."""
+        for evc_id in ("2", "1"):
+            evc = MagicMock(id=evc_id, archived=False, execution_rounds=0,
+                            metadata={})
+            evc.as_dict.return_value = {"id": evc_id}
+            self.napp.read_model.update(evc)
+
+        url = f"{self.base_endpoint}/v2/evc/?format=ndjson&fields=id"
+        response = await self.api_client.get(url)
+        assert response.status_code == 200, response.data
+        assert "application/x-ndjson" in response.headers["content-type"]
+        assert response.text.splitlines() == ['{"id": "1"}', '{"id": "2"}']
+
+        iter_circuits = self.napp.mongo_controller.iter_circuits
+        iter_circuits.return_value = iter([{"id": "3", "archived": True}])
+        url = f"{self.base_endpoint}/v2/evc/?archived=true&format=ndjson"
+        url += "&limit=1&after=2"
+        response = await self.api_client.get(url)
+        assert response.status_code == 200, response.data
+        assert response.text == '{"id": "3", "archived": true}\n'
+        iter_circuits.assert_called_with(
+            "true", {"format": "ndjson", "limit": "1", "after": "2"},
+            1, "2", None
+        )
+
+    @pytest.mark.parametrize(
+        "query", ["limit=0", "limit=a", "fields=id,foo", "format=xml"]
+    )
+    async def test_list_circuits_invalid_args(self, query):
+        """Test list circuits with invalid query args."""
+        url = f"{self.base_endpoint}/v2/evc/?{query}"
+        response = await self.api_client.get(url)
+        assert response.status_code == 400, response.data
 
     async def test_list_with_archived_circuits_archived(self):
         """Test if list circuits only archived circuits."""
@@ -368,7 +441,8 @@ class TestMain:
         url = f"{self.base_endpoint}/v2/evc/?archived=true&metadata.a=1"
         response = await self.api_client.get(url)
         get_circuits.assert_called_with(archived="true",
-                                        metadata={"metadata.a": "1"})
+                                        metadata={"metadata.a": "1"},
+                                        limit=None, after=None, fields=None)
         expected_result = {"1": circuits["circuits"]["1"]}
         assert response.json() == expected_result
 
@@ -397,6 +471,21 @@ class TestMain:
         expected_result = circuit
         assert response.json() == expected_result
 
+    async def test_circuit_from_read_model(self):
+        """Test if get_circuit return the circuit from the read model."""
+        evc = MagicMock(id="1", archived=False, execution_rounds=0,
+                        metadata={})
+        evc.as_dict.return_value = {"id": "1", "name": "circuit_1"}
+        self.napp.read_model.update(evc)
+
+        url = f"{self.base_endpoint}/v2/evc/1"
+        response = await self.api_client.get(url)
+        assert response.status_code == 200, response.data
+        assert response.json() == {
+            "id": "1", "name": "circuit_1", "execution_rounds": 0
+        }
+        self.napp.mongo_controller.get_circuit.assert_not_called()
+
     async def test_circuit_with_invalid_id(self):
         """Test if get_circuit return invalid circuit_id."""
         self.napp.mongo_controller.get_circuit.return_value = None
@@ -489,6 +578,7 @@ class TestMain:
         validate_mock.assert_called_once()
         validate_mock.assert_called_with(
             table_group={'evpl': 0, 'epl': 0},
+            read_model=self.napp.read_model,
             frequency="* * * * *",
             name="my evc1",
             uni_a=uni1,
@@ -847,6 +937,193 @@ class TestMain:
             sync=False, return_path=True
         )
 
+    async def test_redeploy_evc_async(self):
+        """Test endpoint to redeploy an EVC asynchronously."""
+        evc1 = MagicMock(id="1")
+        evc1.is_enabled.return_value = True
+        self.napp.circuits = {"1": evc1}
+        self.napp.operations = MagicMock()
+        self.napp.operations.submit.return_value = MagicMock(id="op1")
+        url = f"{self.base_endpoint}/v2/evc/1/redeploy?async=true"
+        response = await self.api_client.patch(url)
+        assert response.status_code == 202, response.data
+        assert response.json()["operation_id"] == "op1"
+        self.napp.operations.submit.assert_called_with(
+            "redeploy", "1", self.napp._redeploy_circuit, evc1, True
+        )
+        evc1.remove_current_flows.assert_not_called()
+
+        url = f"{self.base_endpoint}/v2/evc/1/redeploy?async=invalid"
+        response = await self.api_client.patch(url)
+        assert response.status_code == 400, response.data
+
+    def test_redeploy_circuit(self):
+        """Test _redeploy_circuit."""
+        evc = MagicMock()
+        evc.remove_current_flows.return_value = {"link1": 100}
+        evc.deploy.return_value = True
+        assert self.napp._redeploy_circuit(evc, True) == {"deployed": True}
+        evc.remove_current_flows.assert_called_with(
+            sync=False, return_path=True
+        )
+        evc.remove_failover_flows.assert_called_with(sync=True)
+        evc.deploy.assert_called_with({"link1": 100})
+
+    async def test_get_operation(self):
+        """Test get_operation."""
+        operation = MagicMock()
+        operation.as_dict.return_value = {"id": "op1", "status": "running"}
+        self.napp.operations = MagicMock()
+        self.napp.operations.get.side_effect = {"op1": operation}.get
+        url = f"{self.base_endpoint}/v2/evc/operations/op1"
+        response = await self.api_client.get(url)
+        assert response.status_code == 200, response.data
+        assert response.json() == {"id": "op1", "status": "running"}
+
+        url = f"{self.base_endpoint}/v2/evc/operations/op2"
+        response = await self.api_client.get(url)
+        assert response.status_code == 404, response.data
+
+    async def test_get_metrics(self):
+        """Test get_metrics."""
+        url = f"{self.base_endpoint}/v2/metrics"
+        response = await self.api_client.get(url)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE mef_eline_evcs gauge" in response.text
+        assert 'mef_eline_pending{queue="operations"} 0' in response.text
+
+    async def test_get_restoration(self):
+        """Test get_restoration."""
+        url = f"{self.base_endpoint}/v2/restoration"
+        response = await self.api_client.get(url)
+        assert response.status_code == 200, response.data
+        assert response.json() == {"service_levels": {}, "link_downs": []}
+
+    async def test_get_traces(self):
+        """Test get_traces."""
+        with tracing.tracer.span("deploy_to_path", root=True,
+                                 circuit_id="evc_traced"):
+            with tracing.span("install_flows"):
+                pass
+        url = (f"{self.base_endpoint}/v2/debug/traces?name=deploy_to_path"
+               "&circuit_id=evc_traced")
+        response = await self.api_client.get(url)
+        assert response.status_code == 200, response.data
+        traces = response.json()["traces"]
+        assert len(traces) == 1
+        assert traces[0]["children"][0]["name"] == "install_flows"
+
+        response = await self.api_client.get(f"{url}&format=otlp")
+        assert response.status_code == 200, response.data
+        assert len(response.json()["resourceSpans"]) == 1
+
+        response = await self.api_client.get(f"{url}&min_duration=x")
+        assert response.status_code == 400, response.data
+
+    @patch("napps.kytos.mef_eline.main.Main.execute_consistency")
+    async def test_profile(self, mock_execute_consistency):
+        """Test start_profile, get_profile and stop_profile."""
+        profiling.profiler.session = None
+        url = f"{self.base_endpoint}/v2/debug/profile"
+        response = await self.api_client.get(url)
+        assert response.status_code == 404, response.data
+        response = await self.api_client.delete(url)
+        assert response.status_code == 404, response.data
+
+        payload = {"mode": "deterministic", "duration": 10, "events": 1}
+        response = await self.api_client.post(url, json=payload)
+        assert response.status_code == 201, response.data
+        assert response.json()["running"] is True
+        response = await self.api_client.post(url, json=payload)
+        assert response.status_code == 409, response.data
+
+        self.napp.execute()
+        mock_execute_consistency.assert_called_once()
+        response = await self.api_client.get(f"{url}?sort=tottime")
+        assert response.status_code == 200, response.data
+        data = response.json()
+        assert data["stop_reason"] == "events"
+        assert data["events"] == 1
+        response = await self.api_client.get(f"{url}?sort=unknown")
+        assert response.status_code == 400, response.data
+
+        payload = {"mode": "sampling", "duration": 10}
+        response = await self.api_client.post(url, json=payload)
+        assert response.status_code == 201, response.data
+        response = await self.api_client.delete(url)
+        assert response.status_code == 200, response.data
+        assert response.json()["stop_reason"] == "stopped"
+        response = await self.api_client.get(f"{url}?format=text")
+        assert response.status_code == 200, response.data
+        assert response.headers["content-type"].startswith("text/plain")
+
+        payload = {"mode": "unknown"}
+        response = await self.api_client.post(url, json=payload)
+        assert response.status_code == 400, response.data
+        payload = {"duration": "x"}
+        response = await self.api_client.post(url, json=payload)
+        assert response.status_code == 400, response.data
+
+    async def test_get_locks(self):
+        """Test get_locks."""
+        url = f"{self.base_endpoint}/v2/debug/locks?limit=5"
+        response = await self.api_client.get(url)
+        assert response.status_code == 200, response.data
+        assert set(response.json()) == {"held", "sites"}
+
+        url = f"{self.base_endpoint}/v2/debug/locks?limit=0"
+        response = await self.api_client.get(url)
+        assert response.status_code == 400, response.data
+
+    def test_count_evcs_by_state(self):
+        """Test count_evcs_by_state."""
+        evcs = []
+        for archived, enabled, active in [
+            (False, True, True), (False, True, False),
+            (False, False, False), (True, False, False),
+        ]:
+            evc = MagicMock(archived=archived)
+            evc.is_enabled.return_value = enabled
+            evc.is_active.return_value = active
+            evcs.append(evc)
+        self.napp.circuits = {str(i): evc for i, evc in enumerate(evcs)}
+        assert self.napp.count_evcs_by_state() == {
+            ("active", ): 1, ("inactive", ): 1, ("disabled", ): 1
+        }
+
+    def test_shutdown(self):
+        """Test shutdown."""
+        self.napp.operations = MagicMock()
+        self.napp.shutdown()
+        self.napp.operations.shutdown.assert_called()
+
+    def test_update_deploy(self):
+        """Test _update_deploy."""
+        evc = MagicMock()
+        evc.is_active.return_value = True
+        evc.deploy.return_value = True
+        assert self.napp._update_deploy(evc, None, True) == {
+            "redeployed": True
+        }
+        evc.remove.assert_called_once()
+
+        evc = MagicMock()
+        evc.is_active.return_value = True
+        assert self.napp._update_deploy(evc, False, None) == {
+            "redeployed": False
+        }
+        evc.remove.assert_called_once()
+        evc.deploy.assert_not_called()
+
+        evc = MagicMock()
+        evc.is_active.return_value = False
+        evc.deploy.return_value = True
+        assert self.napp._update_deploy(evc, True, None) == {
+            "redeployed": True
+        }
+        evc.remove.assert_not_called()
+
     async def test_redeploy_evc_disabled(self):
         """Test endpoint to redeploy an EVC."""
         evc1 = MagicMock()
@@ -867,6 +1144,220 @@ class TestMain:
         response = await self.api_client.patch(url)
         assert response.status_code == 404, response.data
 
+    @patch("napps.kytos.mef_eline.main.make_uni_tags_available")
+    @patch("napps.kytos.mef_eline.main.make_paths_vlans_available")
+    @patch("napps.kytos.mef_eline.main.emit_event")
+    @patch("napps.kytos.mef_eline.main.EVCDeploy._send_flow_mods")
+    async def test_bulk_delete_circuits(
+        self, send_flow_mods_mock, emit_mock, paths_vlans_mock, uni_tags_mock
+    ):
+        """Test bulk_delete_circuits."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        evc1 = create_autospec(EVC, id="1", archived=False)
+        evc1.lock = MagicMock()
+        evc1.get_cookie.return_value = 1
+        evc1.get_flow_removal_switches.return_value = {"00:01", "00:02"}
+        evc2 = create_autospec(EVC, id="2", archived=False)
+        evc2.lock = MagicMock()
+        evc2.get_cookie.return_value = 2
+        evc2.get_flow_removal_switches.return_value = {"00:02"}
+        evc1.uni_a, evc1.uni_z = MagicMock(), MagicMock()
+        evc2.uni_a, evc2.uni_z = MagicMock(), MagicMock()
+        self.napp.circuits = {"1": evc1, "2": evc2, "3": MagicMock()}
+        self.napp.read_model = MagicMock()
+        calls = []
+        send_flow_mods_mock.side_effect = lambda *_, **__: calls.append(
+            "delete"
+        )
+        paths_vlans_mock.side_effect = lambda *_: calls.append("s_vlans")
+        uni_tags_mock.side_effect = lambda *_: calls.append("uni_tags")
+
+        payload = {"circuit_ids": ["1", "2"]}
+        response = await self.api_client.request(
+            "DELETE", f"{self.base_endpoint}/v2/evc/", json=payload
+        )
+        assert response.status_code == 200, response.data
+        assert calls == ["delete", "s_vlans", "uni_tags"]
+        assert response.json() == {"deleted": ["1", "2"]}
+        assert list(self.napp.circuits) == ["3"]
+        for evc in (evc1, evc2):
+            evc.deactivate.assert_called_once()
+            evc.disable.assert_called_once()
+            evc.clear_paths.assert_called_once()
+            evc.archive.assert_called_once()
+            evc.remove_uni_tags.assert_not_called()
+            evc.remove_current_flows.assert_not_called()
+            evc.sync.assert_not_called()
+        assert paths_vlans_mock.call_count == 1
+        uni_tags_mock.assert_called_once_with(
+            self.napp.controller,
+            [evc1.uni_a, evc1.uni_z, evc2.uni_a, evc2.uni_z]
+        )
+
+        assert send_flow_mods_mock.call_count == 1
+        flows_by_switch = send_flow_mods_mock.call_args[0][0]
+        assert len(flows_by_switch["00:01"]["flows"]) == 1
+        assert len(flows_by_switch["00:02"]["flows"]) == 2
+        assert send_flow_mods_mock.call_args[0][1] == "delete"
+        update_evcs = self.napp.mongo_controller.update_evcs
+        assert update_evcs.call_count == 1
+        assert len(update_evcs.call_args[0][0]) == 2
+        assert self.napp.read_model.update.call_count == 2
+        assert emit_mock.call_count == 2
+
+    @patch("napps.kytos.mef_eline.main.emit_event")
+    @patch("napps.kytos.mef_eline.main.EVCDeploy._send_flow_mods")
+    async def test_bulk_delete_circuits_metadata(self, send_flow_mods_mock,
+                                                 emit_mock):
+        """Test bulk_delete_circuits with metadata filter."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        evc1 = create_autospec(EVC, id="1", archived=False)
+        evc1.lock = MagicMock()
+        evc1.metadata = {"group": "a", "other": 1}
+        evc1.get_flow_removal_switches.return_value = set()
+        evc2 = create_autospec(EVC, id="2", archived=False)
+        evc2.metadata = {"group": "b"}
+        self.napp.circuits = {"1": evc1, "2": evc2}
+        self.napp.read_model = MagicMock()
+        self.napp.read_model.candidate_ids.return_value = {"1", "2", "3"}
+
+        payload = {"metadata": {"group": "a"}}
+        response = await self.api_client.request(
+            "DELETE", f"{self.base_endpoint}/v2/evc/", json=payload
+        )
+        assert response.status_code == 200, response.data
+        assert response.json() == {"deleted": ["1"]}
+        self.napp.read_model.candidate_ids.assert_called_once_with(
+            {"group": "a"}
+        )
+        assert list(self.napp.circuits) == ["2"]
+        evc2.archive.assert_not_called()
+        send_flow_mods_mock.assert_not_called()
+        assert emit_mock.call_count == 1
+
+    async def test_bulk_delete_circuits_error(self):
+        """Test bulk_delete_circuits with circuits not found or bad body."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.circuits = {}
+        response = await self.api_client.request(
+            "DELETE", f"{self.base_endpoint}/v2/evc/",
+            json={"circuit_ids": ["1"]}
+        )
+        assert response.status_code == 404, response.data
+        assert response.json()["description"] == ["1"]
+
+        evc = create_autospec(EVC, id="2", archived=False)
+        self.napp.circuits = {"2": evc}
+        response = await self.api_client.request(
+            "DELETE", f"{self.base_endpoint}/v2/evc/",
+            json={"circuit_ids": ["2", "1"]}
+        )
+        assert response.status_code == 404, response.data
+        assert response.json()["description"] == ["1"]
+        assert list(self.napp.circuits) == ["2"]
+        evc.archive.assert_not_called()
+
+        response = await self.api_client.request(
+            "DELETE", f"{self.base_endpoint}/v2/evc/",
+            json={"metadata": {}}
+        )
+        assert response.status_code == 400, response.data
+
+    @patch("napps.kytos.mef_eline.main.make_paths_vlans_available")
+    @patch("napps.kytos.mef_eline.main.EVCDeploy._send_flow_mods")
+    async def test_bulk_redeploy(self, send_flow_mods_mock, paths_vlans_mock):
+        """Test bulk_redeploy."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        evc1 = create_autospec(EVC, id="1")
+        evc1.lock = MagicMock()
+        evc1.is_enabled.return_value = True
+        evc1.get_cookie.return_value = 1
+        evc1.get_flow_removal_switches.return_value = {"00:01"}
+        evc1.clear_paths.return_value = {"link1": 100}
+        evc1.deploy.return_value = True
+        evc2 = create_autospec(EVC, id="2")
+        evc2.lock = MagicMock()
+        evc2.is_enabled.return_value = True
+        evc2.get_cookie.return_value = 2
+        evc2.get_flow_removal_switches.return_value = {"00:01"}
+        evc2.clear_paths.return_value = {}
+        evc2.deploy.side_effect = ValueError
+        evc3 = create_autospec(EVC, id="3")
+        evc3.lock = MagicMock()
+        evc3.is_enabled.return_value = False
+        self.napp.circuits = {"1": evc1, "2": evc2, "3": evc3}
+        self.napp.read_model = MagicMock()
+        calls = []
+        send_flow_mods_mock.side_effect = lambda *_, **__: calls.append(
+            "delete"
+        )
+        paths_vlans_mock.side_effect = lambda *_: calls.append("s_vlans")
+
+        payload = {"circuit_ids": ["1", "2", "3"]}
+        response = await self.api_client.patch(
+            f"{self.base_endpoint}/v2/evc/redeploy", json=payload
+        )
+        assert response.status_code == 200, response.data
+        assert calls == ["delete", "s_vlans"]
+        assert response.json() == {
+            "redeployed": ["1"], "failed": ["2"], "disabled": ["3"]
+        }
+        evc1.clear_paths.assert_called_with(
+            return_path=True, released_paths=[]
+        )
+        evc1.set_flow_removed_at.assert_called_once()
+        evc1.deploy.assert_called_with({"link1": 100})
+        evc3.clear_paths.assert_not_called()
+        evc3.deploy.assert_not_called()
+        assert send_flow_mods_mock.call_count == 1
+        flows_by_switch = send_flow_mods_mock.call_args[0][0]
+        assert len(flows_by_switch["00:01"]["flows"]) == 2
+        update_evcs = self.napp.mongo_controller.update_evcs
+        assert update_evcs.call_count == 1
+        assert len(update_evcs.call_args[0][0]) == 2
+
+        url = f"{self.base_endpoint}/v2/evc/redeploy"
+        url = url + "?try_avoid_same_s_vlan=false"
+        response = await self.api_client.patch(
+            url, json={"circuit_ids": ["1"]}
+        )
+        assert response.status_code == 200, response.data
+        evc1.clear_paths.assert_called_with(
+            return_path=False, released_paths=[]
+        )
+
+        url = f"{self.base_endpoint}/v2/evc/redeploy"
+        url = url + "?try_avoid_same_s_vlan=invalid"
+        response = await self.api_client.patch(
+            url, json={"circuit_ids": ["1"]}
+        )
+        assert response.status_code == 400, response.data
+
+    @patch("napps.kytos.mef_eline.main.EVCDeploy._send_flow_mods")
+    async def test_bulk_redeploy_not_found(self, send_flow_mods_mock):
+        """Test bulk_redeploy with circuits not found."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.circuits = {}
+        response = await self.api_client.patch(
+            f"{self.base_endpoint}/v2/evc/redeploy",
+            json={"circuit_ids": ["1"]}
+        )
+        assert response.status_code == 404, response.data
+        send_flow_mods_mock.assert_not_called()
+
+        evc = create_autospec(EVC, id="2")
+        evc.is_enabled.return_value = True
+        self.napp.circuits = {"2": evc}
+        response = await self.api_client.patch(
+            f"{self.base_endpoint}/v2/evc/redeploy",
+            json={"circuit_ids": ["2", "1"]}
+        )
+        assert response.status_code == 404, response.data
+        assert response.json()["description"] == ["1"]
+        evc.clear_paths.assert_not_called()
+        evc.deploy.assert_not_called()
+        send_flow_mods_mock.assert_not_called()
+
     async def test_list_schedules__no_data_stored(self):
         """Test if list circuits return all circuits stored."""
         self.napp.mongo_controller.get_circuits.return_value = {"circuits": {}}
@@ -930,11 +1421,24 @@ class TestMain:
         # Add one circuit to the mongodb.
         data_mock.return_value = circuits
 
-    async def test_list_schedules_from_mongodb(self):
+    def _add_read_model_schedule_data(self):
+        """Add EVCs with schedules to the read model."""
+        circuits = self.napp.mongo_controller.get_circuits.return_value
+        for circuit in circuits["circuits"].values():
+            evc = MagicMock(id=circuit["id"], archived=False,
+                            execution_rounds=0, metadata={})
+            evc.circuit_scheduler = [
+                CircuitSchedule.from_dict(schedule)
+                for schedule in circuit.get("circuit_scheduler", [])
+            ]
+            self.napp.read_model.update(evc)
+
+    async def test_list_schedules(self):
         """Test if list circuits return specific circuits stored."""
         self._add_mongodb_schedule_data(
             self.napp.mongo_controller.get_circuits
         )
+        self._add_read_model_schedule_data()
 
         url = f"{self.base_endpoint}/v2/evc/schedule"
 
@@ -982,6 +1486,29 @@ class TestMain:
 
         assert response.status_code == 200
         assert expected == response.json()
+        self.napp.mongo_controller.get_circuits.assert_not_called()
+
+        url = f"{self.base_endpoint}/v2/evc/schedule?limit=2&after=1"
+        response = await self.api_client.get(url)
+        assert response.status_code == 200
+        assert response.json() == expected[1:3]
+
+        url = f"{self.base_endpoint}/v2/evc/schedule?limit=-1"
+        response = await self.api_client.get(url)
+        assert response.status_code == 400
+
+    def test_find_evc_by_schedule_id(self):
+        """Test _find_evc_by_schedule_id uses the schedule index."""
+        self._add_mongodb_schedule_data(
+            self.napp.mongo_controller.get_circuits
+        )
+        self._add_read_model_schedule_data()
+        self.napp.circuits = {"bb:bb:bb": MagicMock()}
+
+        evc, schedule = self.napp._find_evc_by_schedule_id("3")
+        assert evc.id == "bb:bb:bb"
+        assert schedule.frequency == "1 * * * *"
+        assert self.napp._find_evc_by_schedule_id("5") == (None, None)
 
     async def test_get_specific_schedule_from_mongodb(self):
         """Test get schedules from a circuit."""
@@ -1685,10 +2212,25 @@ class TestMain:
             "endpoint_b": {"id": "b"}
         }
         with pytest.raises(ValueError):
-            self.napp._link_from_dict(link_dict, "current_path")
-
-    def test_link_from_dict_vlan_metadata(self):
-        """Test that link_from_dict only accepts vlans for current_path
+            self.napp._link_from_dict(link_dict)
+
+    def test_link_from_dict_shared(self):
+        """Test that _link_from_dict returns the same Link for the same
+         endpoints."""
+        intf_a = MagicMock(id="01:1")
+        intf_b = MagicMock(id="05:2")
+        self.napp.controller.get_interface_by_id = MagicMock(
+            side_effect=lambda intf_id: {"a": intf_a, "b": intf_b}[intf_id]
+        )
+        link_dict = {"endpoint_a": {"id": "a"}, "endpoint_b": {"id": "b"}}
+        link = self.napp._link_from_dict(link_dict)
+        assert link is self.napp._link_from_dict(link_dict)
+        assert not link.metadata
+        reverse_dict = {"endpoint_a": {"id": "b"}, "endpoint_b": {"id": "a"}}
+        assert link is not self.napp._link_from_dict(reverse_dict)
+
+    def test_path_from_dict_vlan_metadata(self):
+        """Test that _path_from_dict only accepts vlans for current_path
          and failover_path."""
         intf = MagicMock(id="01:1")
         self.napp.controller.get_interface_by_id = MagicMock(return_value=intf)
@@ -1698,14 +2240,117 @@ class TestMain:
             'endpoint_b': {'id': '00:00:00:00:00:00:00:05:2'},
             'metadata': {'s_vlan': {'tag_type': 'vlan', 'value': 1}}
         }
-        link = self.napp._link_from_dict(link_dict, "current_path")
-        assert link.metadata.get('s_vlan', None)
+        path = self.napp._path_from_dict([link_dict], "current_path")
+        assert path.s_vlans[path[0].id].value == 1
+        assert not path[0].metadata
+
+        path = self.napp._path_from_dict([link_dict], "failover_path")
+        assert path.s_vlans[path[0].id].value == 1
+
+        path = self.napp._path_from_dict([link_dict], "primary_path")
+        assert not path.s_vlans
+
+        link_dict["metadata"]["s_vlan"] = {"tag_type": "vlan"}
+        with patch("napps.kytos.mef_eline.main.TAG.from_dict",
+                   return_value=False):
+            with pytest.raises(ValueError):
+                self.napp._path_from_dict([link_dict], "current_path")
+
+    def test_compact_path_from_dict(self):
+        """Test _compact_path_from_dict."""
+        intf = MagicMock(id="01:1")
+        get_interface = MagicMock(return_value=intf)
+        self.napp.controller.get_interface_by_id = get_interface
+        link_dict = {
+            'id': 'mock_link',
+            'endpoint_a': {'id': '00:00:00:00:00:00:00:01:4'},
+            'endpoint_b': {'id': '00:00:00:00:00:00:00:05:2'},
+            'metadata': {'s_vlan': {'tag_type': 'vlan', 'value': 1}}
+        }
+        compact = self.napp._compact_path_from_dict(
+            [link_dict], "current_path"
+        )
+        id_a, id_b, s_vlan = compact.links[0]
+        assert id_a == '00:00:00:00:00:00:00:01:4'
+        assert id_b == '00:00:00:00:00:00:00:05:2'
+        assert s_vlan.value == 1
+        path = compact.materialize()
+        assert path.s_vlans[path[0].id] is s_vlan
+
+        compact = self.napp._compact_path_from_dict(
+            [link_dict], "primary_path"
+        )
+        assert compact.links[0][2] is None
+
+        get_interface.return_value = None
+        with pytest.raises(ValueError):
+            self.napp._compact_path_from_dict([link_dict], "current_path")
+
+    @patch("napps.kytos.mef_eline.main.Main._uni_from_dict")
+    @patch("napps.kytos.mef_eline.models.evc.EVC._validate")
+    def test_evc_from_dict_lazy_paths(self, _, uni_from_dict_mock):
+        """Test _evc_from_dict with lazy_paths keeps paths compact."""
+        uni_from_dict_mock.side_effect = ["uni_a", "uni_z"]
+        intf = MagicMock(id="01:1")
+        self.napp.controller.get_interface_by_id = MagicMock(return_value=intf)
+        link_dict = {
+            'endpoint_a': {'id': '00:00:00:00:00:00:00:01:4'},
+            'endpoint_b': {'id': '00:00:00:00:00:00:00:05:2'},
+        }
+        evc = self.napp._evc_from_dict({
+            "id": "1", "name": "evc", "uni_a": {}, "uni_z": {},
+            "primary_path": [link_dict], "current_path": [link_dict],
+        }, lazy_paths=True)
+        assert not LazyPathAttribute.is_materialized(evc, "primary_path")
+        assert not LazyPathAttribute.is_materialized(evc, "current_path")
+        assert LazyPathAttribute.is_materialized(evc, "backup_path")
+        assert len(evc.current_path) == 1
+        assert LazyPathAttribute.is_materialized(evc, "current_path")
+
+    @patch("napps.kytos.mef_eline.models.evc.EVC._send_flow_mods")
+    @patch("napps.kytos.mef_eline.main.Main._uni_from_dict")
+    @patch("napps.kytos.mef_eline.models.evc.EVC._validate")
+    def test_evc_from_dict_s_vlans(self, _, uni_from_dict_mock, send_mock):
+        """Test EVCs built from dicts keep the S-VLANs of their paths."""
+        uni_from_dict_mock.side_effect = [
+            get_uni_mocked(switch_id="a"), get_uni_mocked(switch_id="z")
+        ]
+        interfaces = {}
+        self.napp.controller.get_interface_by_id = MagicMock(
+            side_effect=lambda intf_id: interfaces.setdefault(
+                intf_id, MagicMock(id=intf_id)
+            )
+        )
 
-        link = self.napp._link_from_dict(link_dict, "failover_path")
-        assert link.metadata.get('s_vlan', None)
+        def link_dict(id_a, id_b, s_vlan):
+            return {
+                "endpoint_a": {"id": id_a}, "endpoint_b": {"id": id_b},
+                "metadata": {"s_vlan": {"tag_type": "vlan", "value": s_vlan}},
+            }
 
-        link = self.napp._link_from_dict(link_dict, "primary_path")
-        assert link.metadata.get('s_vlan', None) is None
+        evc = self.napp._evc_from_dict({
+            "id": "1", "name": "evc", "uni_a": {}, "uni_z": {},
+            "active": True, "enabled": True,
+            "current_path": [link_dict("01:1", "02:1", 5)],
+            "failover_path": [link_dict("01:2", "03:1", 6)],
+        })
+        current_link, failover_link = evc.current_path[0], evc.failover_path[0]
+        assert get_link_s_vlan(evc.current_path, current_link).value == 5
+        assert get_link_s_vlan(evc.failover_path, failover_link).value == 6
+
+        with patch(
+            "napps.kytos.mef_eline.models.path.make_paths_vlans_available"
+        ) as make_available_mock:
+            old_path = evc.remove_current_flows(sync=False, return_path=True)
+            evc.remove_failover_flows(sync=False)
+        assert old_path == {current_link.id: 5}
+        assert send_mock.call_count == 2
+        released = [
+            {link_id: tag.value for link_id, tag in path.s_vlans.items()}
+            for call_args in make_available_mock.call_args_list
+            for path in call_args[0][1]
+        ]
+        assert released == [{current_link.id: 5}, {failover_link.id: 6}]
 
     def test_uni_from_dict_non_existent_intf(self):
         """Test _link_from_dict non existent intf."""
@@ -1909,11 +2554,95 @@ class TestMain:
         evc_mock.lock = MagicMock()
         evc_mock.archived = False
         evcs = [evc_mock, evc_mock, evc_mock]
-        event = KytosEvent(name="test", content={"link": "abc"})
+        link = MagicMock(id="abc")
+        event = KytosEvent(name="test", content={"link": link})
         self.napp.circuits = dict(zip(["1", "2", "3"], evcs))
         self.napp.handle_link_up(event)
         assert evc_mock.handle_link_up.call_count == 2
-        evc_mock.handle_link_up.assert_called_with("abc")
+        evc_mock.handle_link_up.assert_called_with(link)
+
+    @patch("napps.kytos.mef_eline.main.settings.REOPTIMIZATION_QUEUE", True)
+    def test_handle_link_up_reoptimization(self):
+        """Test handle_link_up queues EVCs going back to primary path."""
+        evc_mock = create_autospec(EVC)
+        evc_mock.id = "1"
+        evc_mock.service_level, evc_mock.creation_time = 0, 1
+        evc_mock.lock = MagicMock()
+        evc_mock.archived = False
+        evc_mock.is_active.return_value = True
+        evc_mock.is_using_primary_path.return_value = False
+        evc_mock.primary_path = MagicMock()
+        evc_mock.primary_path.is_affected_by_link.return_value = True
+        self.napp.circuits = {"1": evc_mock}
+        self.napp.reoptimization = MagicMock()
+        link = MagicMock(id="abc")
+        event = KytosEvent(name="test", content={"link": link})
+        self.napp.handle_link_up(event)
+        self.napp.reoptimization.add.assert_called_with(evc_mock)
+        assert evc_mock.handle_link_up.call_count == 0
+
+        evc_mock.primary_path.is_affected_by_link.return_value = False
+        self.napp.handle_link_up(event)
+        assert self.napp.reoptimization.add.call_count == 1
+        evc_mock.handle_link_up.assert_called_with(link)
+
+    @patch("napps.kytos.mef_eline.main.emit_event")
+    def test_reoptimize_to_primary(self, emit_event_mock):
+        """Test reoptimize_to_primary."""
+        evc_mock = create_autospec(EVC)
+        evc_mock.lock = MagicMock()
+        evc_mock.archived = False
+        evc_mock.is_enabled.return_value = True
+        evc_mock.is_active.return_value = True
+        evc_mock.is_using_primary_path.return_value = False
+        evc_mock.primary_path = MagicMock(status=EntityStatus.UP)
+        evc_mock.deploy_to_primary_path.return_value = True
+        self.napp.reoptimize_to_primary(evc_mock)
+        assert evc_mock.deploy_to_primary_path.call_count == 1
+        assert emit_event_mock.call_count == 1
+
+        evc_mock.primary_path.status = EntityStatus.DOWN
+        self.napp.reoptimize_to_primary(evc_mock)
+        assert evc_mock.deploy_to_primary_path.call_count == 1
+
+        evc_mock.primary_path.status = EntityStatus.UP
+        evc_mock.is_using_primary_path.return_value = True
+        self.napp.reoptimize_to_primary(evc_mock)
+        assert evc_mock.deploy_to_primary_path.call_count == 1
+
+    def test_handle_link_up_suppressed(self):
+        """Test handle_link_up skips links suppressed by flap dampening."""
+        evc_mock = create_autospec(EVC)
+        evc_mock.service_level, evc_mock.creation_time = 0, 1
+        evc_mock.lock = MagicMock()
+        evc_mock.archived = False
+        self.napp.circuits = {"1": evc_mock}
+        link = MagicMock(id="abc")
+        for _ in range(4):
+            self.napp.link_dampening.flap(link)
+        event = KytosEvent(name="test", content={"link": link})
+        self.napp.handle_link_up(event)
+        assert evc_mock.handle_link_up.call_count == 0
+
+    @patch("napps.kytos.mef_eline.main.Path.set_suppressed_links")
+    @patch("napps.kytos.mef_eline.main.Main.handle_link_up")
+    def test_release_dampened_links(self, mock_link_up, mock_suppressed):
+        """Test release_dampened_links handles the released links up."""
+        self.napp.link_dampening = MagicMock()
+        self.napp.link_dampening.release.return_value = []
+        self.napp.release_dampened_links()
+        assert mock_suppressed.call_count == 0
+
+        link_up = MagicMock(id="abc", status=EntityStatus.UP)
+        link_down = MagicMock(id="def", status=EntityStatus.DOWN)
+        self.napp.link_dampening.release.return_value = [link_up, link_down]
+        self.napp.release_dampened_links()
+        mock_suppressed.assert_called_with(
+            self.napp.link_dampening.suppressed.return_value
+        )
+        assert mock_link_up.call_count == 1
+        event = mock_link_up.call_args[0][0]
+        assert event.content["link"] == link_up
 
     @patch("time.sleep", return_value=None)
     @patch("napps.kytos.mef_eline.utils.emit_event")
@@ -2065,6 +2794,8 @@ class TestMain:
         )
         event_name = "failover_link_down"
         assert emit_main_mock.call_args_list[0][0][1] == event_name
+        # evc1 and evc3 are waiting to be redeployed
+        assert self.napp.restoration.in_progress() == 1
 
     @patch("napps.kytos.mef_eline.main.emit_event")
     def test_handle_evc_affected_by_link_down(self, emit_event_mock):
@@ -2128,6 +2859,25 @@ class TestMain:
             }
         )
 
+    @patch("napps.kytos.mef_eline.main.emit_event")
+    def test_handle_evc_affected_by_link_down_restoration(self, emit_mock):
+        """Test the link down restoration is summarized."""
+        evc = MagicMock(id="1", service_level=5)
+        evc.handle_link_down.return_value = True
+        evc.is_active.return_value = True
+        self.napp.circuits = {"1": evc}
+        link = MagicMock(id="123")
+        event = KytosEvent(name="e1", content={"evc_id": "1", "link": link})
+        evc.flows_sent_at = event.timestamp
+        self.napp.restoration.start("123", event.timestamp, {
+            "1": (5, "redeploy")
+        })
+        self.napp.handle_evc_affected_by_link_down(event)
+        name, content = emit_mock.call_args[0][1], emit_mock.call_args[1]
+        assert name == "link_down_restoration"
+        assert content["content"]["restored"] == 1
+        assert self.napp.restoration.percentiles()["5"]["count"] == 1
+
     def test_cleanup_evcs_old_path(self, monkeypatch):
         """Test handle_cleanup_evcs_old_path method."""
         current_path, map_evc_content, emit_event = [
@@ -2284,28 +3034,84 @@ class TestMain:
         assert response.json()["description"] == \
             "circuit_id 1234 not found."
 
-    @patch('napps.kytos.mef_eline.main.Main._load_evc')
-    def test_load_all_evcs(self, load_evc_mock):
+    @patch('napps.kytos.mef_eline.main.settings')
+    @patch('napps.kytos.mef_eline.main.Main._register_evc')
+    @patch('napps.kytos.mef_eline.main.Main._build_evc')
+    def test_load_all_evcs(self, build_evc_mock, register_evc_mock,
+                           settings_mock):
         """Test load_evcs method"""
+        settings_mock.LOAD_EVCS_CHUNK_SIZE = 1
+        settings_mock.LOAD_EVCS_MAX_WORKERS = 1
         mock_circuits = {
-            'circuits': {
-                1: 'circuit_1',
-                2: 'circuit_2',
-                3: 'circuit_3',
-                4: 'circuit_4'
-            }
+            str(i): {"id": str(i), "name": f"circuit_{i}"}
+            for i in range(1, 7)
         }
-        self.napp.mongo_controller.get_circuits.return_value = mock_circuits
-        self.napp.circuits = {2: 'circuit_2', 3: 'circuit_3'}
+        self.napp.mongo_controller.iter_circuits.return_value = iter(
+            mock_circuits.values()
+        )
+        self.napp.circuits = {"2": "circuit_2", "3": "circuit_3"}
+        build_evc_mock.side_effect = lambda circuit: (
+            None if circuit["id"] == "5" else circuit["name"]
+        )
+        register_evc_mock.side_effect = lambda evc: evc
+
         self.napp.load_all_evcs()
-        load_evc_mock.assert_has_calls([call('circuit_1'), call('circuit_4')])
+        build_evc_mock.assert_has_calls([
+            call(mock_circuits["1"]), call(mock_circuits["4"]),
+            call(mock_circuits["5"]), call(mock_circuits["6"]),
+        ])
+        register_evc_mock.assert_has_calls([
+            call("circuit_1"), call("circuit_4"), call("circuit_6"),
+        ])
+        assert self.napp.load_stats["loaded"] == 3
+        assert self.napp.load_stats["failed"] == 1
+        assert self.napp.load_stats["total"] == 6
+        assert self.napp._interface_cache is None
         assert self.napp.controller.buffers.app.put.call_count > 1
         call_args = self.napp.controller.buffers.app.put.call_args[0]
         assert call_args[0].name == "kytos/mef_eline.evcs_loaded"
-        assert dict(call_args[0].content) == mock_circuits["circuits"]
+        assert dict(call_args[0].content) == mock_circuits
         timeout_d = {"timeout": 1}
         assert self.napp.controller.buffers.app.put.call_args[1] == timeout_d
 
+    def test_get_pooled_s_vlans(self):
+        """Test _get_pooled_s_vlans returns the S-VLANs by pooled link."""
+        link = MagicMock(id="hot")
+        link.endpoint_a.id, link.endpoint_b.id = "01:1", "02:1"
+        self.napp.controller.links = {"hot": link}
+        self.napp.s_vlan_pools = MagicMock()
+        self.napp.s_vlan_pools.levels.return_value = {"hot": 0, "gone": 0}
+
+        def link_dict(id_a, id_b, s_vlan=None):
+            metadata = {}
+            if s_vlan:
+                metadata["s_vlan"] = {"tag_type": "vlan", "value": s_vlan}
+            return {"endpoint_a": {"id": id_a}, "endpoint_b": {"id": id_b},
+                    "metadata": metadata}
+
+        circuits = [
+            {"current_path": [link_dict("01:1", "02:1", 10),
+                              link_dict("02:2", "03:1", 11)],
+             "failover_path": [link_dict("02:1", "01:1", 12)]},
+            {"current_path": [link_dict("01:1", "02:1")]},
+            {"archived": True},
+        ]
+        assert self.napp._get_pooled_s_vlans(circuits) == {"hot": {10, 12}}
+
+    def test_get_interface_by_id(self):
+        """Test _get_interface_by_id caches only while loading EVCs."""
+        get_interface = self.napp.controller.get_interface_by_id
+        get_interface.return_value = "intf"
+        assert self.napp._get_interface_by_id("1") == "intf"
+        assert self.napp._get_interface_by_id("1") == "intf"
+        assert get_interface.call_count == 2
+
+        self.napp._interface_cache = {}
+        assert self.napp._get_interface_by_id("1") == "intf"
+        assert self.napp._get_interface_by_id("1") == "intf"
+        assert get_interface.call_count == 3
+        assert self.napp._interface_cache == {"1": "intf"}
+
     @patch('napps.kytos.mef_eline.main.Main._evc_from_dict')
     def test_load_evc(self, evc_from_dict_mock):
         """Test _load_evc method"""
@@ -2330,12 +3136,21 @@ class TestMain:
         evc.archived = False
         evc.id = 1
         self.napp.sched = MagicMock()
+        self.napp.read_model = MagicMock()
 
         result = self.napp._load_evc(evc_dict)
         assert result == evc
+        evc_from_dict_mock.assert_called_with(evc_dict, lazy_paths=True)
         self.napp.sched.add.assert_called_with(evc)
+        self.napp.read_model.update.assert_called_with(evc, evc_dict)
         assert self.napp.circuits[1] == evc
 
+        # case 5: already loaded, the loaded one is kept in the read model
+        other_evc = MagicMock(archived=False, id=1)
+        evc_from_dict_mock.return_value = other_evc
+        self.napp._load_evc(evc_dict)
+        self.napp.read_model.update.assert_called_with(evc)
+
     def test_handle_flow_mod_error(self):
         """Test handle_flow_mod_error method"""
         flow = MagicMock()
@@ -2400,6 +3215,7 @@ class TestMain:
         evc_mock = create_autospec(EVC)
         evc_mock.id = 1234
         self.napp.circuits = {"1234": evc_mock}
+        self.napp.read_model = MagicMock()
         payload = {
             "circuit_ids": ["1234"],
             "metadata1": 1,
@@ -2410,6 +3226,7 @@ class TestMain:
             json=payload
         )
         assert response.status_code == 201
+        self.napp.read_model.update.assert_called_with(evc_mock)
         args = self.napp.mongo_controller.update_evcs_metadata.call_args[0]
         ids = payload.pop("circuit_ids")
         assert args[0] == ids
@@ -2443,6 +3260,7 @@ class TestMain:
         evc_mock = create_autospec(EVC)
         evc_mock.id = 1234
         self.napp.circuits = {"1234": evc_mock}
+        self.napp.read_model = MagicMock()
         payload = {
             "circuit_ids": ["1234", "4567"]
         }
@@ -2473,6 +3291,7 @@ class TestMain:
         evc_mock = create_autospec(EVC)
         evc_mock.id = 1234
         self.napp.circuits = {"1234": evc_mock}
+        self.napp.read_model = MagicMock()
         payload = {
             "circuit_ids": ["1234"]
         }
@@ -2489,6 +3308,7 @@ class TestMain:
         calls = self.napp.mongo_controller.update_evcs_metadata.call_count
         assert calls == 1
         assert evc_mock.remove_metadata.call_count == 1
+        self.napp.read_model.update.assert_called_with(evc_mock)
 
     async def test_delete_bulk_metadata_error(self):
         """Test bulk_delete_metadata with ciruit erroring"""
@@ -2496,6 +3316,7 @@ class TestMain:
         evc_mock = create_autospec(EVC)
         evcs = [evc_mock, evc_mock]
         self.napp.circuits = dict(zip(["1", "2"], evcs))
+        self.napp.read_model = MagicMock()
         payload = {"circuit_ids": ["1", "2", "3"]}
         response = await self.api_client.request(
             "DELETE",
@@ -2505,28 +3326,20 @@ class TestMain:
         assert response.status_code == 404, response.data
         assert response.json()["description"] == ["3"]
 
-    async def test_use_uni_tags(self):
+    @patch("napps.kytos.mef_eline.main.use_uni_tags")
+    def test_use_uni_tags(self, use_uni_tags_mock):
         """Test _use_uni_tags"""
-        self.napp.controller.loop = asyncio.get_running_loop()
         evc_mock = create_autospec(EVC)
         evc_mock.uni_a = "uni_a_mock"
         evc_mock.uni_z = "uni_z_mock"
         self.napp._use_uni_tags(evc_mock)
-        assert evc_mock._use_uni_vlan.call_count == 2
-        assert evc_mock._use_uni_vlan.call_args[0][0] == evc_mock.uni_z
-
-        # One UNI tag is not available
-        evc_mock._use_uni_vlan.side_effect = [KytosTagError(""), None]
-        with pytest.raises(KytosTagError):
-            self.napp._use_uni_tags(evc_mock)
-        assert evc_mock._use_uni_vlan.call_count == 3
-        assert evc_mock.make_uni_vlan_available.call_count == 0
+        use_uni_tags_mock.assert_called_with(
+            self.napp.controller, ["uni_a_mock", "uni_z_mock"]
+        )
 
-        evc_mock._use_uni_vlan.side_effect = [None, KytosTagError("")]
+        use_uni_tags_mock.side_effect = KytosTagError("")
         with pytest.raises(KytosTagError):
             self.napp._use_uni_tags(evc_mock)
-        assert evc_mock._use_uni_vlan.call_count == 5
-        assert evc_mock.make_uni_vlan_available.call_count == 1
 
     def test_check_no_tag_duplication(self):
         """Test _check_no_tag_duplication"""
@@ -2552,51 +3365,36 @@ class TestMain:
         self.napp._check_no_tag_duplication(evc_id, None, None)
         assert evc.check_no_tag_duplicate.call_count == 3
 
-    @patch("napps.kytos.mef_eline.main.time")
+    def test_handle_on_interface_link_change(self):
+        """Test handle_on_interface_link_change"""
+        self.napp._intf_debouncer = MagicMock()
+        mock_intf = Mock()
+        mock_intf.id = "mock_intf"
+        name = '.*.switch.interface.created'
+        event = KytosEvent(name=name, content={"interface": mock_intf})
+        self.napp.handle_on_interface_link_change(event)
+        self.napp._intf_debouncer.push.assert_called_with(
+            "mock_intf", event, event.timestamp
+        )
+
     @patch("napps.kytos.mef_eline.main.Main.handle_interface_link_up")
     @patch("napps.kytos.mef_eline.main.Main.handle_interface_link_down")
-    def test_handle_on_interface_link_change(
-        self,
-        mock_down,
-        mock_up,
-        mock_time
-    ):
-        """Test handle_on_interface_link_change"""
-        mock_time.sleep.return_value = True
+    def test_handle_debounced_interface_event(self, mock_down, mock_up):
+        """Test handle_debounced_interface_event"""
         mock_intf = Mock()
         mock_intf.id = "mock_intf"
+        content = {"interface": mock_intf}
 
         # Created/link_up
         name = '.*.switch.interface.created'
-        content = {"interface": mock_intf}
         event = KytosEvent(name=name, content=content)
-        self.napp.handle_on_interface_link_change(event)
+        self.napp.handle_debounced_interface_event(mock_intf.id, event)
         assert mock_down.call_count == 0
-        assert mock_up.call_count == 1
+        mock_up.assert_called_with(mock_intf)
 
         # Deleted/link_down
         name = '.*.switch.interface.deleted'
         event = KytosEvent(name=name, content=content)
-        self.napp.handle_on_interface_link_change(event)
-        assert mock_down.call_count == 1
-        assert mock_up.call_count == 1
-
-        # Event delay
-        self.napp._intf_events[mock_intf.id]["last_acquired"] = "mock_time"
-        for _ in range(1, 6):
-            self.napp.handle_on_interface_link_change(event)
-        assert mock_down.call_count == 1
-        assert mock_up.call_count == 1
-
-        self.napp._intf_events[mock_intf.id].pop("last_acquired")
-        self.napp.handle_on_interface_link_change(event)
-        assert mock_down.call_count == 2
-        assert mock_up.call_count == 1
-
-        # Out of order event
-        event = KytosEvent(name=name, content=content)
-        self.napp._intf_events[mock_intf.id]["event"] = Mock(timestamp=now())
-
-        self.napp.handle_on_interface_link_change(event)
-        assert mock_down.call_count == 2
+        self.napp.handle_debounced_interface_event(mock_intf.id, event)
+        mock_down.assert_called_with(mock_intf)
         assert mock_up.call_count == 1
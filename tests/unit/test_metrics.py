@@ -0,0 +1,75 @@
+"""Module to test the metrics of mef_eline."""
+import pytest
+
+from napps.kytos.mef_eline.metrics import Histogram, MetricsRegistry
+
+
+class TestMetrics:
+    """Tests to verify Histogram, Gauge and MetricsRegistry classes."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.registry = MetricsRegistry()
+        self.histogram = self.registry.histogram(
+            "requests_seconds", "Requests.", ("service",), (0.1, 1)
+        )
+
+    def test_histogram(self):
+        """Test observed values are counted in cumulative buckets."""
+        self.histogram.observe(0.05, service="a")
+        self.histogram.observe(0.1, service="a")
+        self.histogram.observe(5, service="a")
+        assert self.histogram.samples() == [
+            ("requests_seconds_bucket", {"service": "a", "le": "0.1"}, 2),
+            ("requests_seconds_bucket", {"service": "a", "le": "1"}, 2),
+            ("requests_seconds_bucket", {"service": "a", "le": "+Inf"}, 3),
+            ("requests_seconds_sum", {"service": "a"}, 5.15),
+            ("requests_seconds_count", {"service": "a"}, 3),
+        ]
+        with pytest.raises(ValueError):
+            self.histogram.observe(1, other="a")
+
+    def test_time(self):
+        """Test time as a context manager and as a decorator."""
+        with self.histogram.time(service="a"):
+            pass
+
+        @self.histogram.time(service="b")
+        def func(value):
+            return value
+
+        assert func(1) == 1
+        counts = {
+            labels["service"]: value
+            for name, labels, value in self.histogram.samples()
+            if name == "requests_seconds_count"
+        }
+        assert counts == {"a": 1, "b": 1}
+
+    def test_exposition(self):
+        """Test the Prometheus text format."""
+        histogram = Histogram("empty_seconds", "Empty.")
+        self.registry.register(histogram)
+        self.registry.gauge("evcs", "EVCs.", lambda: {("up", ): 2}, ("state",))
+        self.registry.gauge("queue", 'Queue "q".', lambda: 1.5)
+        self.registry.gauge("broken", "Broken.", lambda: 1 / 0)
+        self.histogram.observe(0.5, service='a"b')
+        assert self.registry.exposition().splitlines() == [
+            "# HELP empty_seconds Empty.",
+            "# TYPE empty_seconds histogram",
+            "# HELP evcs EVCs.",
+            "# TYPE evcs gauge",
+            'evcs{state="up"} 2',
+            '# HELP queue Queue "q".',
+            "# TYPE queue gauge",
+            "queue 1.5",
+            "# HELP requests_seconds Requests.",
+            "# TYPE requests_seconds histogram",
+            'requests_seconds_bucket{service="a\\"b",le="0.1"} 0',
+            'requests_seconds_bucket{service="a\\"b",le="1"} 1',
+            'requests_seconds_bucket{service="a\\"b",le="+Inf"} 1',
+            'requests_seconds_sum{service="a\\"b"} 0.5',
+            'requests_seconds_count{service="a\\"b"} 1',
+        ]
+        self.registry.unregister("queue")
+        assert "queue" not in self.registry.exposition()
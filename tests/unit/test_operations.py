@@ -0,0 +1,101 @@
+"""Module to test the operations.py file."""
+from unittest.mock import MagicMock, patch
+
+from napps.kytos.mef_eline.operations import Operation, OperationManager
+
+
+class TestOperation():
+    """Tests to verify Operation class."""
+
+    def test_id(self):
+        """Test operation ids are unique."""
+        assert Operation("create", "1").id != Operation("create", "1").id
+
+    def test_lifecycle(self):
+        """Test operation status transitions."""
+        operation = Operation("redeploy", "1")
+        assert operation.status == "queued"
+        assert not operation.is_done()
+        operation.start()
+        assert operation.status == "running"
+        assert operation.started_at
+        operation.finish(result={"deployed": True})
+        assert operation.status == "finished"
+        assert operation.is_done()
+        assert operation.result == {"deployed": True}
+
+        operation = Operation("redeploy", "1")
+        operation.finish(error="error")
+        assert operation.status == "failed"
+        assert operation.is_done()
+
+    def test_as_dict(self):
+        """Test method as_dict."""
+        operation = Operation("update", "1")
+        op_dict = operation.as_dict()
+        assert op_dict["id"] == operation.id
+        assert op_dict["action"] == "update"
+        assert op_dict["circuit_id"] == "1"
+        assert op_dict["status"] == "queued"
+        assert isinstance(op_dict["created_at"], str)
+        assert op_dict["started_at"] is None
+        assert op_dict["finished_at"] is None
+
+
+class TestOperationManager():
+    """Tests to verify OperationManager class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.manager = OperationManager(max_workers=1, max_kept=2)
+        self.manager._executor = MagicMock()
+
+    def teardown_method(self):
+        """Teardown method."""
+        self.manager.shutdown()
+
+    def test_submit(self):
+        """Test submit queues the operation."""
+        func = MagicMock()
+        operation = self.manager.submit("create", "1", func, "arg")
+        assert self.manager.get(operation.id) is operation
+        self.manager._executor.submit.assert_called_with(
+            self.manager._run, operation, func, "arg"
+        )
+        assert self.manager.pending() == 1
+        assert self.manager.get("unknown") is None
+
+    def test_run(self):
+        """Test _run stores the result."""
+        operation = Operation("create", "1")
+        func = MagicMock(return_value={"deployed": True})
+        OperationManager._run(operation, func, "arg")
+        func.assert_called_with("arg")
+        assert operation.status == "finished"
+        assert operation.result == {"deployed": True}
+
+    @patch("napps.kytos.mef_eline.operations.log")
+    def test_run_error(self, log_mock):
+        """Test _run stores the error."""
+        operation = Operation("create", "1")
+        func = MagicMock(side_effect=ValueError("some error"))
+        OperationManager._run(operation, func)
+        assert operation.status == "failed"
+        assert operation.error == "some error"
+        log_mock.error.assert_called()
+
+    def test_discard_old(self):
+        """Test the oldest finished operations are discarded."""
+        op1 = self.manager.submit("create", "1", MagicMock())
+        op2 = self.manager.submit("create", "2", MagicMock())
+        op1.finish(result={})
+        op3 = self.manager.submit("create", "3", MagicMock())
+        assert self.manager.get(op1.id) is None
+        assert self.manager.get(op2.id) is op2
+        assert self.manager.get(op3.id) is op3
+
+        # unfinished operations are never discarded
+        op4 = self.manager.submit("create", "4", MagicMock())
+        assert self.manager.get(op2.id) is op2
+        assert self.manager.get(op4.id) is op4
+        assert self.manager.pending() == 3
@@ -0,0 +1,75 @@
+"""Module to test the on-demand profiling of mef_eline handlers."""
+import time
+
+import pytest
+
+from napps.kytos.mef_eline.exceptions import ProfilingError
+from napps.kytos.mef_eline.profiling import Profiler
+
+
+def handler(value):
+    """Handler being profiled."""
+    return sum(range(value))
+
+
+class TestProfiler:
+    """Tests to verify Profiler class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.profiler = Profiler(max_duration=60, max_events=100)
+
+    def teardown_method(self):
+        """Teardown method."""
+        self.profiler.stop()
+
+    def test_deterministic(self):
+        """Test a deterministic session stops after its events."""
+        self.profiler.start("deterministic", duration=5, events=2)
+        for _ in range(3):
+            assert self.profiler.run(handler, (10,), {}) == 45
+        status = self.profiler.session.status()
+        assert status["running"] is False
+        assert status["stop_reason"] == "events"
+        assert status["events"] == 2
+        if status["skipped"] < 2:
+            assert "handler" in self.profiler.session.pstats("tottime", 5)
+        with pytest.raises(ValueError):
+            self.profiler.session.pstats("unknown")
+
+    def test_sampling(self):
+        """Test a sampling session collects the handler stacks."""
+        self.profiler.start("sampling", duration=0.5, interval=0.005)
+
+        def slow_handler():
+            deadline = time.monotonic() + 0.1
+            while time.monotonic() < deadline:
+                handler(100)
+
+        self.profiler.run(slow_handler, (), {})
+        self.profiler.session._thread.join(2)
+        status = self.profiler.session.status()
+        assert status["stop_reason"] == "duration"
+        assert status["samples"] > 0
+        collapsed = self.profiler.session.collapsed(1)
+        stack = collapsed.split()[0].split(";")
+        assert stack[0].endswith("test_profiling:slow_handler")
+        assert len(collapsed.splitlines()) == 1
+
+    def test_start_invalid(self):
+        """Test invalid arguments and an already running session."""
+        for kwargs in [
+            {"mode": "unknown"}, {"duration": 0}, {"duration": 61},
+            {"events": 0}, {"events": 101}, {"interval": 0},
+        ]:
+            with pytest.raises(ValueError):
+                self.profiler.start(**kwargs)
+        assert self.profiler.session is None
+        assert self.profiler.stop() is None
+
+        self.profiler.start()
+        with pytest.raises(ProfilingError):
+            self.profiler.start()
+        assert self.profiler.stop()["stop_reason"] == "stopped"
+        assert self.profiler.run(handler, (3,), {}) == 3
+        assert self.profiler.session.status()["events"] == 0
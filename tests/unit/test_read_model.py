@@ -0,0 +1,194 @@
+"""Module to test the read_model.py file."""
+# pylint: disable=protected-access
+import json
+from datetime import datetime
+
+from napps.kytos.mef_eline.read_model import EVCReadModel
+from napps.kytos.mef_eline.scheduler import CircuitSchedule
+from napps.kytos.mef_eline.tests.helpers import get_evc_mocked
+
+
+class TestEVCReadModel():
+    """Tests to verify EVCReadModel class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.read_model = EVCReadModel()
+
+    def test_update(self):
+        """Test update serializes the EVC."""
+        updated_at = datetime(2024, 1, 2, 3, 4, 5)
+        evc = get_evc_mocked(
+            evc_id="1", as_dict={"updated_at": updated_at}
+        )
+        self.read_model.update(evc)
+        assert "1" in self.read_model
+        assert len(self.read_model) == 1
+        assert json.loads(self.read_model.get("1")) == {
+            "id": "1",
+            "metadata": {},
+            "updated_at": "2024-01-02T03:04:05",
+            "execution_rounds": 0,
+        }
+
+        self.read_model.update(evc, {"id": "1", "name": "other"})
+        assert json.loads(self.read_model.get("1"))["name"] == "other"
+        assert self.read_model.get("2") is None
+
+    def test_update_archived(self):
+        """Test update removes archived EVCs."""
+        evc = get_evc_mocked(evc_id="1")
+        self.read_model.update(evc)
+        evc.archived = True
+        self.read_model.update(evc)
+        assert "1" not in self.read_model
+
+    def test_remove(self):
+        """Test remove."""
+        self.read_model.update(get_evc_mocked(evc_id="1"))
+        self.read_model.remove("1")
+        self.read_model.remove("2")
+        assert not self.read_model
+
+    def test_list_json(self):
+        """Test list_json sorts and filters by metadata."""
+        assert json.loads(self.read_model.list_json()) == {}
+        for evc_id, metadata in [
+            ("2", {"a": 1, "b": True}), ("1", {"a": "x"}),
+            ("3", {"c": {"d": None}}),
+        ]:
+            self.read_model.update(
+                get_evc_mocked(evc_id=evc_id, metadata=metadata)
+            )
+
+        circuits = json.loads(self.read_model.list_json())
+        assert list(circuits) == ["1", "2", "3"]
+
+        args = {"metadata.a": "1", "archived": "false"}
+        circuits = json.loads(self.read_model.list_json(args))
+        assert list(circuits) == ["2"]
+
+        args = {"metadata.a": "x"}
+        assert list(json.loads(self.read_model.list_json(args))) == ["1"]
+
+        args = {"metadata.b": "True", "metadata.a": "1"}
+        assert list(json.loads(self.read_model.list_json(args))) == ["2"]
+
+        args = {"metadata.c.d": "null"}
+        assert list(json.loads(self.read_model.list_json(args))) == ["3"]
+
+        args = {"metadata.z": "1"}
+        assert not json.loads(self.read_model.list_json(args))
+
+    def test_list_json_paginated(self):
+        """Test list_json with limit, after and fields."""
+        for evc_id in ("3", "1", "2"):
+            self.read_model.update(get_evc_mocked(
+                evc_id=evc_id, as_dict={"name": evc_id}
+            ))
+        circuits = json.loads(self.read_model.list_json(limit=2))
+        assert list(circuits) == ["1", "2"]
+        circuits = json.loads(self.read_model.list_json(after="1", limit=5))
+        assert list(circuits) == ["2", "3"]
+        circuits = json.loads(self.read_model.list_json(fields=["name"]))
+        assert circuits["3"] == {"id": "3", "name": "3"}
+
+    def test_iter_ndjson(self):
+        """Test iter_ndjson."""
+        for evc_id in ("2", "1"):
+            self.read_model.update(get_evc_mocked(evc_id=evc_id))
+        lines = list(self.read_model.iter_ndjson(fields=["id"], after="1"))
+        assert lines == [b'{"id": "2"}\n']
+
+    def test_metadata_index(self):
+        """Test the metadata inverted index is kept up to date."""
+        evc = get_evc_mocked(
+            evc_id="1", metadata={"a": 1, "b": {"c": "x"}, "l": [1]}
+        )
+        self.read_model.update(evc)
+        self.read_model.update(
+            get_evc_mocked(evc_id="2", metadata={"a": True})
+        )
+
+        assert self.read_model._filter_ids({"metadata.a": 1}) == {"1"}
+        assert self.read_model._filter_ids({"metadata.a": True}) == {"2"}
+        assert self.read_model._filter_ids({"metadata.b.c": "x"}) == {"1"}
+        assert self.read_model._filter_ids({"metadata.l": 1}) == {"1"}
+        assert not self.read_model._filter_ids({"metadata.l": 2})
+
+        evc.metadata = {"a": 2}
+        self.read_model.update(evc)
+        assert not self.read_model._filter_ids({"metadata.b.c": "x"})
+        assert self.read_model._filter_ids({"metadata.a": 2}) == {"1"}
+
+        self.read_model.remove("1")
+        self.read_model.remove("2")
+        assert not self.read_model._metadata_index
+
+    def test_metadata_index_lists(self):
+        """Test list metadata values match their elements, like MongoDB."""
+        metadata = {"tags": ["a", "b"], "owners": [{"name": "x"}, 3]}
+        self.read_model.update(get_evc_mocked(evc_id="1", metadata=metadata))
+        self.read_model.update(
+            get_evc_mocked(evc_id="2", metadata={"tags": ["b"]})
+        )
+
+        assert self.read_model._filter_ids({"metadata.tags": "a"}) == {"1"}
+        assert self.read_model._filter_ids(
+            {"metadata.tags": "b"}
+        ) == {"1", "2"}
+        assert self.read_model._filter_ids({"metadata.tags.0": "b"}) == {"2"}
+        assert self.read_model._filter_ids(
+            {"metadata.owners.name": "x"}
+        ) == {"1"}
+        assert self.read_model._filter_ids({"metadata.owners": 3}) == {"1"}
+        assert self.read_model._filter_ids(
+            {"metadata.owners.1": 3}
+        ) == {"1"}
+        content = self.read_model.list_json({"metadata.tags": "a"})
+        assert list(json.loads(content)) == ["1"]
+
+    def test_candidate_ids(self):
+        """Test candidate_ids narrows the EVCs by every leaf value."""
+        self.read_model.update(get_evc_mocked(
+            evc_id="1", metadata={"a": 1, "b": {"c": "x"}, "l": [1, 2]}
+        ))
+        self.read_model.update(
+            get_evc_mocked(evc_id="2", metadata={"a": 1, "l": [2]})
+        )
+        assert self.read_model.candidate_ids({"a": 1}) == {"1", "2"}
+        assert self.read_model.candidate_ids(
+            {"a": 1, "b": {"c": "x"}}
+        ) == {"1"}
+        assert self.read_model.candidate_ids({"l": [1, 2]}) == {"1"}
+        assert self.read_model.candidate_ids({"l": [2]}) == {"2"}
+        assert self.read_model.candidate_ids({"a": 2}) == set()
+        assert self.read_model.candidate_ids({"b": {}}) is None
+
+    def test_schedules(self):
+        """Test the schedule index."""
+        evc = get_evc_mocked(evc_id="1")
+        evc.circuit_scheduler = [
+            CircuitSchedule(id="b", action="create"),
+            CircuitSchedule(id="a", action="remove"),
+        ]
+        self.read_model.update(evc)
+        assert self.read_model.get_schedule("a") == (
+            evc, evc.circuit_scheduler[1]
+        )
+        assert self.read_model.get_schedule("c") == (None, None)
+        assert self.read_model.list_schedules() == [
+            {"schedule_id": "a", "circuit_id": "1",
+             "schedule": {"id": "a", "action": "remove"}},
+            {"schedule_id": "b", "circuit_id": "1",
+             "schedule": {"id": "b", "action": "create"}},
+        ]
+        assert len(self.read_model.list_schedules(limit=1)) == 1
+        schedules = self.read_model.list_schedules(after="a")
+        assert [sc["schedule_id"] for sc in schedules] == ["b"]
+
+        evc.circuit_scheduler.pop()
+        self.read_model.update(evc)
+        assert self.read_model.get_schedule("a") == (None, None)
+        self.read_model.remove("1")
+        assert not self.read_model.list_schedules()
@@ -0,0 +1,76 @@
+"""Module to test the reoptimization.py file."""
+# pylint: disable=protected-access
+import time
+from threading import Event
+from unittest.mock import MagicMock
+
+from napps.kytos.mef_eline.reoptimization import ReoptimizationQueue
+from napps.kytos.mef_eline.tests.helpers import get_evc_mocked
+
+
+class TestReoptimizationQueue():
+    """Tests to verify ReoptimizationQueue class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.callback = MagicMock()
+        self.queue = ReoptimizationQueue(self.callback, 5, 1, 2)
+        # pop_batch is called by the tests instead of the queue thread
+        self.queue._thread = MagicMock()
+
+    def teardown_method(self):
+        """Teardown method."""
+        self.queue.stop()
+
+    def test_pop_batch(self):
+        """Test batches are popped by priority at the configured rate."""
+        evcs = [
+            get_evc_mocked(evc_id="1", service_level=0),
+            get_evc_mocked(evc_id="2", service_level=7),
+            get_evc_mocked(evc_id="3", service_level=0, creation_time=0),
+        ]
+        for evc in evcs:
+            self.queue.add(evc)
+        self.queue.add(evcs[0])
+        assert len(self.queue) == 3
+        now = time.monotonic()
+        assert not self.queue.pop_batch(now)
+        assert self.queue.pop_batch(now + 5) == [evcs[1], evcs[2]]
+        assert not self.queue.pop_batch(now + 5.5)
+        assert self.queue.pop_batch(now + 6) == [evcs[0]]
+        assert self.queue._next_batch_at is None
+        assert not self.queue
+
+    def test_discard(self):
+        """Test an EVC can be removed from the queue."""
+        self.queue.add(get_evc_mocked(evc_id="1"))
+        assert "1" in self.queue
+        self.queue.discard("1")
+        self.queue.discard("2")
+        assert "1" not in self.queue
+
+    def test_run(self):
+        """Test the queue thread re-optimizes the EVCs."""
+        done = Event()
+        self.callback.side_effect = lambda _: done.set()
+        queue = ReoptimizationQueue(self.callback, 0.01, 0.01, 2)
+        evc = get_evc_mocked(evc_id="1")
+        queue.add(evc)
+        assert done.wait(5)
+        self.callback.assert_called_once_with(evc)
+        queue.stop()
+
+    def test_callback_error(self):
+        """Test a failing callback doesn't raise."""
+        self.callback.side_effect = ValueError
+        evc = get_evc_mocked(evc_id="1")
+        self.queue._run_callback(evc)
+        self.callback.assert_called_once_with(evc)
+
+    def test_stop(self):
+        """Test EVCs aren't queued after stop."""
+        self.queue.add(get_evc_mocked(evc_id="1"))
+        self.queue.stop()
+        assert not self.queue
+        self.queue.add(get_evc_mocked(evc_id="2"))
+        assert not self.queue
@@ -0,0 +1,86 @@
+"""Module to test the restoration latency of EVCs on link down."""
+from datetime import datetime, timedelta, timezone
+
+from napps.kytos.mef_eline.restoration import (RestorationTracker,
+                                               percentile, summarize)
+
+
+class TestRestorationTracker:
+    """Tests to verify RestorationTracker class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.tracker = RestorationTracker(max_samples=3, timeout=60)
+        self.timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def at(self, seconds):
+        """Datetime seconds after the link down."""
+        return self.timestamp + timedelta(seconds=seconds)
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([3], 50) == 3
+        assert summarize([2, 1]) == {"p50": 1, "p90": 2, "p99": 2, "max": 2}
+        assert summarize([]) is None
+
+    def test_finish(self):
+        """Test a link down is summarized when all its EVCs are handled."""
+        assert not self.tracker.start("link1", self.timestamp, {
+            "evc1": (7, "failover"), "evc2": (5, "redeploy"),
+            "evc3": (5, "redeploy"),
+        })
+        assert self.tracker.finish("link1", "evc1", {
+            "dispatched": self.at(0.1), "deployed": self.at(0.1),
+            "activated": self.at(0.1),
+        }) is None
+        assert self.tracker.finish("link1", "evc1", None) is None
+        assert self.tracker.finish("link1", "evc2", None) is None
+        summary = self.tracker.finish("link1", "evc3", {
+            "dispatched": self.at(-1), "deployed": self.at(2),
+            "activated": None,
+        })
+        assert summary["evcs"] == 3
+        assert summary["failover"] == 1
+        assert summary["redeploy"] == 2
+        assert summary["restored"] == 2
+        assert summary["failed"] == 1
+        assert summary["pending"] == 0
+        assert summary["latency"]["deployed"]["max"] == 2
+        assert summary["latency"]["dispatched"]["max"] == 0.1
+        assert self.tracker.in_progress() == 0
+        assert list(self.tracker.summaries) == [summary]
+
+        percentiles = self.tracker.percentiles()
+        assert percentiles["7"]["count"] == 1
+        assert percentiles["7"]["activated"]["p50"] == 0.1
+        assert percentiles["5"]["count"] == 1
+        assert percentiles["5"]["dispatched"] is None
+        assert percentiles["5"]["deployed"]["p99"] == 2
+
+    def test_start(self):
+        """Test link downs without EVCs or replaced are summarized."""
+        summaries = self.tracker.start("link1", self.timestamp, {})
+        assert [summary["evcs"] for summary in summaries] == [0]
+        self.tracker.start("link1", self.timestamp, {"evc1": (0, "redeploy")})
+        summaries = self.tracker.start("link1", self.at(5), {
+            "evc1": (0, "redeploy")
+        })
+        assert [summary["pending"] for summary in summaries] == [1]
+        assert self.tracker.in_progress() == 1
+        assert self.tracker.finish("link2", "evc1", None) is None
+
+    def test_expire(self):
+        """Test link downs are summarized after the timeout."""
+        self.tracker.start("link1", self.timestamp, {"evc1": (0, "redeploy")})
+        assert not self.tracker.expire()
+        summaries = self.tracker.expire(self.tracker_started_at() + 60)
+        assert [summary["pending"] for summary in summaries] == [1]
+        assert self.tracker.in_progress() == 0
+
+    def tracker_started_at(self):
+        """Monotonic time the link down in progress started."""
+        # pylint: disable=protected-access
+        return self.tracker._link_downs["link1"].started_at
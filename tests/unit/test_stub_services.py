@@ -0,0 +1,187 @@
+"""Module to test the stand-in services of tests/stubs."""
+import json
+from threading import Thread
+from unittest.mock import MagicMock
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from napps.kytos.mef_eline.tests.stubs.server import Faults, StubServer
+from napps.kytos.mef_eline.tests.stubs.services import (StubServices,
+                                                        vlan_matches)
+from napps.kytos.mef_eline.tests.stubs.topology import (dpid, fat_tree, mesh,
+                                                        ring)
+
+
+class TestStubServices:
+    """Tests to verify StubServices class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.topology = ring(4)
+        self.services = StubServices(self.topology)
+
+    def test_topologies(self):
+        """Test the size of the synthetic topologies."""
+        assert len(self.topology["links"]) == 4
+        assert len(self.topology["unis"]) == 8
+        assert len(mesh(5)["links"]) == 10
+        topology = fat_tree(4)
+        assert len(topology["switches"]) == 20
+        assert len(topology["links"]) == 32
+        assert len(topology["unis"]) == 16
+
+    def test_paths(self):
+        """Test paths are the shortest ones avoiding undesired links."""
+        request = {
+            "source": f"{dpid(1)}:3",
+            "destination": f"{dpid(2)}:3",
+            "spf_max_paths": 2,
+        }
+        paths = self.services.paths(request)["paths"]
+        assert [path["cost"] for path in paths] == [1, 3]
+        assert paths[0]["hops"] == [
+            f"{dpid(1)}:3", dpid(1), f"{dpid(1)}:1", f"{dpid(2)}:1",
+            dpid(2), f"{dpid(2)}:3",
+        ]
+        request["undesired_links"] = [self.topology["links"][0]["id"]]
+        paths = self.services.paths(request)["paths"]
+        assert [path["cost"] for path in paths] == [3]
+
+    def test_traces(self):
+        """Test traces follow the installed flows."""
+        status, _ = self.services.handle(
+            "POST", "http://x/api/kytos/flow_manager/v2/flows_by_switch/",
+            {
+                dpid(1): {"flows": [{
+                    "match": {"in_port": 3, "dl_vlan": 100},
+                    "cookie": 1, "priority": 10,
+                    "actions": [
+                        {"action_type": "push_vlan", "tag_type": "s"},
+                        {"action_type": "set_vlan", "vlan_id": 7},
+                        {"action_type": "output", "port": 1},
+                    ],
+                }]},
+                dpid(2): {"flows": [{
+                    "match": {"in_port": 1, "dl_vlan": 7},
+                    "cookie": 1, "priority": 10,
+                    "actions": [
+                        {"action_type": "pop_vlan"},
+                        {"action_type": "output", "port": 3},
+                    ],
+                }]},
+            }
+        )
+        assert status == 202
+        data = [{"trace": {
+            "switch": {"dpid": dpid(1), "in_port": 3},
+            "eth": {"dl_type": 0x8100, "dl_vlan": 100},
+        }}]
+        trace = self.services.traces(data)["result"][0]
+        assert [(step["dpid"], step["port"]) for step in trace] == [
+            (dpid(1), 3), (dpid(2), 1)
+        ]
+        assert trace[1]["vlan"] == 7
+        assert trace[1]["out"] == {"port": 3, "vlan": 100}
+
+        self.services.delete_flows({dpid(2): [{
+            "cookie": 1, "cookie_mask": 0xffffffffffffffff
+        }]})
+        trace = self.services.traces(data)["result"][0]
+        assert trace[-1]["out"] is None
+
+    def test_vlan_matches(self):
+        """Test dl_vlan matches."""
+        assert vlan_matches(None, [])
+        assert vlan_matches(0, [])
+        assert not vlan_matches(0, [5])
+        assert vlan_matches("4096/4096", [5])
+        assert not vlan_matches("4096/4096", [])
+        assert vlan_matches("4/4092", [7])
+        assert not vlan_matches("4/4092", [8])
+
+
+class TestStubServer:
+    """Tests to verify the stand-in services HTTP server."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.topology = ring(3)
+        self.faults = {
+            service: Faults() for service in ("pathfinder", "flow_manager")
+        }
+        self.server = StubServer(
+            ("127.0.0.1", 0), StubServices(self.topology), self.faults
+        )
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def teardown_method(self):
+        """Teardown method."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request(self, method, path, body=None):
+        """Send a request, return (status, payload)."""
+        data = json.dumps(body).encode() if body is not None else None
+        request = Request(f"{self.base_url}{path}", data=data, method=method,
+                          headers={"Content-Type": "application/json"})
+        try:
+            with urlopen(request, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except HTTPError as err:
+            return err.code, json.loads(err.read())
+
+    def test_requests(self):
+        """Test requests are handled by the services."""
+        status, reply = self.request(
+            "POST", "/api/kytos/pathfinder/v3/",
+            {"source": f"{dpid(1)}:3", "destination": f"{dpid(2)}:3"}
+        )
+        assert status == 200
+        assert [path["cost"] for path in reply["paths"]] == [1, 2]
+
+        status, _ = self.request(
+            "POST", "/api/kytos/flow_manager/v2/flows_by_switch/?force=True",
+            {dpid(1): {"flows": [{"match": {"in_port": 3}, "cookie": 1}]}}
+        )
+        assert status == 202
+        status, reply = self.request("GET", "/stubs/stats")
+        assert reply["calls"]["install"] == 1
+        assert reply["flows"][dpid(1)] == 1
+        status, _ = self.request("GET", "/api/kytos/unknown")
+        assert status == 404
+
+    def test_injected_error(self):
+        """Test errors are injected per service."""
+        self.faults["pathfinder"].error_rate = 1
+        status, reply = self.request(
+            "POST", "/api/kytos/pathfinder/v3/",
+            {"source": f"{dpid(1)}:3", "destination": f"{dpid(2)}:3"}
+        )
+        assert status == 500
+        assert reply == {"description": "Injected error"}
+        status, _ = self.request(
+            "DELETE", "/api/kytos/flow_manager/v2/flows_by_switch/",
+            {dpid(1): {"flows": [{"cookie": 1, "cookie_mask": 1}]}}
+        )
+        assert status == 202
+
+    def test_faults_inject(self):
+        """Test the latency and timeouts injected."""
+        sleep = MagicMock()
+        rng = MagicMock()
+        rng.random.return_value = 0.25
+        rng.uniform.return_value = 0.5
+        faults = Faults(latency=1, jitter=1, error_rate=0.1,
+                        timeout_rate=0.1, timeout=30, rng=rng)
+        assert faults.inject(sleep) is None
+        sleep.assert_called_once_with(1.5)
+        rng.random.return_value = 0.05
+        assert faults.inject(sleep)[0] == 504
+        sleep.assert_called_with(30)
+        assert faults.replace(latency=0).latency == 0
+        with pytest.raises(ValueError):
+            Faults(error_rate=2)
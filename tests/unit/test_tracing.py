@@ -0,0 +1,104 @@
+"""Module to test the tracing spans of mef_eline."""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from napps.kytos.mef_eline.tracing import (STATUS_ERROR, Tracer,
+                                           before_sleep, current_span,
+                                           set_attributes)
+
+
+class TestTracer:
+    """Tests to verify Tracer class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.tracer = Tracer(ring_size=2)
+
+    def test_span_tree(self):
+        """Test child spans are kept in the trace of their root span."""
+        with self.tracer.span("orphan") as span:
+            span.set_attribute("ignored", True)
+        assert not self.tracer.traces
+
+        with self.tracer.span("deploy_to_path", root=True) as root:
+            set_attributes(circuit_id="evc1")
+            with self.tracer.span("install_flows"):
+                with self.tracer.span("flow_manager install") as http:
+                    assert current_span() is http
+            with pytest.raises(ValueError):
+                with self.tracer.span("activate"):
+                    raise ValueError("inactive")
+        assert current_span().set_attribute("ignored", True) is None
+
+        spans = self.tracer.traces[0]
+        assert [span.name for span in spans] == [
+            "flow_manager install", "install_flows", "activate",
+            "deploy_to_path",
+        ]
+        assert {span.trace_id for span in spans} == {root.trace_id}
+        assert spans[0].parent_span_id == spans[1].span_id
+        assert spans[2].status == STATUS_ERROR
+
+        tree = self.tracer.as_tree(spans)
+        assert tree["name"] == "deploy_to_path"
+        assert tree["attributes"] == {"circuit_id": "evc1"}
+        assert [child["name"] for child in tree["children"]] == [
+            "install_flows", "activate"
+        ]
+        assert tree["children"][0]["children"][0]["name"] == (
+            "flow_manager install"
+        )
+        assert tree["children"][1]["status"] == "error"
+
+    def test_find(self):
+        """Test traces are found newest first by root span filters."""
+        for name, circuit_id in (("a", "1"), ("b", "1"), ("b", "2")):
+            with self.tracer.span(name, root=True, circuit_id=circuit_id):
+                pass
+        assert len(self.tracer.traces) == 2
+        assert [
+            spans[-1].attributes["circuit_id"]
+            for spans in self.tracer.find("b")
+        ] == ["2", "1"]
+        assert len(self.tracer.find(attributes={"circuit_id": "1"})) == 1
+        assert len(self.tracer.find(limit=1)) == 1
+        assert not self.tracer.find(min_duration=60)
+
+    def test_export_file(self, tmp_path):
+        """Test traces are appended to the file as OTLP JSON lines."""
+        self.tracer.file_path = str(tmp_path / "traces.jsonl")
+        with self.tracer.span("deploy_to_path", root=True, attempt=1):
+            with self.tracer.span("sync"):
+                pass
+        with open(self.tracer.file_path, encoding="utf-8") as file:
+            lines = file.readlines()
+        assert len(lines) == 1
+        spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0][
+            "spans"
+        ]
+        assert [span["name"] for span in spans] == ["sync", "deploy_to_path"]
+        assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+        assert spans[1]["attributes"] == [
+            {"key": "attempt", "value": {"intValue": "1"}}
+        ]
+
+    def test_disabled(self):
+        """Test nothing is traced when disabled."""
+        self.tracer.enabled = False
+        with self.tracer.span("deploy_to_path", root=True):
+            pass
+        assert not self.tracer.traces
+
+    def test_before_sleep(self):
+        """Test retries are events of the current span."""
+        retry_state = MagicMock(attempt_number=1)
+        retry_state.next_action.sleep = 3
+        retry_state.outcome.failed = True
+        retry_state.outcome.exception.return_value = ValueError("error")
+        with self.tracer.span("deploy_to_path", root=True) as span:
+            before_sleep(retry_state)
+        assert [event[1:] for event in span.events] == [
+            ("retry", {"attempt": 1, "sleep": 3.0, "exception": "error"})
+        ]
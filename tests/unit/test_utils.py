@@ -1,15 +1,30 @@
 """Module to test the utls.py file."""
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call, patch
 import pytest
 
 
 from kytos.core.common import EntityStatus
+from kytos.core.exceptions import KytosTagError
+from kytos.core.interface import TAGRange
 from napps.kytos.mef_eline.exceptions import DisabledSwitch
 from napps.kytos.mef_eline.utils import (check_disabled_component,
                                          compare_endpoint_trace,
                                          compare_uni_out_trace,
-                                         get_vlan_tags_and_masks, map_dl_vlan,
-                                         merge_flow_dicts, prepare_delete_flow)
+                                         get_trace_masks,
+                                         get_vlan_tags_and_masks,
+                                         group_uni_tags, make_uni_list,
+                                         make_uni_tags_available, map_dl_vlan,
+                                         merge_flow_dicts, merge_tag_ranges,
+                                         prepare_cookie_delete_flows,
+                                         prepare_delete_flow, use_uni_tags)
+
+
+def get_tagged_uni_mocked(interface, value, tag_type="vlan"):
+    """Create a UNI mocked with a tag."""
+    uni = MagicMock(interface=interface)
+    uni.user_tag.value = value
+    uni.user_tag.tag_type = tag_type
+    return uni
 
 
 # pylint: disable=too-many-public-methods, too-many-lines
@@ -110,7 +125,51 @@ class TestUtils:
     )
     def test_get_vlan_tags_and_masks(self, vlan_range, expected):
         """Test get_vlan_tags_and_masks"""
-        assert get_vlan_tags_and_masks(vlan_range) == expected
+        assert get_vlan_tags_and_masks(vlan_range) == tuple(expected)
+
+    def test_get_vlan_tags_and_masks_fragmented(self):
+        """Test masks of fragmented ranges match one block per mask."""
+        vlan_range = [[start, start + 2] for start in range(1, 4094, 4)]
+        masks = get_vlan_tags_and_masks(vlan_range)
+        assert get_vlan_tags_and_masks(vlan_range) is masks
+        assert len(masks) == 2 * len(vlan_range)
+        covered = []
+        for mask in masks:
+            if isinstance(mask, int):
+                covered.append(mask)
+                continue
+            value, mask = map(int, mask.split("/"))
+            assert value & ~mask & 4095 == 0
+            covered.extend(range(value, value + 4096 - mask))
+        assert covered == [
+            vlan for start, end in vlan_range for vlan in range(start, end + 1)
+        ]
+
+    def test_get_trace_masks(self):
+        """Test the masks traced by each strategy."""
+        masks = (1, "2/4094", "4/4092", "8/4088", 16)
+        assert get_trace_masks(masks, 3, "all", 2) == list(masks)
+        assert get_trace_masks(masks, 3, "first_last", 2) == [1, 16]
+        assert get_trace_masks((1,), 3, "first_last", 2) == [1]
+        assert get_trace_masks(masks, 5, "rotating", 5) == list(masks)
+        sampled = [get_trace_masks(masks, i, "rotating", 2) for i in range(3)]
+        assert sampled == [
+            [1, "2/4094"], ["4/4092", "8/4088"], [16, 1]
+        ]
+
+    @patch("napps.kytos.mef_eline.utils.settings")
+    def test_make_uni_list_rotating(self, mock_settings):
+        """Test make_uni_list traces the sampled masks of a TAGRange."""
+        mock_settings.TAGRANGE_TRACE_STRATEGY = "rotating"
+        mock_settings.TAGRANGE_TRACE_SAMPLE_SIZE = 1
+        circuit = MagicMock()
+        circuit.uni_a.user_tag = MagicMock(spec=TAGRange,
+                                           mask_list=[1, "2/4094"])
+        circuit.uni_z.user_tag = circuit.uni_a.user_tag
+        intf_a, intf_z = circuit.uni_a.interface, circuit.uni_z.interface
+        assert make_uni_list([circuit], 1) == [
+            (intf_a, "2/4094"), (intf_z, "2/4094")
+        ]
 
     def test_check_disabled_component(self):
         """Test check disabled component"""
@@ -195,3 +254,122 @@ class TestUtils:
             assert (actual_flows['00:01'][i]['match'] ==
                     flow_mod["00:01"][i]['match'])
             assert actual_flows['00:01'][i]['cookie_mask'] == cookie_mask
+
+    def test_prepare_cookie_delete_flows(self):
+        """Test prepare_cookie_delete_flows"""
+        cookie_mask = int(0xffffffffffffffff)
+        cookie_switches = {1: {"00:01", "00:02"}, 2: {"00:02"}}
+        actual_flows = prepare_cookie_delete_flows(cookie_switches)
+        assert actual_flows["00:01"] == {"flows": [
+            {"cookie": 1, "cookie_mask": cookie_mask, "owner": "mef_eline"}
+        ]}
+        assert actual_flows["00:02"] == {"flows": [
+            {"cookie": 1, "cookie_mask": cookie_mask, "owner": "mef_eline"},
+            {"cookie": 2, "cookie_mask": cookie_mask, "owner": "mef_eline"},
+        ]}
+        assert not prepare_cookie_delete_flows({})
+
+    def test_merge_tag_ranges(self):
+        """Test merge_tag_ranges"""
+        assert merge_tag_ranges([[10, 20], [1, 1], [2, 5]]) == [
+            [1, 5], [10, 20]
+        ]
+        with pytest.raises(KytosTagError):
+            merge_tag_ranges([[1, 10], [5, 5]])
+
+    def test_group_uni_tags(self):
+        """Test group_uni_tags merges the tags per interface."""
+        intf1, intf2 = MagicMock(id="intf1"), MagicMock(id="intf2")
+        unis = [
+            get_tagged_uni_mocked(intf1, 100),
+            get_tagged_uni_mocked(intf1, [[1, 10], [20, 30]]),
+            get_tagged_uni_mocked(intf2, 100),
+            get_tagged_uni_mocked(intf2, "untagged"),
+            MagicMock(user_tag=None),
+            None,
+        ]
+        assert list(group_uni_tags(unis)) == [
+            (intf2, "vlan", "untagged"),
+            (intf1, "vlan", [[1, 10], [20, 30], [100, 100]]),
+            (intf2, "vlan", 100),
+        ]
+
+    def test_use_uni_tags(self):
+        """Test use_uni_tags uses each interface tags once."""
+        controller = MagicMock()
+        intf1, intf2 = MagicMock(id="intf1"), MagicMock(id="intf2")
+        unis = [
+            get_tagged_uni_mocked(intf1, 100),
+            get_tagged_uni_mocked(intf1, 101),
+            get_tagged_uni_mocked(intf2, 100),
+        ]
+        use_uni_tags(controller, unis)
+        intf1.use_tags.assert_called_once_with(
+            controller, [[100, 101]], "vlan", use_lock=True,
+            check_order=False
+        )
+        intf2.use_tags.assert_called_once_with(
+            controller, 100, "vlan", use_lock=True, check_order=False
+        )
+
+    def test_use_uni_tags_rollback(self):
+        """Test use_uni_tags makes the used tags available on errors."""
+        controller = MagicMock()
+        intf1, intf2 = MagicMock(id="intf1"), MagicMock(id="intf2")
+        intf2.use_tags.side_effect = KytosTagError("")
+        unis = [
+            get_tagged_uni_mocked(intf1, 100),
+            get_tagged_uni_mocked(intf2, 100),
+        ]
+        with pytest.raises(KytosTagError):
+            use_uni_tags(controller, unis)
+        intf1.make_tags_available.assert_called_once_with(
+            controller, 100, "vlan", use_lock=True, check_order=False
+        )
+        intf2.make_tags_available.assert_not_called()
+
+    @patch("napps.kytos.mef_eline.utils.log")
+    def test_make_uni_tags_available(self, mock_log):
+        """Test make_uni_tags_available logs errors and conflicts once."""
+        controller = MagicMock()
+        intf1, intf2 = MagicMock(id="intf1"), MagicMock(id="intf2")
+        intf1.make_tags_available.return_value = [[100, 100]]
+        intf2.make_tags_available.side_effect = KytosTagError("")
+        unis = [
+            get_tagged_uni_mocked(intf1, 100),
+            get_tagged_uni_mocked(intf1, 101),
+            get_tagged_uni_mocked(intf2, 100),
+        ]
+        make_uni_tags_available(controller, unis)
+        intf1.make_tags_available.assert_called_once_with(
+            controller, [[100, 101]], "vlan", use_lock=True,
+            check_order=False
+        )
+        assert mock_log.error.call_count == 1
+        assert mock_log.warning.call_count == 1
+
+    @patch("napps.kytos.mef_eline.utils.log")
+    def test_make_uni_tags_available_fallback(self, mock_log):
+        """Test make_uni_tags_available releases tags one at a time when
+        a tag of the group is invalid."""
+        controller = MagicMock()
+        intf = MagicMock(id="intf1")
+        intf.make_tags_available.side_effect = [
+            KytosTagError("invalid"), None, None
+        ]
+        unis = [
+            get_tagged_uni_mocked(intf, [[1, 10]]),
+            get_tagged_uni_mocked(intf, 5),
+            get_tagged_uni_mocked(intf, 100),
+            get_tagged_uni_mocked(intf, 100),
+        ]
+        make_uni_tags_available(controller, unis)
+        assert intf.make_tags_available.call_args_list == [
+            call(controller, [tag_range], "vlan", use_lock=True,
+                 check_order=False)
+            for tag_range in ([1, 10], [5, 5], [100, 100])
+        ]
+        mock_log.error.assert_called_once_with(
+            "Error making UNI tags available: {'intf1': 'invalid'}"
+        )
+        mock_log.warning.assert_not_called()
@@ -0,0 +1,108 @@
+"""Module to test the vlan_pool.py file."""
+# pylint: disable=protected-access
+from itertools import count
+from unittest.mock import MagicMock
+
+from kytos.core.exceptions import KytosNoTagAvailableError
+
+from napps.kytos.mef_eline.vlan_pool import SVlanPools
+
+
+def get_link_mocked(link_id, first_tag=100, last_tag=None):
+    """Create a link mocked giving sequential available tags."""
+    tags = count(first_tag)
+
+    def next_tag(*_args, **_kwargs):
+        value = next(tags)
+        if last_tag is not None and value > last_tag:
+            raise KytosNoTagAvailableError(link_id)
+        return value
+
+    link = MagicMock(id=link_id)
+    link.get_next_available_tag.side_effect = next_tag
+    return link
+
+
+class TestSVlanPools():
+    """Tests to verify SVlanPools class."""
+
+    def setup_method(self):
+        """Setup method."""
+        self.link = get_link_mocked("hot")
+        self.controller = MagicMock(links={"hot": self.link})
+        self.pools = SVlanPools(self.controller, ["hot"], 4, 2, 30)
+
+    def test_refill(self):
+        """Test pools are filled up to size only below the low watermark."""
+        self.pools.refill()
+        assert self.pools.levels() == {"hot": 4}
+        assert self.pools.take(self.link) == 100
+        self.pools.refill()
+        assert self.pools.levels() == {"hot": 3}
+        assert self.pools.take(self.link) == 101
+        assert self.pools.take(self.link) == 102
+        self.pools.refill()
+        assert list(self.pools._pools["hot"]) == [103, 104, 105, 106]
+
+    def test_refill_no_tag_available(self):
+        """Test a pool keeps the tags found before no tag is available."""
+        link = get_link_mocked("hot", last_tag=101)
+        self.controller.links = {"hot": link, "other": link}
+        self.pools.refill()
+        assert self.pools.levels() == {"hot": 2}
+
+    def test_take(self):
+        """Test taking tags from a pool."""
+        other = get_link_mocked("other")
+        assert self.pools.take(self.link) is None
+        assert self.pools.take(other) is None
+        assert "hot" in self.pools
+        assert "other" not in self.pools
+
+        self.pools.refill()
+        assert self.pools.take(self.link, try_avoid_value=100) == 101
+        assert list(self.pools._pools["hot"]) == [102, 103, 100]
+        self.pools.take(self.link)
+        self.pools.take(self.link)
+        assert self.pools.take(self.link, try_avoid_value=100) == 100
+        assert self.pools.take(self.link) is None
+
+    def test_put(self):
+        """Test tags go back to their pool while it isn't full."""
+        assert self.pools.put(get_link_mocked("other"), 10) is False
+        assert self.pools.put(self.link, 10) is True
+        self.pools.refill()
+        assert self.pools.levels() == {"hot": 4}
+        assert self.pools.put(self.link, 11) is False
+
+    def test_stop(self):
+        """Test stop makes the pooled tags available."""
+        self.pools.refill()
+        self.pools.take(self.link)
+        self.pools.stop()
+        self.link.make_tags_available.assert_called_once_with(
+            self.controller, [[101, 101], [102, 102], [103, 103]],
+            "hot", "vlan", check_order=False
+        )
+        assert self.pools.levels() == {"hot": 0}
+        assert self.pools._stopped
+
+    def test_reclaim(self):
+        """Test reclaim pools the left over S-VLANs not used by EVCs."""
+        for interface, available in (
+            (self.link.endpoint_a, [[1, 9], [17, 4095]]),
+            (self.link.endpoint_b, [[1, 9], [18, 4095]]),
+        ):
+            interface.tag_ranges = {"vlan": [[1, 4095]]}
+            interface.available_tags = {"vlan": available}
+        self.pools.put(self.link, 16)
+        self.pools.reclaim({"hot": {10, 12}})
+        assert list(self.pools._pools["hot"]) == [16, 11, 13, 14]
+        self.link.make_tags_available.assert_called_once_with(
+            self.controller, [[15, 15]], "hot", "vlan", check_order=False
+        )
+
+        self.pools._pools["hot"].clear()
+        self.pools._thread = MagicMock()
+        self.pools.reclaim({})
+        assert self.pools.levels() == {"hot": 0}
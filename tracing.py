@@ -0,0 +1,345 @@
+"""Module responsible for the tracing spans of mef_eline.
+
+Spans follow the OpenTelemetry data model: a root span, e.g. one
+deploy_to_path call, starts a trace and the spans started while it's
+current, e.g. each deploy step, HTTP request or retry, are its children.
+Finished traces are kept in an in-memory ring served by
+GET /v2/debug/traces and, if settings.TRACING_FILE is set, appended to
+it as OTLP JSON lines, which the OpenTelemetry collector otlpjsonfile
+receiver reads.
+"""
+import json
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from typing import Callable, Optional
+
+from kytos.core import log
+from kytos.core.retry import before_sleep as log_before_sleep
+from napps.kytos.mef_eline import settings
+
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+# Spans kept per trace, the next ones are dropped
+MAX_SPANS_PER_TRACE = 1000
+
+_current: ContextVar[Optional["Span"]] = ContextVar(
+    "mef_eline_span", default=None
+)
+
+
+def _otlp_value(value) -> dict:
+    """Encode an attribute value as an OTLP JSON AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    """Encode attributes as a list of OTLP JSON KeyValue."""
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+    ]
+
+
+class Span:
+    """A timed operation of a trace."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_span_id", "start_time",
+        "end_time", "attributes", "events", "status", "status_message",
+        "_spans", "_token",
+    )
+
+    def __init__(self, name: str, parent: "Span" = None,
+                 attributes: dict = None):
+        """Start a span, child of parent or the root of a new trace."""
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        if parent:
+            self.trace_id = parent.trace_id
+            self.parent_span_id = parent.span_id
+            # pylint: disable=protected-access
+            self._spans = parent._spans
+        else:
+            self.trace_id = f"{random.getrandbits(128):032x}"
+            self.parent_span_id = None
+            self._spans = []
+        self.attributes = attributes or {}
+        self.events: list[tuple[int, str, dict]] = []
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self._token = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds from start to end, None if it hasn't ended."""
+        if self.end_time is None:
+            return None
+        return (self.end_time - self.start_time) / 1e9
+
+    def set_attribute(self, key: str, value) -> None:
+        """Set an attribute."""
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes) -> None:
+        """Add a timestamped event."""
+        self.events.append((time.time_ns(), name, attributes))
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Add an exception event and set the status to error."""
+        self.add_event("exception", **{
+            "exception.type": type(exc).__name__,
+            "exception.message": str(exc),
+        })
+        self.status = STATUS_ERROR
+        self.status_message = str(exc)
+
+    def as_otlp(self) -> dict:
+        """Return the span as OTLP JSON."""
+        otlp = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": _otlp_attributes(self.attributes),
+            "events": [
+                {
+                    "timeUnixNano": str(timestamp),
+                    "name": name,
+                    "attributes": _otlp_attributes(attributes),
+                }
+                for timestamp, name, attributes in self.events
+            ],
+            "status": {"code": self.status},
+        }
+        if self.parent_span_id:
+            otlp["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            otlp["status"]["message"] = self.status_message
+        return otlp
+
+    def as_dict(self) -> dict:
+        """Return the span, without its children, for the debug endpoint."""
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "start": self.start_time / 1e9,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "events": [
+                {"time": timestamp / 1e9, "name": name} | attributes
+                for timestamp, name, attributes in self.events
+            ],
+            "status": ("unset", "ok", "error")[self.status],
+        }
+
+
+class _NoopSpan:
+    """Span of the operations that aren't traced."""
+
+    def set_attribute(self, key: str, value) -> None:
+        """Ignore the attribute."""
+
+    def add_event(self, name: str, **attributes) -> None:
+        """Ignore the event."""
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Ignore the exception."""
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanContext:
+    """Context manager making a span current while it runs."""
+
+    __slots__ = ("tracer", "span")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        # pylint: disable=protected-access
+        self.span._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, _traceback):
+        ended = self.span
+        if exc is not None:
+            ended.record_exception(exc)
+        ended.end_time = time.time_ns()
+        # pylint: disable=protected-access
+        _current.reset(ended._token)
+        if len(ended._spans) < MAX_SPANS_PER_TRACE:
+            ended._spans.append(ended)
+        if ended.parent_span_id is None:
+            self.tracer.export(ended._spans)
+
+
+class _NoopContext:
+    """Context manager of the operations that aren't traced."""
+
+    def __enter__(self) -> _NoopSpan:
+        return NOOP_SPAN
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NOOP_CONTEXT = _NoopContext()
+
+
+class Tracer:
+    """Start spans and keep the last finished traces."""
+
+    def __init__(self, enabled: bool = True, ring_size: int = 200,
+                 file_path: str = None):
+        """Create a tracer.
+
+        Args:
+            enabled(bool): False to not trace anything.
+            ring_size(int): number of finished traces kept in memory.
+            file_path(str): file the finished traces are appended to as
+                OTLP JSON lines, None to keep them only in memory.
+        """
+        self.enabled = enabled
+        self.file_path = file_path
+        self.traces: deque = deque(maxlen=ring_size)
+        self._file_lock = Lock()
+
+    def span(self, name: str, root: bool = False, **attributes):
+        """Return a context manager of a span made current while it runs.
+
+        The span is a child of the current span. If there's none, it's the
+        root of a new trace if root is True, else it isn't traced.
+        """
+        if not self.enabled:
+            return _NOOP_CONTEXT
+        parent = _current.get()
+        if parent is None and not root:
+            return _NOOP_CONTEXT
+        return _SpanContext(self, Span(name, parent, attributes))
+
+    def export(self, spans: list[Span]) -> None:
+        """Keep a finished trace, its root span is the last one."""
+        self.traces.append(spans)
+        if not self.file_path:
+            return
+        line = json.dumps(self.as_otlp(spans))
+        try:
+            with self._file_lock, open(
+                self.file_path, "a", encoding="utf-8"
+            ) as file:
+                file.write(line + "\n")
+        except OSError as err:
+            log.error(f"Failed to export trace to {self.file_path}: {err}")
+
+    @staticmethod
+    def as_otlp(spans: list[Span]) -> dict:
+        """Return a trace as an OTLP JSON ExportTraceServiceRequest."""
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({
+                "service.name": "kytos", "service.namespace": "kytos",
+            })},
+            "scopeSpans": [{
+                "scope": {"name": "napps.kytos.mef_eline"},
+                "spans": [item.as_otlp() for item in spans],
+            }],
+        }]}
+
+    @staticmethod
+    def as_tree(spans: list[Span]) -> dict:
+        """Return a trace as its root span with nested children."""
+        nodes = {
+            item.span_id: item.as_dict() | {"children": []} for item in spans
+        }
+        for item in sorted(spans, key=lambda item: item.start_time):
+            parent = nodes.get(item.parent_span_id)
+            if parent is not None:
+                parent["children"].append(nodes[item.span_id])
+        root = spans[-1]
+        return {"trace_id": root.trace_id} | nodes[root.span_id]
+
+    def find(self, name: str = None, attributes: dict = None,
+             min_duration: float = 0, limit: int = None) -> list[list]:
+        """Return the finished traces, newest first.
+
+        Traces are filtered by the name, the attributes and the minimum
+        duration in seconds of their root span.
+        """
+        result = []
+        for spans in reversed(list(self.traces)):
+            root = spans[-1]
+            if name and root.name != name:
+                continue
+            if attributes and any(
+                str(root.attributes.get(key)) != str(value)
+                for key, value in attributes.items()
+            ):
+                continue
+            if root.duration < min_duration:
+                continue
+            result.append(spans)
+            if limit and len(result) >= limit:
+                break
+        return result
+
+
+tracer = Tracer(
+    settings.TRACING, settings.TRACING_RING_SIZE, settings.TRACING_FILE
+)
+
+
+def span(name: str, root: bool = False, **attributes):
+    """Return a context manager of a span, see Tracer.span."""
+    return tracer.span(name, root, **attributes)
+
+
+def current_span():
+    """Return the current span, a no-op span if there's none."""
+    return _current.get() or NOOP_SPAN
+
+
+def set_attributes(**attributes) -> None:
+    """Set attributes of the current span, if there's one."""
+    current = _current.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def traced(name: str = None, root: bool = False) -> Callable:
+    """Decorate a function to run it in a span, see Tracer.span."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name, root):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def before_sleep(retry_state) -> None:
+    """Log a retry and add it as an event of the current span."""
+    log_before_sleep(retry_state)
+    attributes = {"attempt": retry_state.attempt_number}
+    if retry_state.next_action:
+        attributes["sleep"] = float(retry_state.next_action.sleep)
+    if retry_state.outcome and retry_state.outcome.failed:
+        attributes["exception"] = str(retry_state.outcome.exception())
+    current_span().add_event("retry", **attributes)
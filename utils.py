@@ -1,9 +1,13 @@
 """Utility functions."""
-from typing import Union
+from functools import lru_cache
+from typing import Iterator, Union
 
+from kytos.core import log
 from kytos.core.common import EntityStatus
 from kytos.core.events import KytosEvent
+from kytos.core.exceptions import KytosTagError
 from kytos.core.interface import UNI, Interface, TAGRange
+from napps.kytos.mef_eline import settings
 from napps.kytos.mef_eline.exceptions import DisabledSwitch
 
 
@@ -101,22 +105,174 @@ def max_power2_divisor(number: int, limit: int = 4096) -> int:
     return limit
 
 
-def get_vlan_tags_and_masks(tag_ranges: list[list[int]]) -> list[int, str]:
-    """Get a list of vlan/mask pairs for a given list of ranges."""
-    masks_list = []
+@lru_cache(maxsize=1024)
+def _ranges_masks(tag_ranges: tuple) -> tuple[Union[int, str], ...]:
+    """Get the vlan/mask pairs of hashable ranges, memoized per ranges."""
+    masks = []
+    append = masks.append
     for start, end in tag_ranges:
+        if start == end:
+            append(start)
+            continue
         limit = end + 1
         while start < limit:
-            divisor = max_power2_divisor(start)
-            while divisor > limit - start:
-                divisor //= 2
-            mask = 4096 - divisor
-            if mask == 4095:
-                masks_list.append(start)
+            # Largest block aligned to start, i.e. its lowest set bit, that
+            # doesn't go beyond the end of the range.
+            divisor = 1 << ((limit - start).bit_length() - 1)
+            if start:
+                divisor = min(divisor, start & -start)
+            divisor = min(divisor, 4096)
+            if divisor == 1:
+                append(start)
             else:
-                masks_list.append(f"{start}/{mask}")
+                append(f"{start}/{4096 - divisor}")
             start += divisor
-    return masks_list
+    return tuple(masks)
+
+
+def get_vlan_tags_and_masks(
+    tag_ranges: list[list[int]]
+) -> tuple[Union[int, str], ...]:
+    """Get a tuple of vlan/mask pairs for a given list of ranges.
+
+    The result is memoized, the same tuple is shared by every UNI with the
+    same ranges, e.g. uni_a and uni_z of an EVC, so it can't be changed.
+    """
+    return _ranges_masks(tuple(map(tuple, tag_ranges)))
+
+
+def merge_tag_ranges(tag_ranges: list[list[int]]) -> list[list[int]]:
+    """Sort and merge adjacent tag ranges.
+
+    KytosTagError is raised if any tag is in more than one range.
+    """
+    merged = []
+    for start, end in sorted(tag_ranges):
+        if merged and start <= merged[-1][1]:
+            raise KytosTagError(
+                f"Tags {[start, end]} are requested more than once"
+            )
+        if merged and start == merged[-1][1] + 1:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def group_uni_tags(
+    unis: list[UNI], merge: bool = True
+) -> Iterator[tuple[Interface, str, list]]:
+    """Yield (interface, tag_type, tags) with the UNI tags per interface.
+
+    The ranges of the UNIs sharing an interface and tag type are merged, so
+    they can be used or made available with a single call. Special tags,
+    such as "any", and single tags are yielded as they are. If merge is
+    False, the ranges are yielded unmerged.
+    """
+    groups = {}
+    for uni in unis:
+        if uni is None or uni.user_tag is None:
+            continue
+        value, tag_type = uni.user_tag.value, uni.user_tag.tag_type
+        if isinstance(value, str):
+            yield uni.interface, tag_type, value
+            continue
+        key = (uni.interface.id, tag_type)
+        if key not in groups:
+            groups[key] = (uni.interface, tag_type, [])
+        if isinstance(value, int):
+            groups[key][2].append([value, value])
+        else:
+            groups[key][2].extend(list(tag_range) for tag_range in value)
+    for interface, tag_type, tag_ranges in groups.values():
+        if not merge:
+            yield interface, tag_type, tag_ranges
+            continue
+        tags = merge_tag_ranges(tag_ranges)
+        if len(tag_ranges) == 1 and tags[0][0] == tags[0][1]:
+            tags = tags[0][0]
+        yield interface, tag_type, tags
+
+
+def use_uni_tags(controller, unis: list[UNI]) -> None:
+    """Use the tags of many UNIs at once, all or nothing.
+
+    Each interface is locked once for the tags of all its UNIs. If any tag
+    can't be used, the tags already used are made available again and
+    KytosTagError is raised.
+    """
+    groups = list(group_uni_tags(unis))
+    used = []
+    try:
+        for interface, tag_type, tags in groups:
+            interface.use_tags(
+                controller, tags, tag_type, use_lock=True, check_order=False
+            )
+            used.append((interface, tag_type, tags))
+    except KytosTagError:
+        for interface, tag_type, tags in used:
+            interface.make_tags_available(
+                controller, tags, tag_type, use_lock=True, check_order=False
+            )
+        raise
+
+
+def _make_interface_tags_available(
+    controller, interface, tag_type: str, tags, errors: dict
+) -> list:
+    """Make UNI tags of an interface available, returning the conflicts.
+
+    The tag ranges are merged and made available with a single call and, if
+    it fails, one unique range at a time, so one invalid tag doesn't keep the
+    others in use. Errors are added to errors by interface id.
+    """
+    ranges = [tags]
+    if not isinstance(tags, str):
+        ranges = [list(tag_range) for tag_range in
+                  dict.fromkeys(map(tuple, tags))]
+    try:
+        if not isinstance(tags, str):
+            tags = merge_tag_ranges(ranges)
+            if len(ranges) == 1 and tags[0][0] == tags[0][1]:
+                tags = tags[0][0]
+        return [interface.make_tags_available(
+            controller, tags, tag_type, use_lock=True, check_order=False
+        )]
+    except KytosTagError as err:
+        if len(ranges) == 1:
+            errors[interface.id] = str(err)
+            return []
+    results = []
+    for tag_range in ranges:
+        try:
+            results.append(interface.make_tags_available(
+                controller, [tag_range], tag_type, use_lock=True,
+                check_order=False
+            ))
+        except KytosTagError as err:
+            errors[interface.id] = (
+                f"{errors.get(interface.id, '')} {err}".strip()
+            )
+    return results
+
+
+def make_uni_tags_available(controller, unis: list[UNI]) -> None:
+    """Make the tags of many UNIs available at once.
+
+    Errors and conflicts are logged once for all the interfaces.
+    """
+    conflicts, errors = {}, {}
+    for interface, tag_type, tags in group_uni_tags(unis, merge=False):
+        results = _make_interface_tags_available(
+            controller, interface, tag_type, tags, errors
+        )
+        conflict = [tags for result in results if result for tags in result]
+        if conflict:
+            conflicts[interface.id] = conflict
+    if errors:
+        log.error(f"Error making UNI tags available: {errors}")
+    if conflicts:
+        log.warning(f"UNI tags were already available: {conflicts}")
 
 
 def check_disabled_component(uni_a: UNI, uni_z: UNI):
@@ -134,7 +290,32 @@ def check_disabled_component(uni_a: UNI, uni_z: UNI):
         raise DisabledSwitch(f"Interface {id_} is disabled")
 
 
-def make_uni_list(list_circuits: list) -> list:
+def get_trace_masks(
+    mask_list, trace_round: int = 0, strategy: str = None,
+    sample_size: int = None
+) -> list:
+    """Get the masks of a TAGRange to be traced in a consistency round.
+
+    Strategies, settings.TAGRANGE_TRACE_STRATEGY by default:
+        all: every mask.
+        first_last: the first and the last masks.
+        rotating: sample_size consecutive masks, starting sample_size masks
+            after the previous round, so every mask is traced over time.
+    """
+    strategy = strategy or settings.TAGRANGE_TRACE_STRATEGY
+    if sample_size is None:
+        sample_size = settings.TAGRANGE_TRACE_SAMPLE_SIZE
+    mask_list = list(mask_list or [])
+    if strategy == "first_last":
+        return mask_list[:1] + mask_list[1:][-1:]
+    if strategy == "rotating" and len(mask_list) > sample_size:
+        start = (trace_round * sample_size) % len(mask_list)
+        sample = mask_list[start:start + sample_size]
+        return sample + mask_list[:sample_size - len(sample)]
+    return mask_list
+
+
+def make_uni_list(list_circuits: list, trace_round: int = 0) -> list:
     """Make uni list to be sent to sdntrace"""
     uni_list = []
     for circuit in list_circuits:
@@ -142,7 +323,7 @@ def make_uni_list(list_circuits: list) -> list:
             # TAGRange value from uni_a and uni_z are currently mirrored
             mask_list = (circuit.uni_a.user_tag.mask_list or
                          circuit.uni_z.user_tag.mask_list)
-            for mask in mask_list:
+            for mask in get_trace_masks(mask_list, trace_round):
                 uni_list.append((circuit.uni_a.interface, mask))
                 uni_list.append((circuit.uni_z.interface, mask))
         else:
@@ -196,3 +377,22 @@ def prepare_delete_flow(evc_flows: dict[str, list[dict]]):
                 "cookie_mask": int(0xffffffffffffffff)
             })
     return dpid_flows
+
+
+def prepare_cookie_delete_flows(
+    cookie_switches: dict[int, set[str]]
+) -> dict[str, dict[str, list[dict]]]:
+    """Merge cookie flow deletions per switch.
+
+    The result is suited for a single flow_manager flows_by_switch request.
+    """
+    flows_by_switch: dict[str, dict[str, list[dict]]] = {}
+    for cookie, switches in cookie_switches.items():
+        for dpid in switches:
+            flows_by_switch.setdefault(dpid, {"flows": []})
+            flows_by_switch[dpid]["flows"].append({
+                "cookie": cookie,
+                "cookie_mask": int(0xffffffffffffffff),
+                "owner": "mef_eline",
+            })
+    return flows_by_switch
@@ -0,0 +1,202 @@
+"""Module responsible for the pools of S-VLANs reserved per link."""
+from collections import deque
+from threading import Condition, Thread
+from typing import Optional
+
+from kytos.core import log
+from kytos.core.exceptions import KytosNoTagAvailableError, KytosTagError
+from kytos.core.tag_ranges import range_difference
+
+
+def _vlans_in_use(link) -> set[int]:
+    """Return the VLANs in use in both interfaces of a link."""
+    in_use = []
+    for interface in (link.endpoint_a, link.endpoint_b):
+        in_use.append({
+            value
+            for start, end in range_difference(
+                interface.tag_ranges["vlan"], interface.available_tags["vlan"]
+            )
+            for value in range(start, end + 1)
+        })
+    return in_use[0] & in_use[1]
+
+
+class SVlanPools:
+    """S-VLANs reserved in advance for some links.
+
+    The S-VLANs of a pool are already used in the link interfaces, so
+    taking one doesn't need to search for an available tag. A background
+    thread refills the pools below low_watermark up to size, and S-VLANs
+    released by paths go back to their pool while it isn't full.
+    """
+
+    def __init__(
+        self,
+        controller,
+        link_ids: list[str],
+        size: int,
+        low_watermark: int,
+        refill_interval: float,
+    ):
+        """Create the pools of the given links, they're filled by start.
+
+        Args:
+            controller(Controller): Kytos controller, its links are refilled.
+            link_ids(list): ids of the links with a pool.
+            size(int): S-VLANs kept by each pool.
+            low_watermark(int): a pool is refilled when it has fewer tags.
+            refill_interval(float): maximum seconds between refills.
+        """
+        self.controller = controller
+        self.size = size
+        self.low_watermark = low_watermark
+        self.refill_interval = refill_interval
+        self._pools: dict[str, deque] = {
+            link_id: deque() for link_id in link_ids
+        }
+        self._cond = Condition()
+        self._thread = None
+        self._stopped = False
+
+    def __contains__(self, link_id: str) -> bool:
+        return link_id in self._pools
+
+    def levels(self) -> dict[str, int]:
+        """Return the number of S-VLANs in each pool."""
+        with self._cond:
+            return {
+                link_id: len(pool) for link_id, pool in self._pools.items()
+            }
+
+    def take(self, link, try_avoid_value: int = None) -> Optional[int]:
+        """Take an S-VLAN of the link pool, None if it's empty.
+
+        try_avoid_value is only taken if it's the only S-VLAN left.
+        """
+        with self._cond:
+            pool = self._pools.get(link.id)
+            if not pool:
+                if pool is not None:
+                    self._cond.notify()
+                return None
+            value = pool.popleft()
+            if value == try_avoid_value and pool:
+                pool.append(value)
+                value = pool.popleft()
+            if len(pool) < self.low_watermark:
+                self._cond.notify()
+            return value
+
+    def put(self, link, value: int) -> bool:
+        """Return an S-VLAN to the link pool, False if the pool is full."""
+        with self._cond:
+            pool = self._pools.get(link.id)
+            if pool is None or len(pool) >= self.size:
+                return False
+            pool.append(value)
+            return True
+
+    def refill(self) -> None:
+        """Fill the pools below low_watermark up to size.
+
+        Tags are searched without holding the pools lock.
+        """
+        for link_id in self.levels():
+            link = self.controller.links.get(link_id)
+            if not link:
+                continue
+            with self._cond:
+                missing = self.size - len(self._pools[link_id])
+                if missing <= self.size - self.low_watermark:
+                    continue
+            values = []
+            try:
+                for _ in range(missing):
+                    values.append(
+                        link.get_next_available_tag(self.controller, link_id)
+                    )
+            except KytosNoTagAvailableError:
+                log.warning(f"S-VLAN pool of link {link_id} couldn't be "
+                            f"filled, {len(values)} S-VLANs were added")
+            with self._cond:
+                self._pools[link_id].extend(values)
+
+    def reclaim(self, used: dict[str, set[int]]) -> None:
+        """Put back in the pools the S-VLANs left over by a previous run.
+
+        Pooled S-VLANs are in use in the link interfaces until stop, so
+        they'd leak if it never ran. The S-VLANs in use in a pooled link
+        that aren't in used, the EVC S-VLANs by link id, go back to its
+        pool and the ones that don't fit are made available. It only has
+        an effect before start.
+        """
+        with self._cond:
+            if self._thread:
+                return
+        extra = {}
+        for link_id in self.levels():
+            link = self.controller.links.get(link_id)
+            if not link:
+                continue
+            with self._cond:
+                pool = self._pools[link_id]
+                left_over = sorted(
+                    _vlans_in_use(link) - used.get(link_id, set()) - set(pool)
+                )
+                if not left_over:
+                    continue
+                free = max(self.size - len(pool), 0)
+                pool.extend(left_over[:free])
+                extra[link_id] = left_over[free:]
+            log.info(f"{len(left_over)} S-VLANs left over in link {link_id} "
+                     "were reclaimed")
+        self._make_available(extra)
+
+    def _make_available(self, values_by_link: dict[str, list]) -> None:
+        """Make the S-VLANs by link id available."""
+        for link_id, values in values_by_link.items():
+            link = self.controller.links.get(link_id)
+            if not link or not values:
+                continue
+            try:
+                link.make_tags_available(
+                    self.controller, [[value, value] for value in values],
+                    link_id, "vlan", check_order=False
+                )
+            except KytosTagError as err:
+                log.error(f"Error releasing S-VLAN pool of {link_id}: {err}")
+
+    def _run(self) -> None:
+        """Refill the pools when they're low or every refill_interval."""
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+            self.refill()
+            with self._cond:
+                if self._stopped:
+                    return
+                self._cond.wait(self.refill_interval)
+
+    def start(self) -> None:
+        """Start the refill thread."""
+        with self._cond:
+            if self._thread or not self._pools:
+                return
+            self._thread = Thread(
+                target=self._run, name="mef_eline_vlan_pool", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop refilling and make the pooled S-VLANs available."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+            pools = {
+                link_id: list(pool) for link_id, pool in self._pools.items()
+            }
+            for pool in self._pools.values():
+                pool.clear()
+        self._make_available(pools)